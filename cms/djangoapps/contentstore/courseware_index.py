@@ -1,12 +1,16 @@
 """ Code to allow module store to interface with courseware index """
 from __future__ import absolute_import
 
+import hashlib
+import json
 import logging
 import re
+import zlib
 from abc import ABCMeta, abstractmethod
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import caches
 from django.urls import resolve
 from django.utils.translation import ugettext as _
 from django.utils.translation import ugettext_lazy
@@ -126,8 +130,11 @@ class SearchIndexerBase(object):
         structure_key (CourseKey|LibraryKey) - course or library identifier
 
         triggered_at (datetime) - provides time at which indexing was triggered;
-            useful for index updates - only things changed recently from that date
-            (within REINDEX_AGE above ^^) will have their index updated, others skip
+            useful for index updates - only things changed since the structure was
+            last indexed will have their index updated, and nothing at all if the
+            published version hasn't changed since. If what was last indexed is no
+            longer remembered, then only things changed recently from that date
+            (within REINDEX_AGE above ^^) will have their index updated. Others skip
             updating their index but are still walked through in order to identify
             which items may need to be removed from the index
             If None, then a full reindex takes place
@@ -142,6 +149,13 @@ class SearchIndexerBase(object):
 
         structure_key = cls.normalize_structure_key(structure_key)
         location_info = cls._get_location_info(structure_key)
+        config = getattr(settings, 'SEARCH_INDEXING', {})
+        batch_size = config.get('BATCH_SIZE', 500)
+
+        # The fingerprints of the items in the index after the last time it was
+        # updated, or None if that isn't known or this is a full reindex
+        previous_state = cls._get_index_state(structure_key) if triggered_at is not None else None
+        previous_fingerprints = previous_state['items'] if previous_state else None
 
         # Wrap counter in dictionary - otherwise we seem to lose scope inside the embedded function `prepare_item_index`
         indexed_count = {
@@ -154,9 +168,13 @@ class SearchIndexerBase(object):
         # list - those are ready to be destroyed
         indexed_items = set()
 
-        # items_index is a list of all the items index dictionaries.
-        # it is used to collect all indexes and index them using bulk API,
-        # instead of per item index API call.
+        # fingerprints of the items which are in the index once this is done,
+        # to compare against the next time the structure is indexed
+        fingerprints = {}
+
+        # items_index is a list of the index dictionaries of items not yet sent
+        # to the search engine. They are sent using the bulk API, batch_size at
+        # a time, instead of per item index API call.
         items_index = []
 
         def get_item_location(item):
@@ -165,7 +183,8 @@ class SearchIndexerBase(object):
             """
             return item.location.version_agnostic().replace(branch=None)
 
-        def prepare_item_index(item, skip_index=False, groups_usage_info=None):
+        def prepare_item_index(item, skip_index=False, groups_usage_info=None,  # pylint: disable=too-many-statements
+                               ancestor_names=()):
             """
             Add this item to the items_index and indexed_items list
 
@@ -177,13 +196,21 @@ class SearchIndexerBase(object):
                 This should really only be passed from the recursive child calls when
                 this method has determined that it is safe to do so
 
+            ancestor_names - display names of the item's ancestors, from the top
+
             Returns:
             item_content_groups - content groups assigned to indexed item
             """
+            item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             is_indexable = hasattr(item, "index_dictionary")
-            item_index_dictionary = item.index_dictionary() if is_indexable else None
+            item_index_dictionary = None
+            # the index dictionary of an item already in the index is only
+            # needed if the item turns out to have changed
+            if is_indexable and (previous_fingerprints is None or item_id not in previous_fingerprints):
+                item_index_dictionary = item.index_dictionary()
+                is_indexable = bool(item_index_dictionary)
             # if it's not indexable and it does not have children, then ignore
-            if not item_index_dictionary and not item.has_children:
+            if not is_indexable and not item.has_children:
                 return
 
             item_content_groups = None
@@ -208,12 +235,13 @@ class SearchIndexerBase(object):
                 item_location = get_item_location(item)
                 item_content_groups = groups_usage_info.get(unicode(item_location), None)
 
-            item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
             if item.has_children:
                 # determine if it's okay to skip adding the children herein based upon how recently any may have changed
-                skip_child_index = skip_index or \
-                    (triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age)
+                skip_child_index = skip_index or (
+                    previous_fingerprints is None and triggered_at is not None and
+                    (triggered_at - item.subtree_edited_on) > reindex_age
+                )
                 children_groups_usage = []
                 for child_item in item.get_children():
                     if modulestore.has_published_version(child_item):
@@ -221,18 +249,30 @@ class SearchIndexerBase(object):
                             prepare_item_index(
                                 child_item,
                                 skip_index=skip_child_index,
-                                groups_usage_info=groups_usage_info
+                                groups_usage_info=groups_usage_info,
+                                ancestor_names=ancestor_names + (item.display_name,),
                             )
                         )
                 if None in children_groups_usage:
                     item_content_groups = None
 
-            if skip_index or not item_index_dictionary:
+            if not is_indexable:
                 return
 
+            fingerprint = cls._fingerprint(item, item_content_groups, ancestor_names)
+            if skip_index or (previous_fingerprints and previous_fingerprints.get(item_id) == fingerprint):
+                fingerprints[item_id] = fingerprint
+                return item_content_groups
+
             item_index = {}
             # if it has something to add to the index, then add it
             try:
+                if item_index_dictionary is None:
+                    item_index_dictionary = item.index_dictionary()
+                    if not item_index_dictionary:
+                        if not item.has_children:
+                            indexed_items.discard(item_id)
+                        return
                 item_index.update(location_info)
                 item_index.update(item_index_dictionary)
                 item_index['id'] = item_id
@@ -241,7 +281,11 @@ class SearchIndexerBase(object):
                 item_index['content_groups'] = item_content_groups if item_content_groups else None
                 item_index.update(cls.supplemental_fields(item))
                 items_index.append(item_index)
+                if len(items_index) >= batch_size:
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                    del items_index[:]
                 indexed_count["count"] += 1
+                fingerprints[item_id] = fingerprint
                 return item_content_groups
             except Exception as err:  # pylint: disable=broad-except
                 # broad exception so that index operation does not fail on one item of many
@@ -251,6 +295,12 @@ class SearchIndexerBase(object):
         try:
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
                 structure = cls._fetch_top_level(modulestore, structure_key)
+                version = getattr(structure, 'course_version', None)
+                version = unicode(version) if version is not None else None
+                if previous_state and version is not None and previous_state['version'] == version:
+                    # this version has already been indexed
+                    return 0
+
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
@@ -258,9 +308,21 @@ class SearchIndexerBase(object):
 
                 # Now index the content
                 for item in structure.get_children():
-                    prepare_item_index(item, groups_usage_info=groups_usage_info)
-                searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                    prepare_item_index(
+                        item,
+                        groups_usage_info=groups_usage_info,
+                        ancestor_names=(structure.display_name,),
+                    )
+                if items_index:
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                if previous_fingerprints is None:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                else:
+                    # only the items which were in the index last time can be in it now
+                    removed_items = set(previous_fingerprints) - indexed_items
+                    if removed_items:
+                        searcher.remove(cls.DOCUMENT_TYPE, list(removed_items))
+                cls._set_index_state(structure_key, {'version': version, 'items': fingerprints})
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -269,12 +331,72 @@ class SearchIndexerBase(object):
                 err
             )
             error_list.append(_('General indexing error occurred'))
+            # some of the index may have been updated, so what was last indexed is no longer known
+            cls._delete_index_state(structure_key)
 
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
         return indexed_count["count"]
 
+    @classmethod
+    def _fingerprint(cls, item, content_groups, ancestor_names):
+        """
+        Returns a digest of everything which goes into the item's index, other
+        than its identity: its own fields, as of when they were last edited,
+        and the start date, content groups and location path which it gets
+        from its place in the structure.
+        """
+        values = [item.edited_on, item.start, content_groups, ancestor_names]
+        return hashlib.sha1(json.dumps(values, default=unicode)).hexdigest()[:16]
+
+    @classmethod
+    def _index_state_cache(cls):
+        """
+        Returns the cache and timeout for what was last indexed of each
+        structure, or None if the SEARCH_INDEXING setting disables it.
+        """
+        config = getattr(settings, 'SEARCH_INDEXING', {})
+        timeout = config.get('STATE_TIMEOUT', 0)
+        if not timeout:
+            return None
+        return caches[config.get('CACHE_ALIAS', 'default')], timeout
+
+    @classmethod
+    def _index_state_key(cls, structure_key):
+        """ Returns the cache key of what was last indexed of the structure """
+        return u'search_index_state.{}.{}'.format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _get_index_state(cls, structure_key):
+        """
+        Returns what was last indexed of the structure, as a dictionary of the
+        structure's version and the fingerprints of its items in the index by
+        their ids, or None if it isn't known.
+        """
+        state_cache = cls._index_state_cache()
+        if state_cache is None:
+            return None
+        data = state_cache[0].get(cls._index_state_key(structure_key))
+        if data is None:
+            return None
+        return json.loads(zlib.decompress(data))
+
+    @classmethod
+    def _set_index_state(cls, structure_key, state):
+        """ Remembers what was last indexed of the structure """
+        state_cache = cls._index_state_cache()
+        if state_cache is not None:
+            cache, timeout = state_cache
+            cache.set(cls._index_state_key(structure_key), zlib.compress(json.dumps(state)), timeout)
+
+    @classmethod
+    def _delete_index_state(cls, structure_key):
+        """ Forgets what was last indexed of the structure """
+        state_cache = cls._index_state_cache()
+        if state_cache is not None:
+            state_cache[0].delete(cls._index_state_key(structure_key))
+
     @classmethod
     def _do_reindex(cls, modulestore, structure_key):
         """
@@ -0,0 +1,100 @@
+"""
+Benchmark the codecs for the course structures cached by the split modulestore.
+
+Reads the current structures of split courses from Mongo, then encodes and
+decodes all of them with every codec that's installed.  For each codec, prints
+the total size of the encoded structures and the fastest of several runs
+encoding and decoding them, so that COURSE_STRUCTURE_CACHE_SERIALIZER and
+COURSE_STRUCTURE_CACHE_COMPRESSOR can be chosen using real courses.
+"""
+from __future__ import division, print_function
+
+from textwrap import dedent
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo.mongo_connection import structure_from_mongo
+from xmodule.modulestore.split_mongo.structure_cache_codec import COMPRESSORS, SERIALIZERS, StructureCodec
+
+
+class Command(BaseCommand):
+    """Benchmark the course structure cache codecs"""
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids',
+            nargs='*',
+            help='the courses whose structures are used; all the split courses if none are given',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='the number of times to encode and decode the structures with each codec',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_keys = [CourseKey.from_string(course_id) for course_id in options['course_ids']]
+        except InvalidKeyError as error:
+            raise CommandError(u'Invalid course_id: {}'.format(error))
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)  # pylint: disable=protected-access
+        structures = self._read_structures(store, course_keys or None)
+        if not structures:
+            raise CommandError('No split course structures found.')
+
+        print(u'{} structures with {} blocks'.format(
+            len(structures), sum(len(structure['blocks']) for structure in structures)
+        ))
+        print(u'{:<16} {:>14} {:>12} {:>12}'.format('codec', 'size (bytes)', 'encode (ms)', 'decode (ms)'))
+        for serializer in sorted(SERIALIZERS):
+            for compressor in sorted(COMPRESSORS):
+                if not (SERIALIZERS[serializer].available and COMPRESSORS[compressor].available):
+                    continue
+                size, encode_time, decode_time = self._benchmark(
+                    StructureCodec(serializer, compressor), structures, options['repeat']
+                )
+                print(u'{:<16} {:>14} {:>12.1f} {:>12.1f}'.format(
+                    '{}+{}'.format(serializer, compressor), size, encode_time * 1000, decode_time * 1000
+                ))
+
+    def _read_structures(self, store, course_keys):
+        """
+        Return the current structures of the courses in `course_keys`, or of all the courses if it's None.
+        """
+        structure_ids = set()
+        for index in store.find_matching_course_indexes(course_keys=course_keys):
+            structure_ids.update(index['versions'].values())
+
+        # Read straight from Mongo, so the structures are as they are before any caching.
+        return [
+            structure_from_mongo(doc)
+            for doc in store.db_connection.structures.find({'_id': {'$in': list(structure_ids)}})
+        ]
+
+    def _benchmark(self, codec, structures, repeat):
+        """
+        Return the total encoded size of `structures`, and the fastest times to encode and decode them with `codec`.
+        """
+        encode_times = []
+        decode_times = []
+        for __ in range(repeat):
+            start = default_timer()
+            encoded = [codec.encode(structure) for structure in structures]
+            encode_times.append(default_timer() - start)
+
+            start = default_timer()
+            for data in encoded:
+                codec.decode(data)
+            decode_times.append(default_timer() - start)
+
+        return sum(len(data) for data in encoded), min(encode_times), min(decode_times)
@@ -14,20 +14,15 @@ At present, it differs from Studio exports in several ways:
 * It only supports the export of courses.  It does not export libraries.
 """
 
-import os
 import re
-import shutil
-import tarfile
-from tempfile import mkdtemp, mktemp
 from textwrap import dedent
 
 from django.core.management.base import BaseCommand, CommandError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
-from path import Path as path
 
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar
 
 
 class Command(BaseCommand):
@@ -51,40 +46,42 @@ class Command(BaseCommand):
             raise CommandError("Insufficient arguments")
 
         filename = options['output']
-        pipe_results = False
 
         if filename is None:
-            filename = mktemp()
-            pipe_results = True
+            # The archive is written to stdout as it's exported.
+            export_course_to_stream(course_key, OutputStream(self.stdout))
+        else:
+            export_course_to_tarfile(course_key, filename)
 
-        export_course_to_tarfile(course_key, filename)
 
-        results = self._get_results(filename) if pipe_results else None
-
-        self.stdout.write(results, ending="")
+class OutputStream(object):
+    """
+    A file object writing the bytes written to it to a command's stdout, unchanged.
+    """
+    def __init__(self, stdout):
+        self.stdout = stdout
 
-    def _get_results(self, filename):
-        """Load results from file"""
-        with open(filename) as f:
-            results = f.read()
-            os.remove(filename)
-        return results
+    def write(self, data):
+        """Write data to stdout."""
+        self.stdout.write(data, ending='')
 
 
 def export_course_to_tarfile(course_key, filename):
     """Exports a course into a tar.gz file"""
-    tmp_dir = mkdtemp()
-    try:
-        course_dir = export_course_to_directory(course_key, tmp_dir)
-        compress_directory(course_dir, filename)
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
-
-
-def export_course_to_directory(course_key, root_dir):
-    """Export course into a directory"""
-    store = modulestore()
-    course = store.get_course(course_key)
+    course_id, course_dir = get_course_export_dir(course_key)
+    with open(filename, 'wb') as tar_file:
+        export_course_to_tar(modulestore(), None, course_id, tar_file, course_dir)
+
+
+def export_course_to_stream(course_key, fileobj):
+    """Exports a course as a tar.gz archive written to fileobj as it's exported"""
+    course_id, course_dir = get_course_export_dir(course_key)
+    export_course_to_tar(modulestore(), None, course_id, fileobj, course_dir)
+
+
+def get_course_export_dir(course_key):
+    """Return the id of the course and the name of the directory to export it into"""
+    course = modulestore().get_course(course_key)
     if course is None:
         raise CommandError("Invalid course_id")
 
@@ -94,16 +91,4 @@ def export_course_to_directory(course_key, root_dir):
     replacement_char = u'-'
     course_dir = replacement_char.join([course.id.org, course.id.course, course.id.run])
     course_dir = re.sub(r'[^\w\.\-]', replacement_char, course_dir)
-
-    export_course_to_xml(store, None, course.id, root_dir, course_dir)
-
-    export_dir = path(root_dir) / course_dir
-    return export_dir
-
-
-def compress_directory(directory, filename):
-    """Compress a directory into a tar.gz file"""
-    mode = 'w:gz'
-    name = path(directory).name
-    with tarfile.open(filename, mode) as tar_file:
-        tar_file.add(directory, arcname=name)
+    return course.id, course_dir
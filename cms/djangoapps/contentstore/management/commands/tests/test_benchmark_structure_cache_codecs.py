@@ -0,0 +1,38 @@
+"""
+Tests for the benchmark_structure_cache_codecs management command
+"""
+import mock
+from django.core.management import CommandError, call_command
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestBenchmarkStructureCacheCodecs(SharedModuleStoreTestCase):
+    """
+    Tests for the benchmark_structure_cache_codecs management command
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestBenchmarkStructureCacheCodecs, cls).setUpClass()
+        cls.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        ItemFactory.create(parent=cls.course, category='chapter')
+
+    @mock.patch('contentstore.management.commands.benchmark_structure_cache_codecs.print', create=True)
+    def test_benchmark(self, mock_print):
+        call_command('benchmark_structure_cache_codecs', unicode(self.course.id), '--repeat', '1')
+
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertRegexpMatches(printed[0], r'^\d+ structures with \d+ blocks$')
+        codecs = [line.split()[0] for line in printed[2:]]
+        self.assertIn('pickle+zlib', codecs)
+        self.assertIn('compact+zlib', codecs)
+
+    def test_invalid_course_key(self):
+        with self.assertRaisesRegexp(CommandError, 'Invalid course_id'):
+            call_command('benchmark_structure_cache_codecs', 'not/a/course/key/at/all')
+
+    def test_no_structures(self):
+        with self.assertRaisesRegexp(CommandError, 'No split course structures found'):
+            call_command('benchmark_structure_cache_codecs', 'course-v1:org+missing+run')
@@ -397,6 +397,7 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         indexed_count = self.reindex_course(store)
         self.assertFalse(indexed_count)
 
+    @patch('django.conf.settings.SEARCH_INDEXING', {'STATE_TIMEOUT': 0})
     def _test_time_based_index(self, store):
         """ Make sure that a time based request to index does not index anything too old """
         self.publish_item(store, self.vertical.location)
@@ -441,6 +442,51 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_incremental_index(self, store):
+        """ Make sure that an update only indexes what changed since the course was last indexed """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        # long enough ago that a time based index would index everything
+        since_time = datetime(2015, 1, 1, tzinfo=UTC)
+        indexed_count = self.index_recent_changes(store, since_time)
+        self.assertEqual(indexed_count, 0)
+
+        # renaming the sequential changes the location of everything within it
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            sequential = store.get_item(self.sequential.location)
+        sequential.display_name = "Lesson One"
+        self.update_item(store, sequential)
+        self.publish_item(store, self.sequential.location)
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            indexed_count = self.index_recent_changes(store, since_time)
+        self.assertEqual(indexed_count, 3)
+        indexed_content = [item for kall in mock_index.call_args_list for item in kall[0][1]]
+        self.assertEqual(
+            sorted(item['id'] for item in indexed_content),
+            sorted(unicode(item.location) for item in (self.sequential, self.vertical, self.html_unit)),
+        )
+        for item in indexed_content:
+            self.assertEqual(item['location'][1], "Lesson One")
+
+        # only the items which were indexed can have been deleted
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        with patch(settings.SEARCH_ENGINE + '.search') as mock_search:
+            self.index_recent_changes(store, since_time)
+        self.assertFalse(mock_search.called)
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
+    @patch('django.conf.settings.SEARCH_INDEXING', {'BATCH_SIZE': 3})
+    def _test_index_batches(self, store):
+        """ Make sure that documents are sent to the search engine in batches """
+        self.publish_item(store, self.vertical.location)
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            self.reindex_course(store)
+        self.assertEqual([len(kall[0][1]) for kall in mock_index.call_args_list], [3, 1])
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -572,6 +618,14 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_incremental_index(self, store_type):
+        self._perform_test_using_store(store_type, self._test_incremental_index)
+
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_index_batches(self, store_type):
+        self._perform_test_using_store(store_type, self._test_index_batches)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
@@ -10,6 +10,7 @@ from uuid import uuid4
 import ddt
 import pytest
 from django.conf import settings
+from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.utils import translation
 from mock import Mock, patch
@@ -387,6 +388,29 @@ class TestGenerateSubsFromSource(TestDownloadYoutubeSubs):
 
         self.clear_subs_content(youtube_subs)
 
+    @patch('xmodule.video_module.transcripts_utils.cache_transcript_formats')
+    def test_formats_precomputed_from_speed_1_subs(self, mock_cache_formats):
+        youtube_subs = {
+            0.5: 'JMD_ifUUfsU',
+            1.0: 'hI10vDNYz4M',
+            2.0: 'AKqURZnYqpk'
+        }
+        srt_filedata = textwrap.dedent("""
+            1
+            00:00:10,500 --> 00:00:13,000
+            Elephant's Dream
+        """)
+        self.clear_subs_content(youtube_subs)
+
+        transcripts_utils.generate_subs_from_source(youtube_subs, 'srt', srt_filedata, self.course)
+
+        content_location = StaticContent.compute_location(self.course.id, 'subs_hI10vDNYz4M.srt.sjson')
+        mock_cache_formats.assert_called_once_with(
+            contentstore().find(content_location).data, 'sjson', speeds={0.5, 1.0, 2.0}
+        )
+
+        self.clear_subs_content(youtube_subs)
+
     def test_fail_bad_subs_type(self):
         youtube_subs = {
             0.5: 'JMD_ifUUfsU',
@@ -651,6 +675,95 @@ class TestTranscript(unittest.TestCase):
             transcripts_utils.Transcript.asset(None, None, filename=transcripts_utils.NON_EXISTENT_TRANSCRIPT)
 
 
+@override_settings(
+    CACHES={'transcripts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'transcripts'}},
+    TRANSCRIPT_CONVERSION_CACHE={'CACHE_ALIAS': 'transcripts', 'TIMEOUT': 60, 'MAX_ENTRY_SIZE': 10000},
+)
+class TestTranscriptConversionCache(SimpleTestCase):
+    """
+    Tests for caching the transcripts converted by `Transcript.convert`.
+    """
+    def setUp(self):
+        super(TestTranscriptConversionCache, self).setUp()
+        self.cache = transcripts_utils.get_transcript_conversion_cache()
+        self.cache.clear()
+        self.sjson_transcript = json.dumps({'start': [1000], 'end': [2000], 'text': ['Elephant&#39;s Dream']})
+        patcher = patch.object(
+            transcripts_utils.Transcript, 'convert_format', wraps=transcripts_utils.Transcript.convert_format
+        )
+        self.convert_format = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_convert_cached(self):
+        """
+        Tests that a transcript is only converted the first time.
+        """
+        first = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        second = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        self.assertEqual(first, second)
+        self.assertEqual(self.convert_format.call_count, 1)
+
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'txt')
+        self.assertEqual(self.convert_format.call_count, 2)
+
+    def test_convert_speed(self):
+        """
+        Tests that sjson output is scaled to the speed, and cached per speed.
+        """
+        slow = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'sjson', speed=0.75)
+        self.assertEqual(json.loads(slow), {'start': [750], 'end': [1500], 'text': ['Elephant&#39;s Dream']})
+        fast = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'sjson', speed=1.5)
+        self.assertEqual(json.loads(fast)['start'], [1500])
+        same = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'sjson')
+        self.assertEqual(same, self.sjson_transcript)
+
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'sjson', speed=0.75)
+        self.assertEqual(self.convert_format.call_count, 2)
+
+    def test_too_large(self):
+        """
+        Tests that transcripts larger than MAX_ENTRY_SIZE aren't cached.
+        """
+        config = {'CACHE_ALIAS': 'transcripts', 'TIMEOUT': 60, 'MAX_ENTRY_SIZE': 10}
+        with override_settings(TRANSCRIPT_CONVERSION_CACHE=config):
+            transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+            transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        self.assertEqual(self.convert_format.call_count, 2)
+
+    def test_invalid_not_cached(self):
+        """
+        Tests that transcripts which can't be converted aren't cached, and are skipped when precomputing.
+        """
+        for __ in range(2):
+            with self.assertRaises(transcripts_utils.TranscriptsGenerationException):
+                transcripts_utils.Transcript.convert('invalid SubRip file content', 'srt', 'sjson')
+        self.assertEqual(self.convert_format.call_count, 2)
+        transcripts_utils.cache_transcript_formats('invalid SubRip file content', 'srt')
+
+    def test_cache_transcript_formats(self):
+        """
+        Tests that precomputed formats are served from the cache.
+        """
+        transcripts_utils.cache_transcript_formats(self.sjson_transcript, 'sjson', speeds=(1.0, 0.75))
+        self.assertEqual(self.convert_format.call_count, 3)
+
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'txt')
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'sjson', speed=0.75)
+        self.assertEqual(self.convert_format.call_count, 3)
+
+    @override_settings(TRANSCRIPT_CONVERSION_CACHE={'TIMEOUT': 0})
+    def test_disabled(self):
+        """
+        Tests that transcripts are converted every time when the cache is disabled.
+        """
+        self.assertIsNone(transcripts_utils.get_transcript_conversion_cache())
+        transcripts_utils.cache_transcript_formats(self.sjson_transcript, 'sjson')
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt')
+        self.assertEqual(self.convert_format.call_count, 2)
+
+
 class TestSubsFilename(unittest.TestCase):
     """
     Tests for subs_filename funtion.
@@ -131,6 +131,7 @@ from lms.envs.common import (
     # Video Image settings
     VIDEO_IMAGE_SETTINGS,
     VIDEO_TRANSCRIPTS_SETTINGS,
+    TRANSCRIPT_CONVERSION_CACHE,
 
     RETIRED_USERNAME_PREFIX,
     RETIRED_USERNAME_FMT,
@@ -612,6 +613,19 @@ MODULESTORE = {
     }
 }
 
+# Decoded course structures are kept in a least-recently-used cache in each
+# process, bounded by the total number of blocks in the cached structures.
+# 0 disables it; deployments enable it by setting a size, e.g. 20000.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS = 0
+
+# How course structures are encoded in the 'course_structure_cache'. The
+# serializer is 'pickle' or 'compact' (msgpack, with interned block keys), and
+# the compressor 'zlib', 'lz4' (needs the lz4 package) or 'none'. Structures
+# written with any of these can be read whatever they're set to, but processes
+# running older code can only read 'pickle' and 'zlib'.
+COURSE_STRUCTURE_CACHE_SERIALIZER = 'compact'
+COURSE_STRUCTURE_CACHE_COMPRESSOR = 'zlib'
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
@@ -697,6 +711,9 @@ MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 
 COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# The number of static files saved to the contentstore at once when importing a course
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 4
+
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
 
@@ -1416,6 +1433,18 @@ ELASTIC_FIELD_MAPPINGS = {
     }
 }
 
+# The courseware and library search indexers remember the version and items
+# they last indexed of each course and library, in the Django cache named by
+# CACHE_ALIAS, so that a publish only reindexes the items that it changed.
+#   STATE_TIMEOUT: seconds to remember them; 0 disables this, so that a publish
+#     reindexes whatever was edited in the minute before it.
+#   BATCH_SIZE: number of documents sent to the search engine at a time.
+SEARCH_INDEXING = {
+    'CACHE_ALIAS': 'default',
+    'STATE_TIMEOUT': 7 * 24 * 60 * 60,
+    'BATCH_SIZE': 500,
+}
+
 XBLOCK_SETTINGS = {
     "VideoDescriptor": {
         "licensing_enabled": FEATURES.get("LICENSING", False)
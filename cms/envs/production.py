@@ -368,6 +368,10 @@ else:
 
 USER_TASKS_ARTIFACT_STORAGE = COURSE_IMPORT_EXPORT_STORAGE
 
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = ENV_TOKENS.get(
+    'COURSE_IMPORT_STATIC_CONTENT_WORKERS', COURSE_IMPORT_STATIC_CONTENT_WORKERS
+)
+
 DATABASES = AUTH_TOKENS['DATABASES']
 
 # The normal database user does not have enough permissions to run migrations.
@@ -385,6 +389,15 @@ for name, database in DATABASES.items():
         })
 
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS', COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS
+)
+COURSE_STRUCTURE_CACHE_SERIALIZER = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_SERIALIZER', COURSE_STRUCTURE_CACHE_SERIALIZER
+)
+COURSE_STRUCTURE_CACHE_COMPRESSOR = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_COMPRESSOR', COURSE_STRUCTURE_CACHE_COMPRESSOR
+)
 
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ENV_TOKENS.get(
     'MODULESTORE_FIELD_OVERRIDE_PROVIDERS',
@@ -484,6 +497,7 @@ VIDEO_IMAGE_SETTINGS = ENV_TOKENS.get('VIDEO_IMAGE_SETTINGS', VIDEO_IMAGE_SETTIN
 ################ VIDEO TRANSCRIPTS STORAGE ###############
 
 VIDEO_TRANSCRIPTS_SETTINGS = ENV_TOKENS.get('VIDEO_TRANSCRIPTS_SETTINGS', VIDEO_TRANSCRIPTS_SETTINGS)
+TRANSCRIPT_CONVERSION_CACHE.update(ENV_TOKENS.get('TRANSCRIPT_CONVERSION_CACHE', {}))
 
 ################ PUSH NOTIFICATIONS ###############
 
@@ -499,6 +513,7 @@ if FEATURES['ENABLE_COURSEWARE_INDEX'] or FEATURES['ENABLE_LIBRARY_INDEX']:
     SEARCH_ENGINE = "search.elastic.ElasticSearchEngine"
 
 ELASTIC_SEARCH_CONFIG = ENV_TOKENS.get('ELASTIC_SEARCH_CONFIG', [{}])
+SEARCH_INDEXING.update(ENV_TOKENS.get('SEARCH_INDEXING', {}))
 
 XBLOCK_SETTINGS = ENV_TOKENS.get('XBLOCK_SETTINGS', {})
 XBLOCK_SETTINGS.setdefault("VideoDescriptor", {})["licensing_enabled"] = FEATURES.get("LICENSING", False)
@@ -6,10 +6,11 @@ from __future__ import absolute_import
 
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 
-from xmodule.util.sandboxing import can_execute_unsafe_code
+from xmodule.util.sandboxing import can_execute_unsafe_code, get_safe_exec_cache
 
 
 class SandboxingTest(TestCase):
@@ -40,3 +41,25 @@ class SandboxingTest(TestCase):
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2012_Fall')))
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2013_Spring')))
         self.assertFalse(can_execute_unsafe_code(LibraryLocator('edX', 'test_bank')))
+
+
+@patch('xmodule.util.sandboxing._SAFE_EXEC_CACHE', None)
+class SafeExecCacheTest(TestCase):
+    """
+    Test the process-wide safe_exec cache
+    """
+    @override_settings(SAFE_EXEC_CACHE={'CACHE_ALIAS': 'default', 'LOCAL_SIZE': 10})
+    def test_shared_between_courses(self):
+        """
+        Test that the caches of all courses share the process-local tier and the lookup counts
+        """
+        course_key = CourseLocator('edX', 'full', '2012_Fall')
+        cache = get_safe_exec_cache(course_key)
+        other_cache = get_safe_exec_cache(CourseLocator('edX', 'full', '2013_Spring'))
+        self.assertEqual(cache.local_size, 10)
+
+        cache.set('key', 17)
+        self.assertEqual(other_cache.get('key'), 17)
+
+        cache.record_lookup('problem', True)
+        self.assertEqual(other_cache.lookup_counts(), {(course_key, 'problem'): (1, 0)})
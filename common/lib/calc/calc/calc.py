@@ -8,6 +8,8 @@ from __future__ import absolute_import
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 from pyparsing import (
@@ -83,6 +85,12 @@ SUFFIXES = {
     '%': 0.01,
 }
 
+# Maximum number of parsed expressions kept by `parse_expression`.
+PARSE_CACHE_SIZE = 1024
+
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
 
 class UndefinedVariable(Exception):
     """
@@ -133,6 +141,15 @@ def eval_number(parse_result):
     return super_float("".join(parse_result))
 
 
+def is_value(token):
+    """
+    Return whether `token` is an evaluated value rather than an operator string.
+
+    Values are numbers, or NumPy arrays when evaluating many samples at once.
+    """
+    return isinstance(token, (numbers.Number, numpy.ndarray))
+
+
 def eval_atom(parse_result):
     """
     Return the value wrapped by the atom.
@@ -140,7 +157,7 @@ def eval_atom(parse_result):
     In the case of parenthesis, ignore them.
     """
     # Find first number in the list
-    result = next(k for k in parse_result if isinstance(k, numbers.Number))
+    result = next(k for k in parse_result if is_value(k))
     return result
 
 
@@ -154,7 +171,7 @@ def eval_power(parse_result):
     # `reduce` will go from left to right; reverse the list.
     parse_result = reversed(
         [k for k in parse_result
-         if isinstance(k, numbers.Number)]  # Ignore the '^' marks.
+         if is_value(k)]  # Ignore the '^' marks.
     )
     # Having reversed it, raise `b` to the power of `a`.
     power = reduce(lambda a, b: b ** a, parse_result)
@@ -169,14 +186,20 @@ def eval_parallel(parse_result):
       out = 1 / (1/in1 + 1/in2 + ...)
     e.g. [ 1, 2 ] -> 2/3
 
-    Return NaN if there is a zero among the inputs.
+    Return NaN if there is a zero among the inputs. For arrays of samples,
+    only the samples with a zero input are NaN.
     """
     if len(parse_result) == 1:
         return parse_result[0]
-    if 0 in parse_result:
+    values = [e for e in parse_result if is_value(e)]
+    if any(isinstance(e, numpy.ndarray) for e in values):
+        has_zero = reduce(numpy.logical_or, [numpy.equal(e, 0) for e in values])
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            result = 1. / sum(1. / e for e in values)
+        return numpy.where(has_zero, float('nan'), result)
+    if 0 in values:
         return float('nan')
-    reciprocals = [1. / e for e in parse_result
-                   if isinstance(e, numbers.Number)]
+    reciprocals = [1. / e for e in values]
     return 1. / sum(reciprocals)
 
 
@@ -191,12 +214,12 @@ def eval_sum(parse_result):
     total = 0.0
     current_op = operator.add
     for token in parse_result:
-        if token == '+':
+        if is_value(token):
+            total = current_op(total, token)
+        elif token == '+':
             current_op = operator.add
         elif token == '-':
             current_op = operator.sub
-        else:
-            total = current_op(total, token)
     return total
 
 
@@ -209,23 +232,23 @@ def eval_product(parse_result):
     prod = 1.0
     current_op = operator.mul
     for token in parse_result:
-        if token == '*':
+        if is_value(token):
+            prod = current_op(prod, token)
+        elif token == '*':
             current_op = operator.mul
         elif token == '/':
             current_op = operator.truediv
-        else:
-            prod = current_op(prod, token)
     return prod
 
 
-def add_defaults(variables, functions, case_sensitive):
+def add_defaults(variables, user_functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
     """
     all_variables = dict(DEFAULT_VARIABLES)
     all_functions = dict(DEFAULT_FUNCTIONS)
     all_variables.update(variables)
-    all_functions.update(functions)
+    all_functions.update(user_functions)
 
     if not case_sensitive:
         all_variables = lower_dict(all_variables)
@@ -234,7 +257,42 @@ def add_defaults(variables, functions, case_sensitive):
     return (all_variables, all_functions)
 
 
-def evaluator(variables, functions, math_expr, case_sensitive=False):
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return a parsed `ParseAugmenter` for `math_expr`.
+
+    Parsing with pyparsing is by far the slowest part of evaluating an
+    expression, so the most recently used `PARSE_CACHE_SIZE` parses are kept,
+    keyed by `(math_expr, case_sensitive)`. A parsed `ParseAugmenter` is never
+    modified afterwards, so it is safe to share between callers.
+    """
+    key = (math_expr, case_sensitive)
+    with _PARSE_CACHE_LOCK:
+        math_interpreter = _PARSE_CACHE.pop(key, None)
+        if math_interpreter is not None:
+            _PARSE_CACHE[key] = math_interpreter
+            return math_interpreter
+
+    check_parens(math_expr)
+    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+    math_interpreter.parse_algebra()
+
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = math_interpreter
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return math_interpreter
+
+
+def clear_parse_cache():
+    """
+    Empty the cache used by `parse_expression`.
+    """
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE.clear()
+
+
+def evaluator(variables, user_functions, math_expr, case_sensitive=False):
     """
     Evaluate an expression; that is, take a string of math and return a float.
 
@@ -246,13 +304,40 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    check_parens(math_expr)
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    math_interpreter = parse_expression(math_expr, case_sensitive)
+    return evaluate_tree(math_interpreter, variables, user_functions, case_sensitive)
 
+
+def vectorized_evaluator(variables, user_functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression over many samples of its variables in one pass.
+
+    Like `evaluator`, but the variables are NumPy arrays holding one value
+    per sample, and the result is an array with the value of the expression
+    for each sample. The functions must accept arrays; most of the default
+    ones do, but e.g. `fact` does not. Unlike `evaluator`, operations which
+    fail for a single sample (such as dividing by zero) don't raise but give
+    `inf` or `nan` for that sample.
+    """
+    arrays = [numpy.asarray(value) for value in variables.values()]
+    shape = numpy.broadcast(*arrays).shape if arrays else ()
+
+    if math_expr.strip() == "":
+        return numpy.full(shape, float('nan'))
+
+    math_interpreter = parse_expression(math_expr, case_sensitive)
+    variables = {name: numpy.asarray(value) for name, value in six.iteritems(variables)}
+    result = evaluate_tree(math_interpreter, variables, user_functions, case_sensitive)
+    # Expressions which don't use the variables evaluate to a single number.
+    return numpy.broadcast_to(result, shape)
+
+
+def evaluate_tree(math_interpreter, variables, user_functions, case_sensitive=False):
+    """
+    Evaluate the tree of a parsed `ParseAugmenter` with the given variables and functions.
+    """
     # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+    all_variables, all_functions = add_defaults(variables, user_functions, case_sensitive)
 
     # ...and check them
     math_interpreter.check_variables(all_variables, all_functions)
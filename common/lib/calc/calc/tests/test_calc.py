@@ -4,6 +4,7 @@ Unit tests for calc.py
 
 from __future__ import absolute_import
 import unittest
+import mock
 import numpy
 import calc
 from pyparsing import ParseException
@@ -556,3 +557,122 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({}, {}, "(1+2")
         with self.assertRaisesRegexp(calc.UnmatchedParenthesis, 'no matching opening parenthesis'):
             calc.evaluator({}, {}, "(1+2))")
+
+
+class ParseCacheTest(unittest.TestCase):
+    """
+    Run tests for the cache of parsed expressions used by calc.evaluator
+    """
+
+    def setUp(self):
+        super(ParseCacheTest, self).setUp()
+        calc.clear_parse_cache()
+        self.addCleanup(calc.clear_parse_cache)
+
+    def test_reuses_parse(self):
+        """
+        The same expression is only parsed once per case sensitivity.
+        """
+        first = calc.parse_expression("x^2 + 1")
+        self.assertIs(calc.parse_expression("x^2 + 1"), first)
+        self.assertIsNot(calc.parse_expression("x^2 + 1", case_sensitive=True), first)
+
+        self.assertEqual(calc.evaluator({'x': 2.0}, {}, "x^2 + 1"), 5.0)
+        self.assertEqual(calc.evaluator({'x': 3.0}, {}, "x^2 + 1"), 10.0)
+
+    def test_cached_parse_checks_variables(self):
+        """
+        Variables are still checked when the parse comes from the cache.
+        """
+        self.assertEqual(calc.evaluator({'x': 1.0, 'y': 2.0}, {}, "x+y"), 3.0)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, r'y'):
+            calc.evaluator({'x': 1.0}, {}, "x+y")
+
+    def test_bounded(self):
+        """
+        The least recently used parses are dropped once the cache is full.
+        """
+        with mock.patch.object(calc.calc, 'PARSE_CACHE_SIZE', 2):
+            first = calc.parse_expression("1")
+            calc.parse_expression("2")
+            self.assertIs(calc.parse_expression("1"), first)
+            calc.parse_expression("3")
+
+        # "2" was the least recently used, so it was dropped.
+        cached = sorted(expr for expr, _ in calc.calc._PARSE_CACHE)  # pylint: disable=protected-access
+        self.assertEqual(cached, ["1", "3"])
+        self.assertIs(calc.parse_expression("1"), first)
+
+
+class VectorizedEvaluatorTest(unittest.TestCase):
+    """
+    Run tests for calc.vectorized_evaluator
+    """
+
+    def assert_matches_evaluator(self, math_expr, variables, case_sensitive=False):
+        """
+        Check that evaluating all samples at once gives what `evaluator` gives per sample.
+        """
+        results = calc.vectorized_evaluator(
+            {name: numpy.array(values) for name, values in variables.items()},
+            {},
+            math_expr,
+            case_sensitive=case_sensitive,
+        )
+        num_samples = len(list(variables.values())[0])
+        self.assertEqual(results.shape, (num_samples,))
+        for index, result in enumerate(results):
+            expected = calc.evaluator(
+                {name: values[index] for name, values in variables.items()},
+                {},
+                math_expr,
+                case_sensitive=case_sensitive,
+            )
+            self.assertAlmostEqual(result, expected)
+
+    def test_matches_evaluator(self):
+        """
+        Check operators, functions, constants and suffixes against `evaluator`.
+        """
+        samples = {'x': [0.5, 1.0, 2.5, -3.0], 'y': [1.0, 7.0, -2.0, 0.25]}
+        for math_expr in [
+                "x + y",
+                "-x - 2*y + 3",
+                "x*y/2",
+                "abs(x)^2^y",
+                "2^x",
+                "x || y",
+                "sin(x) + cos(y)^2",
+                "sqrt(x)",
+                "ln(y) * i",
+                "5%*x + 1e3",
+                "pi*e*(x - y)",
+        ]:
+            self.assert_matches_evaluator(math_expr, samples)
+
+        self.assert_matches_evaluator("X + y", {'X': [1.0, 2.0], 'y': [3.0, 4.0]}, case_sensitive=True)
+
+    def test_constant_expression(self):
+        """
+        Expressions which don't use the variables still give one result per sample.
+        """
+        results = calc.vectorized_evaluator({'x': numpy.array([1.0, 2.0, 3.0])}, {}, "2*pi")
+        self.assertEqual(list(results), [2 * numpy.pi] * 3)
+
+        results = calc.vectorized_evaluator({'x': numpy.array([1.0, 2.0])}, {}, "  ")
+        self.assertTrue(numpy.all(numpy.isnan(results)))
+
+    def test_parallel_with_zero(self):
+        """
+        Only the samples with a zero resistor are NaN.
+        """
+        results = calc.vectorized_evaluator({'x': numpy.array([0.0, 1.0])}, {}, "x || 1")
+        self.assertTrue(numpy.isnan(results[0]))
+        self.assertEqual(results[1], 0.5)
+
+    def test_undefined_vars(self):
+        """
+        Variables are checked as they are by `evaluator`.
+        """
+        with self.assertRaisesRegexp(calc.UndefinedVariable, r'y'):
+            calc.vectorized_evaluator({'x': numpy.array([1.0])}, {}, "x+y")
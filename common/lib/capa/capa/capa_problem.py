@@ -71,6 +71,23 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+
+def reads_anonymous_student_id(tree):
+    """
+    Return whether the Python code of the problem in `tree` can read the
+    anonymous_student_id global.
+
+    It can unless every Python <script> in the problem opts out with
+    uses_anonymous_student_id="false".  The code and text of a problem that
+    opts out are evaluated without it, so the results of its code are the
+    same for all students and are cached once for all of them.
+    """
+    scripts = [
+        script for script in tree.iter('script')
+        if not any(other_type in script.get('type', '') for other_type in ('javascript', 'perl'))
+    ]
+    return not scripts or any(script.get('uses_anonymous_student_id') != 'false' for script in scripts)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -840,7 +857,8 @@ class LoncapaProblem(object):
         """
         context = {}
         context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        if reads_anonymous_student_id(tree):
+            context['anonymous_student_id'] = self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
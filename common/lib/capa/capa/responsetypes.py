@@ -39,7 +39,7 @@ from six import text_type
 import capa.safe_exec as safe_exec
 import capa.xqueue_interface as xqueue_interface
 # specific library imports
-from calc import UndefinedVariable, UnmatchedParenthesis, evaluator
+from calc import UndefinedVariable, UnmatchedParenthesis, evaluator, vectorized_evaluator
 from cmath import isnan
 from openedx.core.djangolib.markup import HTML, Text
 
@@ -3085,6 +3085,10 @@ class FormulaResponse(LoncapaResponse):
         """
         _ = self.capa_system.i18n.ugettext
 
+        out = self.evaluate_samples(answer, var_dict_list)
+        if out is not None:
+            return out
+
         out = []
         for var_dict in var_dict_list:
             try:
@@ -3144,6 +3148,35 @@ class FormulaResponse(LoncapaResponse):
                 )
         return out
 
+    def evaluate_samples(self, answer, var_dict_list):
+        """
+        Evaluate the answer for all the test cases at once, using NumPy arrays.
+
+        Returns None if that isn't possible, e.g. because the answer is invalid, uses
+        a function which doesn't take arrays, or is undefined at one of the test cases.
+        The caller then evaluates the test cases one at a time, which reports errors
+        exactly as before.
+        """
+        if not var_dict_list:
+            return None
+        variables = {
+            name: numpy.array([var_dict[name] for var_dict in var_dict_list])
+            for name in var_dict_list[0]
+        }
+        try:
+            with numpy.errstate(all='ignore'):
+                results = vectorized_evaluator(
+                    variables,
+                    dict(),
+                    answer,
+                    case_sensitive=self.case_sensitive,
+                )
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if not numpy.all(numpy.isfinite(results)):
+            return None
+        return list(results)
+
     def randomize_variables(self, samples):
         """
         Returns a list of dictionaries mapping variables to random values in range,
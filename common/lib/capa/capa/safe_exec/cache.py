@@ -0,0 +1,147 @@
+"""
+A cache for the results of safe_exec.
+
+Running problem code in codejail means spawning a sandboxed process, so the
+results are cached in two tiers: a least-recently-used cache local to this
+process, in front of a shared cache (typically a Django cache) that all
+processes use.
+"""
+
+import copy
+import json
+import threading
+from collections import Counter, OrderedDict
+
+# Number of results kept in the process-local tier.
+DEFAULT_LOCAL_SIZE = 500
+
+# Results whose JSON encoding is larger than this many bytes aren't cached.
+DEFAULT_MAX_ENTRY_SIZE = 100 * 1024
+
+# Results are stored in the shared tier as JSON rather than as Python objects,
+# so their keys are prefixed to keep them apart from results cached by a plain cache.
+SHARED_KEY_PREFIX = 'json.'
+
+
+class SafeExecCache(object):
+    """
+    Cache safe_exec results in a process-local LRU backed by a shared cache.
+
+    `shared` is an object with .get(key) and .set(key, value, timeout), like a
+    Django cache, or None to only cache in this process.
+
+    `local_size` is the number of results kept in the process-local tier, and
+    results whose JSON encoding is larger than `max_entry_size` bytes aren't
+    cached at all.
+
+    `timeout` is passed to the shared cache when setting results.
+
+    `on_lookup`, if given, is called as on_lookup(course_id, slug, hit) for every
+    lookup recorded with `record_lookup`.
+
+    Lookups are also counted in this process, per course and problem, see
+    `lookup_counts`. Use `for_course` to get a cache which counts lookups against
+    a course; it shares the tiers and counts with the cache it came from.
+
+    """
+    def __init__(
+        self,
+        shared=None,
+        local_size=DEFAULT_LOCAL_SIZE,
+        max_entry_size=DEFAULT_MAX_ENTRY_SIZE,
+        timeout=None,
+        on_lookup=None,
+    ):
+        self.shared = shared
+        self.local_size = local_size
+        self.max_entry_size = max_entry_size
+        self.timeout = timeout
+        self.on_lookup = on_lookup
+        self.course_id = None
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._lookups = Counter()
+
+    def for_course(self, course_id, shared=None):
+        """
+        Return a cache sharing this one's tiers, which counts lookups against `course_id`.
+
+        If `shared` is given, the returned cache uses it as its shared tier
+        instead, e.g. the current thread's connection to the same Django cache.
+        """
+        course_cache = copy.copy(self)
+        course_cache.course_id = course_id
+        if shared is not None:
+            course_cache.shared = shared
+        return course_cache
+
+    def get(self, key):
+        """
+        Return the result cached for `key`, or None.
+        """
+        with self._lock:
+            encoded = self._local.pop(key, None)
+            if encoded is not None:
+                self._local[key] = encoded
+
+        if encoded is None and self.shared is not None:
+            encoded = self.shared.get(SHARED_KEY_PREFIX + key)
+            if encoded is not None:
+                self._set_local(key, encoded)
+
+        if encoded is None:
+            return None
+        return json.loads(encoded)
+
+    def set(self, key, value):
+        """
+        Cache `value`, a JSON-serializable result, for `key`.
+
+        Returns whether the value was cached, which it isn't if it's too large.
+        """
+        encoded = json.dumps(value)
+        if len(encoded) > self.max_entry_size:
+            return False
+
+        self._set_local(key, encoded)
+        if self.shared is not None:
+            self.shared.set(SHARED_KEY_PREFIX + key, encoded, self.timeout)
+        return True
+
+    def _set_local(self, key, encoded):
+        """
+        Store an encoded result in the process-local tier, evicting the least recently used.
+        """
+        with self._lock:
+            self._local.pop(key, None)
+            self._local[key] = encoded
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def record_lookup(self, slug, hit):
+        """
+        Count a lookup for the problem identified by `slug`, and whether it was a hit.
+        """
+        with self._lock:
+            self._lookups[(self.course_id, slug, hit)] += 1
+        if self.on_lookup is not None:
+            self.on_lookup(self.course_id, slug, hit)
+
+    def lookup_counts(self):
+        """
+        Return the lookups counted in this process.
+
+        The result is a dict mapping (course_id, slug) pairs to (hits, misses) pairs.
+        """
+        with self._lock:
+            lookups = list(self._lookups.items())
+
+        counts = {}
+        for (course_id, slug, hit), count in lookups:
+            hits, misses = counts.get((course_id, slug), (0, 0))
+            if hit:
+                hits += count
+            else:
+                misses += count
+            counts[(course_id, slug)] = (hits, misses)
+        return counts
@@ -1,13 +1,13 @@
 """Capa's specialized use of codejail.safe_exec."""
 
+import hashlib
+
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
 from six import text_type
 
-import hashlib
-
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
 # The name "random" is a properly-seeded stand-in for the random module.
@@ -101,7 +101,8 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  If it also has a .record_lookup(slug, hit) method, like
+    `SafeExecCache`, that is called with whether the result was found in the cache.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -117,6 +118,8 @@ def safe_exec(
         update_hash(md5er, safe_globals)
         key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
         cached = cache.get(key)
+        if hasattr(cache, 'record_lookup'):
+            cache.record_lookup(slug, cached is not None)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
@@ -0,0 +1,90 @@
+"""Test cache.py"""
+
+import unittest
+
+from mock import Mock
+
+from capa.safe_exec.cache import SHARED_KEY_PREFIX, SafeExecCache
+
+
+class DictSharedCache(object):
+    """A shared cache over a simple dict, for testing."""
+
+    def __init__(self):
+        self.cache = {}
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        self.cache[key] = value
+
+
+class TestSafeExecCache(unittest.TestCase):
+    """Test the two tiers of SafeExecCache."""
+
+    def test_local_only(self):
+        cache = SafeExecCache()
+        self.assertIsNone(cache.get('key'))
+        self.assertTrue(cache.set('key', [None, {'a': 1}]))
+        self.assertEqual(cache.get('key'), [None, {'a': 1}])
+
+    def test_results_are_copies(self):
+        cache = SafeExecCache()
+        cache.set('key', [None, {'a': [1]}])
+        cache.get('key')[1]['a'].append(2)
+        self.assertEqual(cache.get('key'), [None, {'a': [1]}])
+
+    def test_local_lru(self):
+        cache = SafeExecCache(local_size=2)
+        cache.set('one', 1)
+        cache.set('two', 2)
+        self.assertEqual(cache.get('one'), 1)
+        cache.set('three', 3)
+
+        # 'two' was the least recently used.
+        self.assertIsNone(cache.get('two'))
+        self.assertEqual(cache.get('one'), 1)
+        self.assertEqual(cache.get('three'), 3)
+
+    def test_shared_tier(self):
+        shared = DictSharedCache()
+        SafeExecCache(shared=shared).set('key', 17)
+        self.assertEqual(shared.cache, {SHARED_KEY_PREFIX + 'key': '17'})
+
+        # Another process finds the result in the shared tier, and keeps it locally.
+        cache = SafeExecCache(shared=shared)
+        self.assertEqual(cache.get('key'), 17)
+        shared.cache.clear()
+        self.assertEqual(cache.get('key'), 17)
+
+    def test_max_entry_size(self):
+        shared = DictSharedCache()
+        cache = SafeExecCache(shared=shared, max_entry_size=10)
+        self.assertFalse(cache.set('big', 'x' * 10))
+        self.assertIsNone(cache.get('big'))
+        self.assertEqual(shared.cache, {})
+
+        self.assertTrue(cache.set('small', 'x'))
+        self.assertEqual(cache.get('small'), 'x')
+
+    def test_for_course(self):
+        on_lookup = Mock()
+        cache = SafeExecCache(on_lookup=on_lookup)
+        course_cache = cache.for_course('course', shared=DictSharedCache())
+
+        # The tiers and counts are shared.
+        course_cache.set('key', 17)
+        self.assertEqual(cache.get('key'), 17)
+        self.assertIsNone(cache.shared)
+
+        course_cache.record_lookup('problem', True)
+        course_cache.record_lookup('problem', False)
+        course_cache.record_lookup('problem', True)
+        cache.record_lookup('other', False)
+        self.assertEqual(cache.lookup_counts(), {
+            ('course', 'problem'): (2, 1),
+            (None, 'other'): (0, 1),
+        })
+        on_lookup.assert_any_call('course', 'problem', True)
+        on_lookup.assert_called_with(None, 'other', False)
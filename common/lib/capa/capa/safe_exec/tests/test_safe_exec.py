@@ -10,7 +10,7 @@ import unittest
 import pytest
 from six import text_type
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import SafeExecCache, safe_exec, update_hash
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -167,6 +167,21 @@ class TestSafeExecCaching(unittest.TestCase):
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 17)
 
+    def test_cache_per_student(self):
+        # anonymous_student_id is part of the key, so each student gets their own entry.
+        cache = {}
+        for student in ['student1', 'student2']:
+            g = {'anonymous_student_id': student}
+            safe_exec("a = 17", g, cache=DictCache(cache))
+            self.assertEqual(g, {'a': 17, 'anonymous_student_id': student})
+        self.assertEqual(len(cache), 2)
+
+    def test_cache_records_lookups(self):
+        cache = SafeExecCache().for_course('course')
+        for _ in range(3):
+            safe_exec("a = 17", {}, cache=cache, slug='problem')
+        self.assertEqual(cache.lookup_counts(), {('course', 'problem'): (2, 1)})
+
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
         # Try several non-ASCII unicode characters.
@@ -460,6 +460,37 @@ class CAPAProblemTest(unittest.TestCase):
         self.assert_question_tag(question1, question2, tag='label', label_attr=False)
         self.assert_question_tag(question1, question2, tag='p', label_attr=True)
 
+    @ddt.unpack
+    @ddt.data(
+        {'scripts': '', 'in_context': True},
+        {'scripts': '<script type="loncapa/python">x = 1</script>', 'in_context': True},
+        {
+            'scripts': '<script type="loncapa/python" uses_anonymous_student_id="false">x = 1</script>',
+            'in_context': False,
+        },
+        {
+            'scripts': (
+                '<script type="loncapa/python" uses_anonymous_student_id="false">x = 1</script>'
+                '<script type="loncapa/python">y = 2</script>'
+            ),
+            'in_context': True,
+        },
+        {
+            'scripts': (
+                '<script type="loncapa/python" uses_anonymous_student_id="false">x = 1</script>'
+                '<script type="text/javascript">var y = 2;</script>'
+            ),
+            'in_context': False,
+        },
+    )
+    def test_anonymous_student_id_opt_out(self, scripts, in_context):
+        """
+        Verify that anonymous_student_id is left out of the context of problems
+        whose Python scripts all opt out of it.
+        """
+        problem = new_loncapa_problem('<problem>{}</problem>'.format(scripts))
+        self.assertEqual('anonymous_student_id' in problem.context, in_context)
+
 
 @ddt.ddt
 class CAPAMultiInputProblemTest(unittest.TestCase):
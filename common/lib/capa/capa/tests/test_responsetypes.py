@@ -576,6 +576,33 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(list(problem.responders.values())[0].validate_answer('14*x'))
         self.assertFalse(list(problem.responders.values())[0].validate_answer('3*y+2*x'))
 
+    def test_grade_vectorized(self):
+        """
+        Test that all the samples are evaluated in one pass when possible.
+        """
+        sample_dict = {'x': (-10, 10), 'y': (-10, 10)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance=0.01,
+                                     answer="x+2*y")
+
+        with mock.patch('capa.responsetypes.evaluator') as mock_evaluator:
+            self.assert_grade(problem, "2*x - x + y + y", "correct")
+            self.assert_grade(problem, "x + y", "incorrect")
+        self.assertFalse(mock_evaluator.called)
+
+    def test_grade_vectorized_fallback(self):
+        """
+        Test that answers which can't be evaluated on arrays are graded one sample at a time.
+        """
+        sample_dict = {'x': (1, 2)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance="1%",
+                                     answer="x*2")
+        self.assert_grade(problem, "x*fact(2)", "correct")
+        self.assert_grade(problem, "x*fact(3)", "incorrect")
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -11,6 +11,7 @@ import pymongo
 import six
 from bson.son import SON
 from fs.osfs import OSFS
+from fs.path import join as join_fs_path
 from gridfs.errors import NoFile
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
@@ -158,22 +159,28 @@ class MongoContentStore(ContentStore):
                 return None
 
     def export(self, location, output_directory):
-        content = self.find(location)
+        self.export_to_fs(location, OSFS(output_directory, create=True))
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
+    def export_to_fs(self, location, static_fs):
+        """
+        Export the asset at `location` into the directory that the filesystem `static_fs`
+        is open on, copying it from GridFS in chunks rather than reading it into memory.
+        """
+        content_id, __ = self.asset_db_key(location)
+        try:
+            fp = self.fs.get(content_id)
+        except NoFile:
+            raise NotFoundError(content_id)
 
-        disk_fs = OSFS(output_directory)
+        with fp:
+            import_path = getattr(fp, 'import_path', None)
+            output_directory = os.path.dirname(import_path) if import_path is not None else u''
+            if output_directory:
+                static_fs.makedirs(output_directory, recreate=True)
 
-        with disk_fs.open(export_name, 'wb') as asset_file:
-            asset_file.write(content.data)
+            # Escape invalid char from filename.
+            export_name = escape_invalid_characters(name=fp.displayname, invalid_char_list=['/', '\\'])
+            static_fs.setbinfile(join_fs_path(output_directory, export_name), fp)
 
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
         """
@@ -199,13 +206,41 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in six.iteritems(asset):
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+            self._add_asset_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_all_for_course_to_fs(self, course_key, export_fs):
+        """
+        Export all of this course's assets to the static directory of the filesystem `export_fs`.
+        Export all of the assets' attributes to its policies/assets.json file.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            export_fs (FS): the filesystem holding the exported course
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        if assets:
+            static_fs = export_fs.makedir(u'static', recreate=True)
+        for asset in assets:
+            self.export_to_fs(asset['asset_key'], static_fs)
+            self._add_asset_policy(policy, asset)
+
+        export_fs.makedirs(u'policies', recreate=True)
+        export_fs.setbytes(u'policies/assets.json', json.dumps(policy, sort_keys=True, indent=4))
+
+    @staticmethod
+    def _add_asset_policy(policy, asset):
+        """
+        Add the attributes of `asset`, as returned by get_all_content_for_course, to the assets policy.
+        """
+        for attr, value in six.iteritems(asset):
+            if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -46,6 +46,7 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 ASSET_IGNORE_REGEX = getattr(settings, "ASSET_IGNORE_REGEX", r"(^\._.*$)|(^\.DS_Store$)|(^.*~$)")
+STATIC_CONTENT_IMPORT_WORKERS = getattr(settings, "COURSE_IMPORT_STATIC_CONTENT_WORKERS", 1)
 
 
 class SwitchedSignal(django.dispatch.Signal):
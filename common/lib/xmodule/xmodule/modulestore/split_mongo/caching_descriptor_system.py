@@ -20,7 +20,7 @@ from xmodule.modulestore.inheritance import inheriting_field_data, InheritanceMi
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.id_manager import SplitMongoIdManager
 from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionLazyLoader
-from xmodule.modulestore.split_mongo.split_mongo_kvs import SplitMongoKVS
+from xmodule.modulestore.split_mongo.split_mongo_kvs import LazySplitMongoKVS, SplitMongoKVS
 from xmodule.x_module import XModuleMixin
 
 log = logging.getLogger(__name__)
@@ -42,7 +42,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
     Computes the settings (nee 'metadata') inheritance upon creation.
     """
     @contract(course_entry=CourseEnvelope)
-    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, **kwargs):
+    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, lazy_fields=False, **kwargs):
         """
         Computes the settings inheritance and sets up the cache.
 
@@ -55,6 +55,11 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         module_data: a dict mapping Location -> json that was cached from the
             underlying modulestore
+
+        lazy_fields: if True, each block's field data is only built when a field
+            that can't be read straight from the structure is first accessed
+            (see LazySplitMongoKVS).  Errors in a block's fields are then raised
+            when they're accessed, rather than loading an ErrorDescriptor.
         """
         # needed by capa_problem (as runtime.filestore via this.resources_fs)
         if course_entry.course_key.course:
@@ -79,6 +84,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         # it here. (grading, for example)
         self.course_id = course_entry.course_key
         self.lazy = lazy
+        self.lazy_fields = lazy_fields
         self.module_data = module_data
         self.default_class = default_class
         self.local_modules = {}
@@ -87,6 +93,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
     @lazy
     @contract(returns="dict(BlockKey: BlockKey)")
     def _parent_map(self):
+        """
+        The parent of every block of the structure which has one.
+        """
+        structure_index = self.modulestore._get_structure_index(self.course_entry)  # pylint: disable=protected-access
+        if structure_index is not None:
+            return structure_index.parent_map
         parent_map = {}
         for block_key, block in self.course_entry.structure['blocks'].iteritems():
             for child in block.fields.get('children', []):
@@ -212,35 +224,51 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
             block_id=block_key.id,
         )
 
-        converted_fields = convert_fields(block_data.fields)
-        converted_defaults = convert_fields(block_data.defaults)
-        if block_key in self._parent_map:
-            parent_key = self._parent_map[block_key]
-            parent = course_key.make_usage_key(parent_key.type, parent_key.id)
-        else:
-            parent = None
-
-        aside_fields = None
+        def get_parent():
+            """Return the usage key of the block's parent."""
+            if block_key in self._parent_map:
+                parent_key = self._parent_map[block_key]
+                return course_key.make_usage_key(parent_key.type, parent_key.id)
+            return None
+
+        def get_kvs_kwargs():
+            """Return the arguments for the block's SplitMongoKVS."""
+            aside_fields = None
+
+            # for the situation if block_data has no asides attribute
+            # (in case it was taken from memcache)
+            try:
+                if block_data.asides:
+                    aside_fields = {block_key.type: {}}
+                    for aside in block_data.asides:
+                        aside_fields[block_key.type].update(aside['fields'])
+            except AttributeError:
+                pass
+
+            return dict(
+                definition=definition_loader,
+                initial_values=convert_fields(block_data.fields),
+                default_values=convert_fields(block_data.defaults),
+                parent=get_parent(),
+                aside_fields=aside_fields,
+                field_decorator=kwargs.get('field_decorator'),
+            )
 
-        # for the situation if block_data has no asides attribute
-        # (in case it was taken from memcache)
-        try:
-            if block_data.asides:
-                aside_fields = {block_key.type: {}}
-                for aside in block_data.asides:
-                    aside_fields[block_key.type].update(aside['fields'])
-        except AttributeError:
-            pass
+        if not self.lazy_fields:
+            kvs_kwargs = get_kvs_kwargs()
 
         try:
-            kvs = SplitMongoKVS(
-                definition_loader,
-                converted_fields,
-                converted_defaults,
-                parent=parent,
-                aside_fields=aside_fields,
-                field_decorator=kwargs.get('field_decorator')
-            )
+            if self.lazy_fields:
+                kvs = LazySplitMongoKVS(
+                    get_kvs_kwargs,
+                    block_data.fields,
+                    block_data.defaults,
+                    get_parent,
+                    convert_fields,
+                    field_decorator=kwargs.get('field_decorator'),
+                )
+            else:
+                kvs = SplitMongoKVS(**kvs_kwargs)
 
             if InheritanceMixin in self.modulestore.xblock_mixins:
                 field_data = inheriting_field_data(kvs)
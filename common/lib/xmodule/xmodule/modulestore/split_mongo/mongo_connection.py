@@ -2,20 +2,23 @@
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
 import datetime
-import cPickle as pickle
 import math
-import zlib
-import pymongo
-import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
+import pymongo
+import pytz
+
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
+    from django.core.exceptions import ImproperlyConfigured
     DJANGO_AVAILABLE = True
 except ImportError:
     DJANGO_AVAILABLE = False
@@ -27,6 +30,12 @@ from mongodb_proxy import autoretry_read
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_cache_codec import (
+    DEFAULT_COMPRESSOR,
+    DEFAULT_SERIALIZER,
+    StructureCodec,
+    StructureDecodeError
+)
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 
@@ -203,16 +212,114 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class LocalStructureCache(object):
+    """
+    A least-recently-used cache of decoded course structures, local to this process.
+
+    Structures are immutable once they have been saved, so a decoded structure
+    can be shared by everything in the process that reads it.  The size of a
+    structure depends on its number of blocks, so the cache is bounded by the
+    total number of blocks in the structures it holds.
+    """
+    def __init__(self, max_blocks):
+        self.max_blocks = max_blocks
+        self._structures = OrderedDict()
+        self._num_blocks = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the structure cached for `key`, or None."""
+        with self._lock:
+            entry = self._structures.pop(key, None)
+            if entry is None:
+                return None
+            self._structures[key] = entry
+            return entry[0]
+
+    def set(self, key, structure):
+        """Cache `structure`, evicting the least recently used structures to stay within `max_blocks`."""
+        num_blocks = len(structure['blocks'])
+        if num_blocks > self.max_blocks:
+            return
+
+        with self._lock:
+            old_entry = self._structures.pop(key, None)
+            if old_entry is not None:
+                self._num_blocks -= old_entry[1]
+            self._structures[key] = (structure, num_blocks)
+            self._num_blocks += num_blocks
+            while self._num_blocks > self.max_blocks:
+                _, (_, evicted_blocks) = self._structures.popitem(last=False)
+                self._num_blocks -= evicted_blocks
+
+    def clear(self):
+        """Remove all the cached structures."""
+        with self._lock:
+            self._structures.clear()
+            self._num_blocks = 0
+
+
+_LOCAL_STRUCTURE_CACHE = None
+
+
+def get_local_structure_cache():
+    """
+    Return the process-local structure cache, or None if it's disabled.
+
+    Its size is set by the COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS setting;
+    0, the default, disables it.
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    max_blocks = 0
+    if DJANGO_AVAILABLE:
+        try:
+            max_blocks = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS', 0)
+        except ImproperlyConfigured:
+            pass
+
+    if not max_blocks:
+        return None
+    if _LOCAL_STRUCTURE_CACHE is None or _LOCAL_STRUCTURE_CACHE.max_blocks != max_blocks:
+        _LOCAL_STRUCTURE_CACHE = LocalStructureCache(max_blocks)
+    return _LOCAL_STRUCTURE_CACHE
+
+
+def get_structure_codec():
+    """
+    Return the codec for the structures written to the django cache.
+
+    It's chosen with the COURSE_STRUCTURE_CACHE_SERIALIZER and
+    COURSE_STRUCTURE_CACHE_COMPRESSOR settings, see structure_cache_codec.
+    Structures written with any codec can be read whatever these are set to.
+    """
+    serializer, compressor = DEFAULT_SERIALIZER, DEFAULT_COMPRESSOR
+    if DJANGO_AVAILABLE:
+        try:
+            serializer = getattr(settings, 'COURSE_STRUCTURE_CACHE_SERIALIZER', serializer)
+            compressor = getattr(settings, 'COURSE_STRUCTURE_CACHE_COMPRESSOR', compressor)
+        except ImproperlyConfigured:
+            pass
+    return StructureCodec(serializer, compressor)
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed by the codec
+    returned by :func:`get_structure_codec` when cached.
+
+    In front of the django cache, decoded structures are kept in the
+    process-local cache returned by :func:`get_local_structure_cache`, if
+    it's enabled.  Structures returned from there are shared, so they must
+    not be modified.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
-    for set and get.
+    for set and get, other than using the process-local cache.
     """
     def __init__(self):
         self.cache = None
+        self.local_cache = get_local_structure_cache()
+        self.codec = get_structure_codec()
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
@@ -220,41 +327,113 @@ class CourseStructureCache(object):
                 pass
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
-        if self.cache is None:
+        """Pull the encoded struct data from cache and decode it."""
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            if self.local_cache is not None:
+                structure = self.local_cache.get(key)
+                if structure is not None:
+                    tagger.tag(from_cache='true', cache_tier='local')
+                    return structure
+
+            if self.cache is None:
+                encoded_data = None
+            else:
+                encoded_data = self.cache.get(key)
+            structure = None if encoded_data is None else self._decode(encoded_data, tagger)
+            tagger.tag(from_cache=str(structure is not None).lower())
 
-            if compressed_pickled_data is None:
+            if structure is None:
                 # Always log cache misses, because they are unexpected
                 tagger.sample_rate = 1
                 return None
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
-
-            pickled_data = zlib.decompress(compressed_pickled_data)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            tagger.tag(cache_tier='django')
+            if self.local_cache is not None:
+                self.local_cache.set(key, structure)
+            return structure
 
-            return pickle.loads(pickled_data)
+    def get_many(self, keys, course_context=None):
+        """
+        Return a dict mapping each of `keys` that's cached to its structure.
+
+        Looks in the django cache with a single request for the keys that
+        aren't in the process-local cache.
+        """
+        if self.cache is None and self.local_cache is None:
+            return {}
+
+        with TIMER.timer("CourseStructureCache.get_many", course_context) as tagger:
+            tagger.measure('requested', len(keys))
+            structures = {}
+            missing_keys = []
+            for key in keys:
+                structure = self.local_cache.get(key) if self.local_cache is not None else None
+                if structure is None:
+                    missing_keys.append(key)
+                else:
+                    structures[key] = structure
+            tagger.measure('local_hits', len(structures))
+
+            if missing_keys and self.cache is not None:
+                found = self.cache.get_many(missing_keys)
+                tagger.measure('cache_hits', len(found))
+                for key, encoded_data in found.iteritems():
+                    structure = self._decode(encoded_data, tagger)
+                    if structure is None:
+                        continue
+                    if self.local_cache is not None:
+                        self.local_cache.set(key, structure)
+                    structures[key] = structure
+
+            tagger.tag(from_cache=str(len(structures) == len(keys)).lower())
+            if len(structures) < len(keys):
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+            return structures
 
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will encode it and write it to cache."""
+        if self.local_cache is not None:
+            self.local_cache.set(key, structure)
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
-            tagger.measure('uncompressed_size', len(pickled_data))
-
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            # Stuctures are immutable, so we set a timeout of "never"
+            self.cache.set(key, self._encode(structure, tagger), None)
+
+    def set_many(self, structures, course_context=None):
+        """Given a dict mapping keys to structures, write them all to cache with a single request."""
+        if self.local_cache is not None:
+            for key, structure in structures.iteritems():
+                self.local_cache.set(key, structure)
+        if self.cache is None or not structures:
+            return None
 
+        with TIMER.timer("CourseStructureCache.set_many", course_context) as tagger:
+            tagger.measure('structures', len(structures))
+            encoded = {
+                key: self._encode(structure, tagger)
+                for key, structure in structures.iteritems()
+            }
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set_many(encoded, None)
+
+    def _decode(self, data, tagger):
+        """Decode a structure read from the django cache, or return None if it can't be decoded."""
+        try:
+            return self.codec.decode(data, tagger)
+        except StructureDecodeError:
+            log.warning("Ignoring a cached course structure this process can't decode", exc_info=True)
+            return None
+
+    def _encode(self, structure, tagger):
+        """Encode a structure to write to the django cache."""
+        tagger.tag(codec=self.codec.name)
+        return self.codec.encode(structure, tagger)
 
 
 class MongoConnection(object):
@@ -322,6 +501,45 @@ class MongoConnection(object):
 
             return structure
 
+    @autoretry_read()
+    def get_structures(self, keys, course_context=None):
+        """
+        Get the structures whose ids are the given keys, as a dict mapping each id to its structure.
+
+        Like :meth:`get_structure`, this uses cached versions of the structures when
+        they are available, but it reads all the structures with one request to the
+        cache and one query for those that aren't cached.  Ids for which there is no
+        structure are left out of the result.
+        """
+        keys = list(OrderedDict.fromkeys(keys))
+        with TIMER.timer("get_structures", course_context) as tagger:
+            tagger.measure("requested_ids", len(keys))
+            cache = CourseStructureCache()
+
+            structures = cache.get_many(keys, course_context)
+            missing_keys = [key for key in keys if key not in structures]
+            tagger.measure("cache_misses", len(missing_keys))
+            if missing_keys:
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+
+                with TIMER.timer("get_structures.find", course_context) as tagger_find:
+                    found = {}
+                    for doc in self.structures.find({'_id': {'$in': missing_keys}}):
+                        tagger_find.measure("blocks", len(doc['blocks']))
+                        found[doc['_id']] = structure_from_mongo(doc, course_context)
+                    tagger_find.measure("structures", len(found))
+
+                if len(found) < len(missing_keys):
+                    log.warning(
+                        "docs were None when attempting to retrieve structures with keys %s",
+                        ', '.join(unicode(key) for key in missing_keys if key not in found)
+                    )
+                cache.set_many(found, course_context)
+                structures.update(found)
+
+            return structures
+
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
         """
@@ -57,10 +57,12 @@ import copy
 import datetime
 import hashlib
 import logging
-import six
+from collections import defaultdict
+from importlib import import_module
+from types import NoneType
 
+import six
 from contracts import contract, new_contract
-from importlib import import_module
 from mongodb_proxy import autoretry_read
 from path import Path as path
 from pytz import UTC
@@ -82,6 +84,7 @@ from xmodule.modulestore import (
     inheritance, ModuleStoreWriteBase, ModuleStoreEnum,
     BulkOpsRecord, BulkOperationsMixin, SortedAssetList, BlockData
 )
+from xmodule.modulestore.split_mongo.structure_index import STRUCTURE_INDEXES, StructureIndex
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
@@ -90,8 +93,6 @@ from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, Du
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
-from collections import defaultdict
-from types import NoneType
 from xmodule.assetstore import AssetMetadata
 
 
@@ -346,6 +347,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         (no data will be written to the database if a bulk operation is active.)
         """
         self._clear_cache(structure['_id'])
+        STRUCTURE_INDEXES.discard(structure['_id'])
         bulk_write_record = self._get_bulk_ops_record(course_key)
         if bulk_write_record.active:
             bulk_write_record.structures[structure['_id']] = structure
@@ -612,7 +614,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                     ids.remove(structure_id)
                     structures.append(structure)
 
-        structures.extend(self.db_connection.find_structures_by_id(list(ids)))
+        structures.extend(self.db_connection.get_structures(list(ids)).values())
         return structures
 
     def find_structures_derived_from(self, ids):
@@ -697,9 +699,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, lazy_fields=False, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param lazy_fields: if True, the field data of loaded blocks is only built when it's needed,
+            see CachingDescriptorSystem.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
@@ -729,6 +733,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             self.services["request_cache"] = self.request_cache
 
         self.signal_handler = signal_handler
+        self.lazy_fields = lazy_fields
 
     def close_connections(self):
         """
@@ -758,6 +763,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         super(SplitMongoModuleStore, self)._drop_database(database, collections, connections)
 
         self.db_connection._drop_database(database, collections, connections)  # pylint: disable=protected-access
+        STRUCTURE_INDEXES.clear()
 
     def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
         """
@@ -796,12 +802,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 definitions = {definition['_id']: definition
                                for definition in descendent_definitions}
 
-                for block in new_module_data.itervalues():
+                for block_key, block in new_module_data.items():
                     if block.definition in definitions:
                         definition = definitions[block.definition]
+                        # The structure's blocks may be shared with other readers of the
+                        # structure, so add the definition's fields to a copy.
+                        block = copy.copy(block)
+                        block.fields = dict(block.fields)
                         # convert_fields gets done later in the runtime's xblock_from_json
                         block.fields.update(definition.get('fields'))
                         block.definition_loaded = True
+                        new_module_data[block_key] = block
 
             system.module_data.update(new_module_data)
             return system.module_data
@@ -1281,6 +1292,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
             block_ids = []
+            structure_index = self._get_structure_index(course)
+            if structure_index is not None:
+                blocks = course.structure['blocks']
+                block_ids = [
+                    block_key for block_key in structure_index.blocks_with_ids(block_name)
+                    if _block_matches_all(blocks[block_key])
+                ]
+                return self._load_items(course, block_ids, **kwargs)
+
             for block_id, block in course.structure['blocks'].iteritems():
                 # Don't do an in comparison blindly; first check to make sure
                 # that the name qualifier we're looking at isn't a plain string;
@@ -1304,20 +1324,28 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
+        blocks = course.structure['blocks']
+        structure_index = self._get_structure_index(course)
+        candidates = None
+        if structure_index is not None:
+            candidates = structure_index.candidates(qualifiers, settings, self._value_matches)
+        if candidates is None:
+            candidates = blocks.iterkeys()
 
         if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+            if structure_index is not None:
+                has_path_to_root = structure_index.root_paths.has_path_to_root
+            else:
+                path_cache = {}
+                parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+                has_path_to_root = lambda block_key: self.has_path_to_root(block_key, course, path_cache, parents_cache)
 
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+        for block_id in candidates:
+            if _block_matches_all(blocks[block_id]):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        has_path_to_root(block_id)
                     ):
                         items.append(block_id)
                 else:
@@ -1328,6 +1356,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    def _get_structure_index(self, course_entry):
+        """
+        Return the StructureIndex of the structure of `course_entry`, or None if
+        the structure is still being edited in a bulk operation, so can't be indexed.
+        """
+        structure_id = course_entry.structure['_id']
+        bulk_write_record = self._get_bulk_ops_record(course_entry.course_key)
+        if (  # pylint: disable=bad-continuation
+            bulk_write_record.active and
+            structure_id in bulk_write_record.structures and
+            structure_id not in bulk_write_record.structures_in_db
+        ):
+            return None
+        return STRUCTURE_INDEXES.get(course_entry.structure)
+
     def build_block_key_to_parents_mapping(self, structure):
         """
         Given a structure, builds block_key to parents mapping for all block keys in structure
@@ -1357,6 +1400,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         :return Bool: whether or not component has path to the root
         """
+        if path_cache is None and parents_cache is None:
+            structure_index = self._get_structure_index(course)
+            if structure_index is not None:
+                return structure_index.root_paths.has_path_to_root(block_key)
 
         if path_cache and block_key in path_cache:
             return path_cache[block_key]
@@ -1396,7 +1443,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        block_key = BlockKey.from_usage_key(locator)
+        structure_index = self._get_structure_index(course)
+        if structure_index is not None:
+            all_parent_ids = structure_index.parents.get(block_key, [])
+        else:
+            all_parent_ids = self._get_parents_from_structure(block_key, course.structure)
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
@@ -1427,13 +1479,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
+        structure_index = self._get_structure_index(course) or StructureIndex(course.structure)
         items = set(course.structure['blocks'].keys())
         items.remove(course.structure['root'])
-        blocks = course.structure['blocks']
-        for block_id, block_data in blocks.iteritems():
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
+        items.difference_update(structure_index.parents)
+        for category in detached_categories:
+            items.difference_update(structure_index.block_type.values.get(category, ()))
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
             for block_id in items
@@ -3443,6 +3494,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_entry=course_entry,
             module_data={},
             lazy=lazy,
+            lazy_fields=self.lazy_fields,
             default_class=self.default_class,
             error_tracker=self.error_tracker,
             render_template=self.render_template,
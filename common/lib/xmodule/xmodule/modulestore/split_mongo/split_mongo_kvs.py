@@ -3,6 +3,7 @@ from contracts import contract, new_contract
 from xblock.fields import Scope
 from collections import namedtuple
 from xblock.exceptions import InvalidScopeError
+from xblock.runtime import KeyValueStore
 from .definition_lazy_loader import DefinitionLazyLoader
 from xmodule.modulestore.inheritance import InheritanceKeyValueStore
 from opaque_keys.edx.locator import BlockUsageLocator
@@ -190,3 +191,108 @@ class SplitMongoKVS(InheritanceKeyValueStore):
                         self.aside_fields.setdefault(aside_type, {}).update(fields)
                 # do we want to cache any of the edit_info?
             self._definition = None  # already loaded
+
+
+class LazySplitMongoKVS(SplitMongoKVS):
+    """
+    A SplitMongoKVS that is built from a block's raw structure entry only when
+    it's first needed.
+
+    Building a SplitMongoKVS converts and copies all of a block's fields, though
+    many callers only read a few simple fields of each block they load.  Until
+    this kvs is built, the parent, the children, explicitly set settings fields
+    with simple values and whether fields are set are all found from the raw
+    structure entry; anything else builds it.
+    """
+    # Types of field values that can be returned from the raw fields without copying them.
+    SIMPLE_TYPES = (basestring, bool, int, long, float, type(None))
+
+    # Attributes that only exist once the kvs is built.
+    BUILT_ATTRIBUTES = ('_fields', '_definition', '_defaults', 'parent', 'aside_fields')
+
+    def __init__(self, build, raw_fields, raw_defaults, get_parent, field_converter, field_decorator=None):
+        """
+        :param build: a function returning the keyword arguments for SplitMongoKVS.__init__
+        :param raw_fields: the block's fields, as stored in the structure.  These are never modified.
+        :param raw_defaults: the block's Scope.settings defaults, as stored in the structure
+        :param get_parent: a function returning the block's parent
+        :param field_converter: a function converting stored fields to their xblock values
+        """
+        # pylint: disable=super-init-not-called, non-parent-init-called
+        KeyValueStore.__init__(self)
+        self.inherited_settings = {}
+        self.built = False
+        self._build = build
+        self._raw_fields = raw_fields
+        self._raw_defaults = raw_defaults
+        self._get_parent = get_parent
+        self._field_converter = field_converter
+        self.field_decorator = field_decorator if field_decorator is not None else lambda x: x
+
+    def __getattr__(self, name):
+        if name in self.BUILT_ATTRIBUTES and not self.built:
+            self.build()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def build(self):
+        """
+        Build the full kvs, if it hasn't been built yet.
+        """
+        if self.built:
+            return
+        inherited_settings = self.inherited_settings
+        super(LazySplitMongoKVS, self).__init__(**self._build())
+        self.inherited_settings = inherited_settings
+        self.built = True
+
+    def _is_raw(self, key):
+        """
+        Can `key` be looked up in the raw structure entry?
+        """
+        return not self.built and key.block_family != XBlockAside.entry_point and key.scope in self.VALID_SCOPES
+
+    def get(self, key):
+        if self._is_raw(key):
+            if key.scope == Scope.parent:
+                return self._get_parent()
+            if key.scope in (Scope.settings, Scope.children):
+                if key.field_name not in self._raw_fields:
+                    raise KeyError()
+                value = self._raw_fields[key.field_name]
+                if key.scope == Scope.children:
+                    return self.field_decorator(self._field_converter({key.field_name: value})[key.field_name])
+                # Stored references are never simple values, so these don't need converting.
+                if isinstance(value, self.SIMPLE_TYPES):
+                    return self.field_decorator(value)
+
+        self.build()
+        return super(LazySplitMongoKVS, self).get(key)
+
+    def set(self, key, value):
+        self.build()
+        super(LazySplitMongoKVS, self).set(key, value)
+
+    def delete(self, key):
+        self.build()
+        super(LazySplitMongoKVS, self).delete(key)
+
+    def has(self, key):
+        if self._is_raw(key):
+            if key.scope == Scope.parent:
+                return True
+            if key.scope in (Scope.settings, Scope.children):
+                return key.field_name in self._raw_fields
+
+        self.build()
+        return super(LazySplitMongoKVS, self).has(key)
+
+    def has_default_value(self, field_name):
+        return field_name in self._raw_defaults
+
+    def default(self, key):
+        if not self.built and key.field_name not in self._raw_defaults:
+            # There's no template default for this field, so skip straight to inheritance.
+            return super(SplitMongoKVS, self).default(key)  # pylint: disable=bad-super-call
+        self.build()
+        return super(LazySplitMongoKVS, self).default(key)
@@ -0,0 +1,356 @@
+"""
+Codecs for the course structures that CourseStructureCache stores in the django cache.
+
+A codec is a serializer, which turns a structure into bytes, followed by a
+compressor.  Every encoded structure starts with a header byte recording which
+ones were used, so the codec can be changed without flushing the cache:
+
+    (serializer id << 4 | compressor id) | compressed, serialized structure
+
+Structures cached before the header was added were pickled and compressed with
+zlib, with no header.  zlib data always starts with the byte 0x78, which isn't
+the header of any codec, so those structures still decode.
+
+The compact serializer packs a structure with msgpack:
+
+    key table length (uint32) | msgpack(key table) | msgpack(structure)
+
+The key table lists every BlockKey in the structure once, starting with the
+keys of its blocks in order.  Blocks are stored as lists in the same order,
+without their keys, and any other BlockKey, such as a child, is stored as its
+index in the table.  ObjectIds, like definition ids and versions, are stored as
+their raw 12 bytes, and datetimes as microseconds since the epoch.
+"""
+import cPickle as pickle
+import datetime
+import logging
+import struct
+import zlib
+
+import pytz
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+log = logging.getLogger(__name__)
+
+# The first byte of data compressed by zlib with its default window size, as
+# all structures cached without a header were.
+LEGACY_HEADER = 0x78
+
+DEFAULT_SERIALIZER = 'pickle'
+DEFAULT_COMPRESSOR = 'zlib'
+
+
+class StructureDecodeError(ValueError):
+    """
+    Raised when a cached structure can't be decoded by this process.
+    """
+    pass
+
+
+class PickleSerializer(object):
+    """
+    Serialize structures with pickle.
+    """
+    id = 1
+    name = 'pickle'
+    available = True
+
+    def dumps(self, structure):
+        """Return `structure` serialized as bytes."""
+        return pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        """Return the structure serialized in `data`."""
+        return pickle.loads(data)
+
+
+# msgpack extension type codes used by CompactSerializer.
+_BLOCK_KEY_EXT = 1
+_OBJECT_ID_EXT = 2
+_DATETIME_EXT = 3
+
+_UINT32 = struct.Struct('<I')
+_DATETIME = struct.Struct('<q?')
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# The order in which a block's edit_info is stored.
+_EDIT_INFO_FIELDS = (
+    'previous_version',
+    'update_version',
+    'source_version',
+    'edited_on',
+    'edited_by',
+    'original_usage',
+    'original_usage_version',
+)
+
+
+class CompactSerializer(object):
+    """
+    Serialize structures with msgpack, interning their BlockKeys.
+
+    Only the state of a block that's stored in Mongo is kept, so decoded
+    blocks are the same as blocks freshly read from Mongo.  Raises TypeError
+    for structures holding values that msgpack can't store.
+    """
+    id = 2
+    name = 'compact'
+    available = msgpack is not None
+
+    def dumps(self, structure):
+        """Return `structure` serialized as bytes."""
+        block_keys = list(structure['blocks'])
+        key_indexes = {block_key: index for index, block_key in enumerate(block_keys)}
+
+        def default(obj):
+            """Convert values that msgpack can't pack itself."""
+            if isinstance(obj, BlockKey):
+                index = key_indexes.get(obj)
+                if index is None:
+                    index = key_indexes[obj] = len(block_keys)
+                    block_keys.append(obj)
+                return msgpack.ExtType(_BLOCK_KEY_EXT, _UINT32.pack(index))
+            if isinstance(obj, ObjectId):
+                return msgpack.ExtType(_OBJECT_ID_EXT, obj.binary)
+            if isinstance(obj, datetime.datetime):
+                return msgpack.ExtType(_DATETIME_EXT, _pack_datetime(obj))
+            # Packing with strict_types leaves subclasses of the types msgpack
+            # knows, such as bson's Int64, to this function.
+            for base_type, convert in ((dict, dict), ((list, tuple), list), (unicode, unicode),
+                                       (str, str), ((int, long), long), (float, float)):
+                if isinstance(obj, base_type):
+                    return convert(obj)
+            raise TypeError(u"Can't pack {!r}".format(obj))
+
+        header = {key: value for key, value in structure.iteritems() if key != 'blocks'}
+        blocks = []
+        for block_key in block_keys:
+            block = structure['blocks'][block_key]
+            edit_info = block.edit_info
+            blocks.append([
+                block.block_type,
+                block.definition,
+                block.fields,
+                block.defaults,
+                block.get_asides(),
+                [getattr(edit_info, field) for field in _EDIT_INFO_FIELDS],
+            ])
+
+        packed_structure = msgpack.packb(
+            [header, blocks], default=default, use_bin_type=True, strict_types=True
+        )
+        # The key table is packed last, since packing the structure can add keys to it.
+        packed_keys = msgpack.packb([tuple(block_key) for block_key in block_keys], use_bin_type=True)
+        return _UINT32.pack(len(packed_keys)) + packed_keys + packed_structure
+
+    def loads(self, data):
+        """Return the structure serialized in `data`."""
+        keys_end = _UINT32.size + _UINT32.unpack_from(data)[0]
+        block_keys = [
+            BlockKey(block_type, block_id)
+            for block_type, block_id in msgpack.unpackb(data[_UINT32.size:keys_end], raw=False)
+        ]
+
+        def ext_hook(code, ext_data):
+            """Convert the extension types written by `dumps`."""
+            if code == _BLOCK_KEY_EXT:
+                return block_keys[_UINT32.unpack(ext_data)[0]]
+            if code == _OBJECT_ID_EXT:
+                return ObjectId(ext_data)
+            if code == _DATETIME_EXT:
+                return _unpack_datetime(ext_data)
+            return msgpack.ExtType(code, ext_data)
+
+        structure, blocks = msgpack.unpackb(data[keys_end:], raw=False, ext_hook=ext_hook)
+        structure['blocks'] = {
+            block_key: BlockData(
+                block_type=block_type,
+                definition=definition,
+                fields=fields,
+                defaults=defaults,
+                asides=asides,
+                edit_info=dict(zip(_EDIT_INFO_FIELDS, edit_info)),
+            )
+            for block_key, (block_type, definition, fields, defaults, asides, edit_info) in zip(block_keys, blocks)
+        }
+        return structure
+
+
+def _pack_datetime(value):
+    """
+    Pack a datetime as microseconds since the epoch, and whether it's timezone-aware.
+    """
+    aware = value.tzinfo is not None
+    if aware:
+        value = value.astimezone(pytz.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    microseconds = (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+    return _DATETIME.pack(microseconds, aware)
+
+
+def _unpack_datetime(data):
+    """
+    Unpack a datetime packed by _pack_datetime.  Timezone-aware datetimes are returned in UTC.
+    """
+    microseconds, aware = _DATETIME.unpack(data)
+    value = _EPOCH + datetime.timedelta(microseconds=microseconds)
+    if aware:
+        value = value.replace(tzinfo=pytz.utc)
+    return value
+
+
+class NoCompressor(object):
+    """
+    Leave serialized structures uncompressed.
+    """
+    id = 0
+    name = 'none'
+    available = True
+
+    def compress(self, data):
+        """Return `data` compressed."""
+        return data
+
+    def decompress(self, data):
+        """Return `data` decompressed."""
+        return data
+
+
+class ZlibCompressor(object):
+    """
+    Compress serialized structures with zlib, at its fastest level.
+    """
+    id = 1
+    name = 'zlib'
+    available = True
+
+    def compress(self, data):
+        """Return `data` compressed."""
+        # 1 = Fastest (slightly larger results)
+        return zlib.compress(data, 1)
+
+    def decompress(self, data):
+        """Return `data` decompressed."""
+        return zlib.decompress(data)
+
+
+class Lz4Compressor(object):
+    """
+    Compress serialized structures with LZ4, which is much faster than zlib
+    but compresses less.  Needs the lz4 package.
+    """
+    id = 2
+    name = 'lz4'
+    available = lz4_frame is not None
+
+    def compress(self, data):
+        """Return `data` compressed."""
+        return lz4_frame.compress(data)
+
+    def decompress(self, data):
+        """Return `data` decompressed."""
+        return lz4_frame.decompress(data)
+
+
+SERIALIZERS = {serializer.name: serializer for serializer in (PickleSerializer(), CompactSerializer())}
+COMPRESSORS = {
+    compressor.name: compressor for compressor in (NoCompressor(), ZlibCompressor(), Lz4Compressor())
+}
+_SERIALIZERS_BY_ID = {serializer.id: serializer for serializer in SERIALIZERS.itervalues()}
+_COMPRESSORS_BY_ID = {compressor.id: compressor for compressor in COMPRESSORS.itervalues()}
+
+
+class StructureCodec(object):
+    """
+    Encode course structures with a serializer and a compressor, and decode
+    structures encoded with any of them.
+
+    `serializer` is a key of SERIALIZERS and `compressor` a key of COMPRESSORS.
+    If one of them needs a package that isn't installed, the default is used
+    instead.  Structures that the compact serializer can't pack are pickled.
+    """
+    def __init__(self, serializer=DEFAULT_SERIALIZER, compressor=DEFAULT_COMPRESSOR):
+        self.serializer = self._choose(SERIALIZERS, serializer, DEFAULT_SERIALIZER)
+        self.compressor = self._choose(COMPRESSORS, compressor, DEFAULT_COMPRESSOR)
+
+    @staticmethod
+    def _choose(choices, name, default):
+        """Return the available choice called `name`, or the default one."""
+        if name not in choices:
+            raise ValueError(u"Unknown course structure cache codec {!r}, expected one of {}".format(
+                name, ', '.join(sorted(choices))
+            ))
+        if not choices[name].available:
+            log.warning(u"The %r course structure cache codec isn't installed, using %r", name, default)
+            return choices[default]
+        return choices[name]
+
+    @property
+    def name(self):
+        """The name of this codec, e.g. "compact+zlib"."""
+        return '{}+{}'.format(self.serializer.name, self.compressor.name)
+
+    def encode(self, structure, tagger=None):
+        """
+        Return `structure` encoded as bytes.
+
+        The sizes of the structure before and after compression are measured
+        with `tagger`, if it's given.
+        """
+        serializer = self.serializer
+        try:
+            serialized = serializer.dumps(structure)
+        except TypeError:
+            log.warning(
+                u"Can't encode structure %s with the %s serializer, pickling it instead",
+                structure.get('_id'), serializer.name, exc_info=True
+            )
+            serializer = SERIALIZERS['pickle']
+            serialized = serializer.dumps(structure)
+
+        compressed = self.compressor.compress(serialized)
+        if tagger is not None:
+            tagger.measure('uncompressed_size', len(serialized))
+            tagger.measure('compressed_size', len(compressed) + 1)
+        return chr(serializer.id << 4 | self.compressor.id) + compressed
+
+    def decode(self, data, tagger=None):
+        """
+        Return the structure encoded in `data` by any codec.
+
+        Raises StructureDecodeError if this process can't decode it.
+        """
+        if tagger is not None:
+            tagger.measure('compressed_size', len(data))
+
+        header = ord(data[0])
+        if header == LEGACY_HEADER:
+            serializer, compressor, payload = SERIALIZERS['pickle'], COMPRESSORS['zlib'], data
+        else:
+            serializer = _SERIALIZERS_BY_ID.get(header >> 4)
+            compressor = _COMPRESSORS_BY_ID.get(header & 0xf)
+            payload = data[1:]
+            if serializer is None or compressor is None:
+                raise StructureDecodeError(u"Unknown course structure codec header {:#x}".format(header))
+            if not (serializer.available and compressor.available):
+                raise StructureDecodeError(u"The {}+{} course structure codec isn't installed".format(
+                    serializer.name, compressor.name
+                ))
+
+        serialized = compressor.decompress(payload)
+        if tagger is not None:
+            tagger.measure('uncompressed_size', len(serialized))
+        return serializer.loads(serialized)
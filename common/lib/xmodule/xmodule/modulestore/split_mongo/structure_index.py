@@ -0,0 +1,220 @@
+"""
+Secondary indexes over the blocks of split course structures.
+
+A saved structure never changes, so its indexes are built the first time
+they're needed and kept, by structure id, in a least-recently-used cache
+local to this process.  Structures still being edited aren't indexed.
+"""
+import threading
+from collections import OrderedDict
+
+from lazy import lazy
+
+from xmodule.modulestore.split_mongo import BlockKey
+
+# Settings fields whose values are indexed.  These are the ones that
+# get_items is commonly asked to match.
+INDEXED_SETTINGS = ('display_name', 'group_access', 'is_entrance_exam', 'is_time_limited', 'format', 'graded')
+
+# Number of structures whose indexes are kept in each process.
+MAX_INDEXED_STRUCTURES = 100
+
+# Types of the blocks which are the root of a tree, when they have no parent.
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+class FieldIndex(object):
+    """
+    The blocks of a structure, by the value of one of their fields.
+
+    Blocks whose value can't be hashed, such as a list, are kept apart and
+    are candidates for every value.
+    """
+    # Types of criteria which only match values equal to them.
+    PLAIN_TYPES = (basestring, bool, int, long, float)
+
+    def __init__(self):
+        self.values = {}
+        self.unhashable = []
+
+    def add(self, value, block_key):
+        """
+        Add `block_key`, whose field is set to `value`.
+        """
+        try:
+            self.values.setdefault(value, []).append(block_key)
+        except TypeError:
+            self.unhashable.append(block_key)
+
+    def candidates(self, criteria, value_matches):
+        """
+        Return a list of the blocks which can match `criteria`, or None if every block can.
+
+        `value_matches(value, criteria)` is ModuleStoreRead._value_matches.
+        """
+        if isinstance(criteria, dict) and '$exists' in criteria:
+            if not criteria['$exists']:
+                return None
+            blocks = list(self.unhashable)
+            for value_blocks in self.values.itervalues():
+                blocks.extend(value_blocks)
+            return blocks
+
+        if isinstance(criteria, self.PLAIN_TYPES):
+            blocks = list(self.values.get(criteria, ()))
+        else:
+            # Regular expressions, functions, $in and $nin are tested against every value.
+            blocks = []
+            for value, value_blocks in self.values.iteritems():
+                if value_matches(value, criteria):
+                    blocks.extend(value_blocks)
+        return blocks + self.unhashable
+
+
+class StructureIndex(object):
+    """
+    Indexes of the blocks of a structure: by type, by id, by the values of
+    INDEXED_SETTINGS, and by child, along with its RootPathIndex.
+    """
+    def __init__(self, structure):
+        self.block_type = FieldIndex()
+        self.block_id = FieldIndex()
+        self.settings = {field_name: FieldIndex() for field_name in INDEXED_SETTINGS}
+        # The parents of every block which is some block's child, in the order of the structure's blocks.
+        self.parents = {}
+
+        for block_key, block_data in structure['blocks'].iteritems():
+            self.block_type.add(block_data.block_type, block_key)
+            self.block_id.add(block_key.id, block_key)
+            for field_name, field_index in self.settings.iteritems():
+                if field_name in block_data.fields:
+                    field_index.add(block_data.fields[field_name], block_key)
+            for child in block_data.fields.get('children', ()):
+                self.parents.setdefault(BlockKey(*child), []).append(block_key)
+        self.root_paths = RootPathIndex(structure, self.parents)
+
+    @lazy
+    def parent_map(self):
+        """
+        The parent of every block which has one.  A block with several
+        parents is mapped to the last of them.
+        """
+        return {block_key: parents[-1] for block_key, parents in self.parents.iteritems()}
+
+    def blocks_with_ids(self, block_ids):
+        """
+        Return the blocks whose id is `block_ids`, if it's a string, or else is in `block_ids`.
+        """
+        if isinstance(block_ids, basestring):
+            block_ids = [block_ids]
+        blocks = []
+        for block_id in OrderedDict.fromkeys(block_ids):
+            blocks.extend(self.block_id.values.get(block_id, ()))
+        return blocks
+
+    def candidates(self, qualifiers, settings, value_matches):
+        """
+        Return the blocks that can match both `qualifiers` and `settings`, as
+        given to get_items, or None if the indexes can't narrow them down.
+
+        The candidates must still be checked against all the criteria.
+        """
+        indexed = []
+        if 'block_type' in qualifiers:
+            indexed.append((self.block_type, qualifiers['block_type']))
+        for field_name, criteria in settings.iteritems():
+            if field_name in self.settings:
+                indexed.append((self.settings[field_name], criteria))
+
+        candidates = None
+        for field_index, criteria in indexed:
+            blocks = field_index.candidates(criteria, value_matches)
+            if blocks is None:
+                continue
+            if candidates is None:
+                candidates = blocks
+            else:
+                blocks = set(blocks)
+                candidates = [block_key for block_key in candidates if block_key in blocks]
+        return candidates
+
+
+class RootPathIndex(object):
+    """
+    The blocks of a structure which have a path to the root.
+
+    The blocks are walked from the structure's root, and from any other
+    course or library block without a parent.  Blocks which can't be reached
+    this way have no path to the root.
+    """
+    def __init__(self, structure, parents):
+        self.parents = parents
+        self.rooted = set()
+
+        blocks = structure['blocks']
+        pending = [structure['root']] + [
+            block_key for block_key, block_data in blocks.iteritems()
+            if block_data.block_type in ROOT_BLOCK_TYPES and block_key not in parents
+        ]
+        while pending:
+            block_key = pending.pop()
+            if block_key in self.rooted:
+                continue
+            self.rooted.add(block_key)
+            block_data = blocks.get(block_key)
+            if block_data is not None:
+                pending.extend(BlockKey(*child) for child in block_data.fields.get('children', ()))
+
+    def has_path_to_root(self, block_key):
+        """
+        Return whether `block_key` is the root or the descendant of a course or library block without a parent.
+        """
+        if block_key in self.rooted:
+            return True
+        # As in SplitMongoModuleStore.has_path_to_root, even missing course and library blocks are roots.
+        return block_key.type in ROOT_BLOCK_TYPES and block_key not in self.parents
+
+
+class StructureIndexCache(object):
+    """
+    A least-recently-used cache of StructureIndexes, by structure id.
+    """
+    def __init__(self, max_structures=MAX_INDEXED_STRUCTURES):
+        self.max_structures = max_structures
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, structure):
+        """
+        Return the index of `structure`, building it if it isn't cached.
+        """
+        structure_id = structure['_id']
+        with self._lock:
+            index = self._indexes.pop(structure_id, None)
+            if index is not None:
+                self._indexes[structure_id] = index
+                return index
+
+        index = StructureIndex(structure)
+        with self._lock:
+            self._indexes[structure_id] = index
+            while len(self._indexes) > self.max_structures:
+                self._indexes.popitem(last=False)
+        return index
+
+    def discard(self, structure_id):
+        """
+        Remove the index of the structure with id `structure_id`, if it's cached.
+        """
+        with self._lock:
+            self._indexes.pop(structure_id, None)
+
+    def clear(self):
+        """
+        Remove all the cached indexes.
+        """
+        with self._lock:
+            self._indexes.clear()
+
+
+STRUCTURE_INDEXES = StructureIndexCache()
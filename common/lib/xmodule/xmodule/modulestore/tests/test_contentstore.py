@@ -1,7 +1,10 @@
 """
  Test contentstore.mongo functionality
 """
+import json
 import logging
+import tarfile
+from io import BytesIO
 from uuid import uuid4
 import unittest
 import mimetypes
@@ -15,6 +18,7 @@ from xmodule.tests import DATA_DIR
 from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
+from xmodule.util.tar_stream_fs import TarStreamFS
 import ddt
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
@@ -145,6 +149,27 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_to_tar(self, deprecated):
+        """
+        Test exporting the assets straight into a tar stream
+        """
+        self.set_up_assets(deprecated)
+        output = BytesIO()
+        with TarStreamFS(output) as tar_fs:
+            self.contentstore.export_all_for_course_to_fs(self.course1_key, tar_fs.makedir(u'course'))
+
+        output.seek(0)
+        with tarfile.open(fileobj=output) as tar_file:
+            names = tar_file.getnames()
+            policy = json.load(tar_file.extractfile('course/policies/assets.json'))
+        for filename in self.course1_files:
+            self.assertIn('course/static/' + filename, names)
+            self.assertIn(filename, policy)
+        for filename in self.course2_files:
+            if filename not in self.course1_files:
+                self.assertNotIn('course/static/' + filename, names)
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
@@ -13,6 +13,7 @@ import os
 import ddt
 from contracts import contract
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
@@ -32,6 +33,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import get_local_structure_cache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -999,6 +1001,43 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache(self, mock_get_cache):
+        mock_get_cache.side_effect = InvalidCacheBackendError
+
+        with override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS=1000):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # the structure is now in the process-local cache, even without a django cache
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+
+            get_local_structure_cache().clear()
+
+        self.assertIs(cached_structure, not_cached_structure)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_structures(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        other_course = modulestore().create_course(
+            'org', 'other_course', 'test_run', self.user, BRANCH_NAME_DRAFT,
+        )
+        version_guids = [
+            course.location.as_object_id(course.location.version_guid)
+            for course in (self.new_course, other_course)
+        ]
+
+        # all the structures are read with a single query
+        with check_mongo_calls(1):
+            structures = modulestore().db_connection.get_structures(version_guids + version_guids[:1])
+        self.assertEqual(set(structures), set(version_guids))
+
+        with check_mongo_calls(0):
+            cached_structures = modulestore().db_connection.get_structures(version_guids)
+        self.assertEqual(cached_structures, structures)
+        self.assertEqual(cached_structures[version_guids[0]], self._get_structure(self.new_course))
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1221,6 +1260,24 @@ class SplitModuleItemTests(SplitModuleTest):
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         self.assertEqual(len(matches), 7)
 
+    def test_get_items_in_bulk_operation(self):
+        """
+        get_items finds blocks added to a structure that's still being edited, so isn't indexed
+        """
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        self.assertEqual(len(modulestore().get_items(locator, qualifiers={'category': 'chapter'})), 4)
+        with modulestore().bulk_operations(locator):
+            modulestore().create_child(
+                'testbot', BlockUsageLocator(locator, 'course', 'head12345'), 'chapter',
+                block_id='new_chapter', fields={'display_name': 'New Chapter'},
+            )
+            matches = modulestore().get_items(locator, qualifiers={'category': 'chapter'})
+            self.assertEqual(len(matches), 5)
+            matches = modulestore().get_items(locator, qualifiers={'name': 'new_chapter'})
+            self.assertEqual(len(matches), 1)
+        matches = modulestore().get_items(locator, settings={'display_name': 'New Chapter'})
+        self.assertEqual([match.location.block_id for match in matches], ['new_chapter'])
+
     def test_get_parents(self):
         '''
         get_parent_location(locator): BlockUsageLocator
@@ -1262,6 +1319,64 @@ class SplitModuleItemTests(SplitModuleTest):
         self.assertEqual(len(expected_ids), 0)
 
 
+class SplitModuleLazyFieldsTests(SplitModuleTest):
+    """
+    Tests for loading blocks whose field data is built lazily
+    """
+    def setUp(self):
+        super(SplitModuleLazyFieldsTests, self).setUp()
+        self.locator = CourseLocator(org='testx', course='GreekHero', run='run', branch=BRANCH_NAME_DRAFT)
+
+    def _load_course(self, lazy_fields):
+        """
+        Load the course with all its blocks, with lazy_fields set as given.
+        """
+        with patch.object(modulestore(), 'lazy_fields', lazy_fields):
+            return modulestore().get_course(self.locator, depth=None)
+
+    def _field_values(self, block):
+        """
+        Return the values of all of the fields of `block` and its descendants, by location.
+        """
+        values = {block.location: {name: field.read_from(block) for name, field in block.fields.iteritems()}}
+        for child in block.get_children():
+            values.update(self._field_values(child))
+        return values
+
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_same_field_values(self, _from_json):
+        self.assertEqual(self._field_values(self._load_course(True)), self._field_values(self._load_course(False)))
+
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_simple_fields_dont_build_field_data(self, _from_json):
+        course = self._load_course(True)
+        chapters = course.get_children()
+        self.assertGreater(len(chapters), 0)
+        for chapter in chapters:
+            self.assertEqual(chapter.get_parent().location, course.location)
+            self.assertTrue(chapter.display_name)
+            self.assertFalse(chapter.visible_to_staff_only)
+            self.assertFalse(chapter._field_data._kvs.built)  # pylint: disable=protected-access
+        self.assertEqual(course.display_name, "The Ancient Greek Hero")
+        self.assertFalse(course._field_data._kvs.built)  # pylint: disable=protected-access
+
+        # Fields which aren't simple, or come from the definition, build it
+        self.assertDictEqual(course.grade_cutoffs, {"Pass": 0.55})
+        self.assertTrue(course._field_data._kvs.built)  # pylint: disable=protected-access
+
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_update_item(self, _from_json):
+        course = self._load_course(True)
+        chapter = course.get_children()[0]
+        chapter.display_name = u'Updated'
+        with patch.object(modulestore(), 'lazy_fields', True):
+            modulestore().update_item(chapter, self.user_id)
+
+            updated_course = modulestore().get_course(self.locator, depth=None)
+        self.assertEqual(updated_course.get_children()[0].display_name, u'Updated')
+        self.assertEqual(course.get_children()[1].display_name, updated_course.get_children()[1].display_name)
+
+
 def version_agnostic(children):
     """
     children: list of descriptors
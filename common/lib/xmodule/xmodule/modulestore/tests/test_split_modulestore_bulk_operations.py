@@ -395,10 +395,10 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
 
     def test_no_bulk_find_structures_by_id(self):
         ids = [Mock(name='id')]
-        self.conn.find_structures_by_id.return_value = [MagicMock(name='result')]
+        self.conn.get_structures.return_value = {ids[0]: MagicMock(name='result')}
         result = self.bulk.find_structures_by_id(ids)
-        self.assertConnCalls(call.find_structures_by_id(ids))
-        self.assertEqual(result, self.conn.find_structures_by_id.return_value)
+        self.assertConnCalls(call.get_structures(ids))
+        self.assertEqual(result, self.conn.get_structures.return_value.values())
         self.assertCacheNotCleared()
 
     @ddt.data(
@@ -418,9 +418,9 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
             self.bulk._begin_bulk_operation(course_key)
             self.bulk.update_structure(course_key, active_structure(_id))
 
-        self.conn.find_structures_by_id.return_value = db_structures
+        self.conn.get_structures.return_value = {structure['_id']: structure for structure in db_structures}
         results = self.bulk.find_structures_by_id(search_ids)
-        self.conn.find_structures_by_id.assert_called_once_with(list(set(search_ids) - set(active_ids)))
+        self.conn.get_structures.assert_called_once_with(list(set(search_ids) - set(active_ids)))
         for _id in active_ids:
             if _id in search_ids:
                 self.assertIn(active_structure(_id), results)
@@ -1,7 +1,7 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache, MongoConnection
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -18,3 +18,40 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestLocalStructureCache(unittest.TestCase):
+    """ Test that the process-local structure cache is bounded by number of blocks """
+
+    def _structure(self, num_blocks):
+        """ Return a fake structure with `num_blocks` blocks """
+        return {'blocks': {index: {} for index in range(num_blocks)}}
+
+    def test_get_set(self):
+        cache = LocalStructureCache(10)
+        structure = self._structure(3)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', structure)
+        self.assertIs(cache.get('a'), structure)
+
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalStructureCache(10)
+        cache.set('a', self._structure(4))
+        cache.set('b', self._structure(4))
+        cache.get('a')
+        cache.set('c', self._structure(4))
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_skips_large_structures(self):
+        cache = LocalStructureCache(10)
+        cache.set('a', self._structure(4))
+        cache.set('b', self._structure(11))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
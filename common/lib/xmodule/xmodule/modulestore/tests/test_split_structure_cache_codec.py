@@ -0,0 +1,125 @@
+""" Test the codecs for course structures in split_mongo/structure_cache_codec """
+import cPickle as pickle
+import datetime
+import unittest
+import zlib
+
+import ddt
+import pytz
+from bson.objectid import ObjectId
+from mock import patch
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_cache_codec import (
+    COMPRESSORS,
+    SERIALIZERS,
+    StructureCodec,
+    StructureDecodeError
+)
+
+
+def make_structure(num_children=3):
+    """ Return a structure with a course block and `num_children` chapters """
+    edited_on = datetime.datetime(2019, 5, 1, 12, 30, 15, 123456, tzinfo=pytz.utc)
+    version = ObjectId()
+    root = BlockKey(u'course', u'course')
+    children = [BlockKey(u'chapter', u'chapter_{}'.format(index)) for index in range(num_children)]
+    blocks = {
+        root: BlockData(
+            block_type=u'course',
+            definition=ObjectId(),
+            fields={u'children': children, u'display_name': u'Caf\xe9', u'tabs': [{u'type': u'courseware'}]},
+            defaults={},
+            edit_info={u'edited_on': edited_on, u'edited_by': 4, u'update_version': version},
+        )
+    }
+    for child in children:
+        blocks[child] = BlockData(
+            block_type=child.type,
+            definition=ObjectId(),
+            fields={u'start': datetime.datetime(2019, 1, 1), u'weight': 1.5, u'graded': True},
+            defaults={u'format': u'Homework'},
+            asides={u'aside': {u'data': None}},
+            edit_info={u'edited_on': edited_on, u'edited_by': 4, u'previous_version': version},
+        )
+    return {
+        '_id': ObjectId(),
+        'root': root,
+        'previous_version': None,
+        'original_version': version,
+        'edited_by': 4,
+        'edited_on': edited_on,
+        'schema_version': 1,
+        'blocks': blocks,
+    }
+
+
+@ddt.ddt
+class TestStructureCodec(unittest.TestCase):
+    """ Test encoding and decoding course structures """
+
+    @ddt.data(*[
+        (serializer, compressor)
+        for serializer in sorted(SERIALIZERS)
+        for compressor in sorted(COMPRESSORS)
+    ])
+    @ddt.unpack
+    def test_round_trip(self, serializer, compressor):
+        codec = StructureCodec(serializer, compressor)
+        self.assertEqual(codec.name, '{}+{}'.format(serializer, compressor))
+
+        structure = make_structure()
+        self.assertEqual(codec.decode(codec.encode(structure)), structure)
+
+    def test_compact_interns_block_keys(self):
+        codec = StructureCodec('compact', 'none')
+        structure = codec.decode(codec.encode(make_structure()))
+
+        block_keys = {block_key: block_key for block_key in structure['blocks']}
+        self.assertIs(structure['root'], block_keys[structure['root']])
+        for child in structure['blocks'][structure['root']].fields['children']:
+            self.assertIsInstance(child, BlockKey)
+            self.assertIs(child, block_keys[child])
+
+    def test_compact_is_smaller(self):
+        structure = make_structure(num_children=100)
+        pickled = StructureCodec('pickle', 'none').encode(structure)
+        compact = StructureCodec('compact', 'none').encode(structure)
+        self.assertLess(len(compact), len(pickled))
+
+    def test_decodes_any_codec(self):
+        structure = make_structure()
+        encoded = StructureCodec('compact', 'zlib').encode(structure)
+        self.assertEqual(StructureCodec('pickle', 'none').decode(encoded), structure)
+
+    def test_decodes_legacy_structures(self):
+        structure = make_structure()
+        legacy = zlib.compress(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL), 1)
+        self.assertEqual(StructureCodec('compact', 'zlib').decode(legacy), structure)
+
+    def test_unknown_header(self):
+        with self.assertRaises(StructureDecodeError):
+            StructureCodec().decode(chr(0xff) + 'data')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            StructureCodec('json')
+
+    def test_unavailable_codec(self):
+        with patch.object(COMPRESSORS['lz4'], 'available', False):
+            codec = StructureCodec('compact', 'lz4')
+            self.assertEqual(codec.name, 'compact+zlib')
+
+            encoded = StructureCodec('compact', 'none').encode(make_structure())
+            encoded = chr(ord(encoded[0]) | COMPRESSORS['lz4'].id) + encoded[1:]
+            with self.assertRaises(StructureDecodeError):
+                codec.decode(encoded)
+
+    def test_pickles_unpackable_structures(self):
+        structure = make_structure()
+        structure['blocks'][structure['root']].fields[u'unpackable'] = {1, 2}
+
+        encoded = StructureCodec('compact', 'zlib').encode(structure)
+        self.assertEqual(ord(encoded[0]) >> 4, SERIALIZERS['pickle'].id)
+        self.assertEqual(StructureCodec().decode(encoded), structure)
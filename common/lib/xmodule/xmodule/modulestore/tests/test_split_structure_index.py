@@ -0,0 +1,177 @@
+""" Test the indexes of course structures in split_mongo/structure_index """
+import re
+import unittest
+
+import ddt
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData, ModuleStoreRead
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, StructureIndexCache
+
+
+def make_block(block_type, **fields):
+    """ Return a BlockData of type `block_type` with `fields` """
+    return BlockData(block_type=block_type, definition=ObjectId(), fields=fields, defaults={}, edit_info={})
+
+
+def make_structure():
+    """ Return a structure with a course, two chapters, a problem, an orphan and a static tab """
+    course = BlockKey('course', 'course')
+    chapters = [BlockKey('chapter', 'intro'), BlockKey('chapter', 'exam')]
+    problem = BlockKey('problem', 'exam')
+    return {
+        '_id': ObjectId(),
+        'root': course,
+        'blocks': {
+            course: make_block('course', children=chapters, display_name='Course'),
+            chapters[0]: make_block('chapter', display_name='Introduction'),
+            chapters[1]: make_block(
+                'chapter', children=[list(problem)], display_name='Exam', is_entrance_exam=True
+            ),
+            problem: make_block('problem', display_name='Exam', group_access={'50': [1]}, graded=True),
+            BlockKey('html', 'orphan'): make_block('html', display_name=['not', 'hashable']),
+            BlockKey('static_tab', 'tab'): make_block('static_tab'),
+        },
+    }
+
+
+class ValueMatcher(object):
+    """ Matches values against get_items criteria as the modulestores do """
+    _value_matches = ModuleStoreRead.__dict__['_value_matches']
+
+
+value_matches = ValueMatcher()._value_matches  # pylint: disable=protected-access
+
+
+@ddt.ddt
+class TestStructureIndex(unittest.TestCase):
+    """ Test finding the blocks that can match get_items criteria """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.structure = make_structure()
+        self.index = StructureIndex(self.structure)
+
+    def candidates(self, qualifiers, settings=None):
+        """ Return the set of ids of the candidates for `qualifiers` and `settings`, or None """
+        candidates = self.index.candidates(qualifiers, settings or {}, value_matches)
+        return None if candidates is None else {block_key.id for block_key in candidates}
+
+    @ddt.data(
+        ({'block_type': 'chapter'}, {}, {'intro', 'exam'}),
+        ({'block_type': 'vertical'}, {}, set()),
+        ({'block_type': {'$in': ['chapter', 'problem']}}, {}, {'intro', 'exam'}),
+        ({'block_type': re.compile('^(course|html)$')}, {}, {'course', 'orphan'}),
+        ({}, {'display_name': 'Exam'}, {'exam', 'orphan'}),
+        ({}, {'display_name': lambda name: name.startswith('Intro')}, {'intro', 'orphan'}),
+        ({}, {'graded': True}, {'exam'}),
+        ({}, {'is_entrance_exam': {'$exists': True}}, {'exam'}),
+        ({'block_type': 'chapter'}, {'display_name': 'Exam'}, {'exam'}),
+        ({'block_type': 'problem'}, {'group_access': {'$exists': True}}, {'exam'}),
+    )
+    @ddt.unpack
+    def test_candidates(self, qualifiers, settings, expected):
+        self.assertEqual(self.candidates(qualifiers, settings), expected)
+
+    @ddt.data(
+        ({}, {}),
+        ({'definition': ObjectId()}, {}),
+        ({}, {'due': None}),
+        ({}, {'graded': {'$exists': False}}),
+    )
+    @ddt.unpack
+    def test_no_candidates(self, qualifiers, settings):
+        self.assertIsNone(self.candidates(qualifiers, settings))
+
+    def test_candidates_match_scan(self):
+        # Every block matching the criteria must be a candidate.
+        for qualifiers, settings in (
+            ({'block_type': 'chapter'}, {'display_name': re.compile('^E')}),
+            ({}, {'display_name': {'$nin': ['Course', 'Exam']}}),
+            ({}, {'display_name': 'hashable'}),
+        ):
+            matching = {
+                block_key.id for block_key, block in self.structure['blocks'].iteritems()
+                if all(value_matches(block.block_type, criteria) for criteria in qualifiers.values()) and
+                all(
+                    name in block.fields and value_matches(block.fields[name], criteria)
+                    for name, criteria in settings.iteritems()
+                )
+            }
+            self.assertLessEqual(matching, self.candidates(qualifiers, settings))
+
+    def test_blocks_with_ids(self):
+        self.assertEqual(
+            set(self.index.blocks_with_ids('exam')), {BlockKey('chapter', 'exam'), BlockKey('problem', 'exam')}
+        )
+        self.assertEqual(self.index.blocks_with_ids(['intro', 'intro', 'missing']), [BlockKey('chapter', 'intro')])
+
+    def test_parents(self):
+        course, exam = BlockKey('course', 'course'), BlockKey('chapter', 'exam')
+        self.assertEqual(self.index.parents, {
+            BlockKey('chapter', 'intro'): [course],
+            exam: [course],
+            BlockKey('problem', 'exam'): [exam],
+        })
+        self.assertEqual(self.index.parent_map[BlockKey('problem', 'exam')], exam)
+
+
+class TestRootPathIndex(unittest.TestCase):
+    """ Test which blocks have a path to the root """
+    def setUp(self):
+        super(TestRootPathIndex, self).setUp()
+        self.structure = make_structure()
+        self.course = BlockKey('course', 'course')
+        self.intro, self.exam = BlockKey('chapter', 'intro'), BlockKey('chapter', 'exam')
+        self.problem, self.orphan = BlockKey('problem', 'exam'), BlockKey('html', 'orphan')
+
+    def root_paths(self):
+        """ Return the RootPathIndex of the structure """
+        return StructureIndex(self.structure).root_paths
+
+    def test_tree(self):
+        root_paths = self.root_paths()
+        self.assertEqual(root_paths.rooted, {self.course, self.intro, self.exam, self.problem})
+        self.assertTrue(root_paths.has_path_to_root(self.course))
+        self.assertTrue(root_paths.has_path_to_root(self.problem))
+        self.assertFalse(root_paths.has_path_to_root(self.orphan))
+        self.assertTrue(root_paths.has_path_to_root(BlockKey('library', 'missing')))
+
+    def test_orphan_subtree(self):
+        self.structure['blocks'][self.orphan].fields['children'] = [self.intro]
+        root_paths = self.root_paths()
+        self.assertTrue(root_paths.has_path_to_root(self.intro))
+        self.assertFalse(root_paths.has_path_to_root(self.orphan))
+
+    def test_cycle(self):
+        self.structure['blocks'][self.problem].fields['children'] = [self.exam]
+        root_paths = self.root_paths()
+        self.assertTrue(root_paths.has_path_to_root(self.problem))
+        self.assertFalse(root_paths.has_path_to_root(self.orphan))
+
+
+class TestStructureIndexCache(unittest.TestCase):
+    """ Test the least-recently-used cache of structure indexes """
+    def test_get(self):
+        cache = StructureIndexCache(max_structures=2)
+        first, second, third = make_structure(), make_structure(), make_structure()
+
+        index = cache.get(first)
+        self.assertIs(cache.get(first), index)
+        cache.get(second)
+        cache.get(first)
+        cache.get(third)
+
+        # The second structure was the least recently used.
+        self.assertIs(cache.get(first), index)
+        self.assertEqual(list(cache._indexes), [third['_id'], first['_id']])  # pylint: disable=protected-access
+
+    def test_discard(self):
+        cache = StructureIndexCache()
+        structure = make_structure()
+        index = cache.get(structure)
+        cache.discard(structure['_id'])
+        cache.discard(ObjectId())
+        self.assertIsNot(cache.get(structure), index)
+        cache.clear()
+        self.assertIsNot(cache.get(structure), index)
@@ -386,3 +386,19 @@ class StaticContentImporterTest(unittest.TestCase):
             )
             mock_file.assert_called_with(full_file_path, 'rb')
             self.mocked_content_store.assert_called_once()
+
+    def test_import_static_content_directory_in_parallel(self):
+        self.static_content_importer.max_workers = 3
+        file_names = ['file{}.txt'.format(index) for index in range(10)]
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=[('static', None, file_names)]
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file',
+            side_effect=lambda file_path, base_dir: (file_path, file_path.upper())
+        ) as patched_import_static_file:
+            remap_dict = self.static_content_importer.import_static_content_directory('static')
+            self.assertEqual(patched_import_static_file.call_count, len(file_names))
+            self.assertEqual(remap_dict, {
+                'static/' + file_name: 'STATIC/' + file_name.upper() for file_name in file_names
+            })
@@ -27,6 +27,9 @@ import mimetypes
 import os
 import re
 from abc import abstractmethod
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer
 
 import xblock
 from lxml import etree
@@ -42,7 +45,7 @@ from xmodule.contentstore.content import StaticContent
 from xmodule.errortracker import make_error_tracker
 from xmodule.library_tools import LibraryToolsService
 from xmodule.modulestore import ModuleStoreEnum
-from xmodule.modulestore.django import ASSET_IGNORE_REGEX
+from xmodule.modulestore.django import ASSET_IGNORE_REGEX, STATIC_CONTENT_IMPORT_WORKERS
 from xmodule.modulestore.exceptions import DuplicateCourseError
 from xmodule.modulestore.mongo.base import MongoRevisionKey
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
@@ -81,10 +84,14 @@ class LocationMixin(XBlockMixin):
 
 
 class StaticContentImporter:
-    def __init__(self, static_content_store, course_data_path, target_id):
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=1):
+        """
+        max_workers: the number of static files saved to the static_content_store at once.
+        """
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.max_workers = max_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -101,6 +108,7 @@ class StaticContentImporter:
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -111,18 +119,40 @@ class StaticContentImporter:
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            """
+            Import the static file at file_path.
+            """
+            if verbose:
+                log.debug('importing static content %s...', file_path)
+            return self.import_static_file(file_path, base_dir=static_dir)
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+        for imported_file_attrs in self._map(import_file, file_paths):
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
 
         return remap_dict
 
+    def _map(self, function, items):
+        """
+        Return the results of calling function on each of items, in order,
+        making up to max_workers calls at once.
+        """
+        num_workers = min(self.max_workers, len(items))
+        if num_workers <= 1:
+            return [function(item) for item in items]
+
+        pool = ThreadPool(num_workers)
+        try:
+            return pool.map(function, items, chunksize=1)
+        finally:
+            pool.terminate()
+            pool.join()
+
     def import_static_file(self, full_file_path, base_dir):
         filename = os.path.basename(full_file_path)
         try:
@@ -218,6 +248,9 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_content_workers: The number of static files saved to static_content_store at once. Defaults
+            to the COURSE_IMPORT_STATIC_CONTENT_WORKERS setting.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -231,6 +264,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_content_workers=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -242,6 +276,9 @@ class ImportManager(object):
         self.verbose = verbose
         self.static_content_subdir = static_content_subdir
         self.python_lib_filename = python_lib_filename
+        if static_content_workers is None:
+            static_content_workers = STATIC_CONTENT_IMPORT_WORKERS
+        self.static_content_workers = static_content_workers
         self.do_import_static = do_import_static
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
@@ -277,7 +314,8 @@ class ImportManager(object):
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            max_workers=self.static_content_workers,
         )
         if self.do_import_static:
             if self.verbose:
@@ -496,32 +534,57 @@ class ImportManager(object):
             except DuplicateCourseError:
                 continue
 
+            stage_times = []
+
             # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
+            with _timed_stage(stage_times, 'published'), self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+                with _timed_stage(stage_times, 'courselike'):
+                    source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
                 # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                with _timed_stage(stage_times, 'static'):
+                    self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                with _timed_stage(stage_times, 'asset_metadata'):
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                with _timed_stage(stage_times, 'children'):
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with _timed_stage(stage_times, 'drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
+            log.info(
+                u'Imported %s into %s in %s', courselike_key, dest_id,
+                u', '.join(u'{}={:.2f}s'.format(stage, seconds) for stage, seconds in stage_times)
+            )
             yield courselike
 
 
+@contextmanager
+def _timed_stage(stage_times, stage):
+    """
+    Append the name of the stage and the number of seconds the block took to stage_times.
+
+    The published stage includes the time spent saving the bulk operation, which ends after
+    the stages within it.
+    """
+    start = default_timer()
+    try:
+        yield
+    finally:
+        stage_times.append((stage, default_timer() - start))
+
+
 class CourseImportManager(ImportManager):
     """
     Import manager for Courses.
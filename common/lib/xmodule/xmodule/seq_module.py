@@ -468,6 +468,9 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
             self.get_parent().display_name_with_default,
             self.display_name_with_default
         ]
+        vertical_completions = {}
+        if is_user_authenticated and completion_service:
+            vertical_completions = self._get_vertical_completions(completion_service, display_items)
         contents = []
         for item in display_items:
             # NOTE (CCB): This seems like a hack, but I don't see a better method of determining the type/category.
@@ -504,15 +507,42 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
                 'graded': item.graded
             }
 
-            if is_user_authenticated:
-                if item.location.block_type == 'vertical':
-                    if completion_service:
-                        iteminfo['complete'] = completion_service.vertical_is_complete(item)
+            if item.location in vertical_completions:
+                iteminfo['complete'] = vertical_completions[item.location]
 
             contents.append(iteminfo)
 
         return contents
 
+    @staticmethod
+    def _get_vertical_completions(completion_service, display_items):
+        """
+        Returns a dict of whether each vertical in display_items is complete,
+        by location, as given by the completion service's vertical_is_complete.
+
+        The completions of the children of all the verticals are looked up at
+        once, rather than with one query for each vertical.
+        """
+        vertical_children = {
+            item.location: [
+                child.location for child in item.get_children() if child.location.block_type != 'discussion'
+            ]
+            for item in display_items
+            if item.location.block_type == 'vertical'
+        }
+        if not vertical_children or not completion_service.completion_tracking_enabled():
+            return dict.fromkeys(vertical_children)
+
+        completions = completion_service.get_completions([
+            child_location
+            for child_locations in vertical_children.itervalues()
+            for child_location in child_locations
+        ])
+        return {
+            location: all(completions[child_location] >= 1.0 for child_location in child_locations)
+            for location, child_locations in vertical_children.iteritems()
+        }
+
     def _locations_in_subtree(self, node):
         """
         The usage keys for all descendants of an XBlock/XModule as a flat list.
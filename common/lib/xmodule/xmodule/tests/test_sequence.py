@@ -78,7 +78,11 @@ class SequenceBlockTestCase(XModuleXmlImportTest):
 
         block.xmodule_runtime._services['bookmarks'] = Mock()  # pylint: disable=protected-access
         block.xmodule_runtime._services['completion'] = Mock(  # pylint: disable=protected-access
-            return_value=Mock(vertical_is_complete=Mock(return_value=True))
+            return_value=Mock(
+                vertical_is_complete=Mock(return_value=True),
+                completion_tracking_enabled=Mock(return_value=True),
+                get_completions=Mock(side_effect=lambda locations: dict.fromkeys(locations, 1.0)),
+            )
         )
         block.xmodule_runtime._services['user'] = StubUserService()  # pylint: disable=protected-access
         block.xmodule_runtime.xmodule_instance = getattr(block, '_xmodule', None)  # pylint: disable=protected-access
@@ -162,6 +166,21 @@ class SequenceBlockTestCase(XModuleXmlImportTest):
         html = self._get_rendered_view(self.sequence_3_1, requested_child='last', view=view)
         self._assert_view_at_position(html, expected_position=3)
 
+    def test_student_view_completions(self):
+        completion_service = self.sequence_3_1.runtime.service(self.sequence_3_1, 'completion')
+        html = self._get_rendered_view(self.sequence_3_1)
+        self.assertEqual(html.count("'complete': True"), 3)
+        # The completions of all the verticals are looked up together.
+        completion_service.get_completions.assert_called_once_with([])
+        completion_service.vertical_is_complete.assert_not_called()
+
+    def test_student_view_completion_tracking_disabled(self):
+        completion_service = self.sequence_3_1.runtime.service(self.sequence_3_1, 'completion')
+        completion_service.completion_tracking_enabled.return_value = False
+        html = self._get_rendered_view(self.sequence_3_1)
+        self.assertEqual(html.count("'complete': None"), 3)
+        completion_service.get_completions.assert_not_called()
+
     def test_tooltip(self):
         html = self._get_rendered_view(self.sequence_3_1, requested_child=None)
         for child in self.sequence_3_1.children:
@@ -0,0 +1,75 @@
+"""
+Tests for xmodule.util.tar_stream_fs
+"""
+import tarfile
+import unittest
+from io import BytesIO
+
+from fs import errors
+
+from xmodule.util.tar_stream_fs import TarStreamFS
+
+
+class TestTarStreamFS(unittest.TestCase):
+    """
+    Test writing a tar archive through TarStreamFS
+    """
+    def setUp(self):
+        super(TestTarStreamFS, self).setUp()
+        self.output = BytesIO()
+        self.tar_fs = TarStreamFS(self.output)
+
+    def read_archive(self):
+        """
+        Close the filesystem and return a dict of the archive's members, by name.
+        """
+        self.tar_fs.close()
+        self.output.seek(0)
+        members = {}
+        with tarfile.open(fileobj=self.output) as tar_file:
+            for member in tar_file.getmembers():
+                members[member.name] = tar_file.extractfile(member).read() if member.isfile() else None
+        return members
+
+    def test_write(self):
+        course_fs = self.tar_fs.makedir(u'course')
+        course_fs.makedirs(u'static/images')
+        with course_fs.open(u'course.xml', 'wb') as course_xml:
+            with course_fs.open(u'about.html', 'wb') as about:
+                about.write(b'<p>About</p>')
+            course_xml.write(b'<course/>')
+        course_fs.setbinfile(u'static/images/caf\xe9.png', BytesIO(b'\x89PNG' * 1000))
+        course_fs.setbytes(u'static/empty.txt', b'')
+
+        self.assertEqual(
+            sorted(self.tar_fs.listdir(u'course')), [u'about.html', u'course.xml', u'static']
+        )
+        self.assertTrue(self.tar_fs.isfile(u'course/static/empty.txt'))
+        self.assertEqual(self.read_archive(), {
+            'course': None,
+            'course/static': None,
+            'course/static/images': None,
+            'course/about.html': b'<p>About</p>',
+            'course/course.xml': b'<course/>',
+            u'course/static/images/caf\xe9.png'.encode('utf-8'): b'\x89PNG' * 1000,
+            'course/static/empty.txt': b'',
+        })
+
+    def test_missing_directory(self):
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tar_fs.makedir(u'course/static')
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tar_fs.setbytes(u'course/course.xml', b'<course/>')
+
+    def test_write_only(self):
+        self.tar_fs.setbytes(u'course.xml', b'<course/>')
+        with self.assertRaises(errors.ResourceReadOnly):
+            self.tar_fs.getbytes(u'course.xml')
+        with self.assertRaises(errors.ResourceReadOnly):
+            self.tar_fs.remove(u'course.xml')
+        with self.assertRaises(errors.DirectoryExists):
+            self.tar_fs.makedir(u'course.xml')
+
+    def test_close_leaves_file_open(self):
+        self.tar_fs.close()
+        self.assertFalse(self.output.closed)
@@ -1,8 +1,15 @@
 import re
 from django.conf import settings
+from django.core.cache import caches
+from edx_django_utils import monitoring as monitoring_utils
+
+from capa.safe_exec.cache import DEFAULT_LOCAL_SIZE, DEFAULT_MAX_ENTRY_SIZE, SafeExecCache
 
 DEFAULT_PYTHON_LIB_FILENAME = 'python_lib.zip'
 
+# The process-wide cache of sandboxed code results, see `get_safe_exec_cache`.
+_SAFE_EXEC_CACHE = None
+
 
 def can_execute_unsafe_code(course_id):
     """
@@ -38,3 +45,30 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+def get_safe_exec_cache(course_id):
+    """
+    Return the cache for the results of sandboxed code in `course_id`.
+
+    The process-local tier and the lookup counts are shared by all courses and
+    threads; the shared tier is the Django cache named in the SAFE_EXEC_CACHE setting.
+    """
+    global _SAFE_EXEC_CACHE  # pylint: disable=global-statement
+    config = getattr(settings, 'SAFE_EXEC_CACHE', {})
+    if _SAFE_EXEC_CACHE is None:
+        _SAFE_EXEC_CACHE = SafeExecCache(
+            local_size=config.get('LOCAL_SIZE', DEFAULT_LOCAL_SIZE),
+            max_entry_size=config.get('MAX_ENTRY_SIZE', DEFAULT_MAX_ENTRY_SIZE),
+            timeout=config.get('TIMEOUT'),
+            on_lookup=_record_safe_exec_cache_lookup,
+        )
+    # Django cache connections are per thread, so look this one up on every call.
+    return _SAFE_EXEC_CACHE.for_course(course_id, shared=caches[config.get('CACHE_ALIAS', 'default')])
+
+
+def _record_safe_exec_cache_lookup(course_id, slug, hit):  # pylint: disable=unused-argument
+    """
+    Count safe_exec cache hits and misses in the monitoring custom metrics of the current request.
+    """
+    monitoring_utils.increment('safe_exec_cache.hit' if hit else 'safe_exec_cache.miss')
@@ -0,0 +1,190 @@
+"""
+A write-only filesystem that streams the files written to it into a tar archive.
+
+Exports write the OLX of a course through a pyfilesystem FS.  Writing into a
+TarStreamFS instead of an OSFS builds the archive as the export goes, so it
+never has to be written to a directory first and compressed in a second pass.
+
+The archive is written to a file object as a stream, so the file object only
+needs a `write` method.  Each file opened for writing is kept in memory until
+it's closed, then added to the archive, so the export's small XML and JSON
+files can be written in any order.  Large files, like static assets, should
+be added with `setbinfile`, which copies them into the archive in chunks
+without reading them into memory, when their size can be found by seeking.
+
+Nothing can be read back, removed or changed once it's in the archive.
+Writing a file twice adds it twice, and the last copy wins when it's
+extracted.
+"""
+import io
+import os
+import tarfile
+import time
+
+import six
+from fs import errors
+from fs.base import FS
+from fs.info import Info
+from fs.mode import Mode
+from fs.path import basename, dirname, relpath
+
+
+class _TarMemberFile(io.BytesIO):
+    """
+    A file open for writing in a TarStreamFS, which is added to the archive when it's closed.
+    """
+    def __init__(self, tar_fs, path):
+        super(_TarMemberFile, self).__init__()
+        self._tar_fs = tar_fs
+        self._path = path
+
+    def close(self):
+        """
+        Add the file to the archive, the first time it's closed.
+        """
+        if not self.closed:
+            size = self.tell()
+            self.seek(0)
+            self._tar_fs._add_file(self._path, self, size)  # pylint: disable=protected-access
+        super(_TarMemberFile, self).close()
+
+
+class TarStreamFS(FS):
+    """
+    A write-only filesystem that streams the files and directories made in it
+    into a tar archive written to `fileobj`.
+
+    `mode` is the tarfile stream mode, by default a gzipped tar.  Closing the
+    filesystem finishes the archive, but doesn't close `fileobj`.
+    """
+    _meta = {
+        'case_insensitive': False,
+        'invalid_path_chars': '\0',
+        'network': False,
+        'read_only': False,
+        'thread_safe': True,
+        'unicode_paths': True,
+        'virtual': True,
+    }
+
+    def __init__(self, fileobj, mode='w|gz'):
+        super(TarStreamFS, self).__init__()
+        self._tar = tarfile.open(fileobj=fileobj, mode=mode)
+        self._dirs = {u'/'}
+        self._files = set()
+
+    def __repr__(self):
+        return 'TarStreamFS({!r})'.format(self._tar.fileobj)
+
+    def _tarinfo(self, path, member_type):
+        """
+        Return a TarInfo for the archive member at `path`.
+        """
+        name = relpath(path)
+        if isinstance(name, six.text_type):
+            name = name.encode('utf-8')
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.type = member_type
+        tarinfo.mode = 0o755 if member_type == tarfile.DIRTYPE else 0o644
+        tarinfo.mtime = time.time()
+        return tarinfo
+
+    def _check_parent(self, path):
+        """
+        Raise ResourceNotFound unless the directory holding `path` has been made.
+        """
+        if dirname(path) not in self._dirs:
+            raise errors.ResourceNotFound(path)
+
+    def _add_file(self, path, fileobj, size):
+        """
+        Add the `size` bytes read from `fileobj` to the archive as the file at `path`.
+        """
+        tarinfo = self._tarinfo(path, tarfile.REGTYPE)
+        tarinfo.size = size
+        with self._lock:
+            self._tar.addfile(tarinfo, fileobj)
+            self._files.add(path)
+
+    def getinfo(self, path, namespaces=None):
+        path = self.validatepath(path)
+        with self._lock:
+            if path in self._dirs:
+                is_dir = True
+            elif path in self._files:
+                is_dir = False
+            else:
+                raise errors.ResourceNotFound(path)
+        return Info({'basic': {'name': basename(path), 'is_dir': is_dir}})
+
+    def listdir(self, path):
+        path = self.validatepath(path)
+        with self._lock:
+            if path not in self._dirs:
+                if path in self._files:
+                    raise errors.DirectoryExpected(path)
+                raise errors.ResourceNotFound(path)
+            return [
+                basename(member)
+                for member in self._dirs | self._files
+                if member != u'/' and dirname(member) == path
+            ]
+
+    def makedir(self, path, permissions=None, recreate=False):
+        path = self.validatepath(path)
+        with self._lock:
+            if path in self._dirs:
+                if not recreate:
+                    raise errors.DirectoryExists(path)
+            elif path in self._files:
+                raise errors.DirectoryExists(path)
+            else:
+                self._check_parent(path)
+                self._tar.addfile(self._tarinfo(path, tarfile.DIRTYPE))
+                self._dirs.add(path)
+        return self.opendir(path)
+
+    def openbin(self, path, mode='r', buffering=-1, **options):
+        _mode = Mode(mode)
+        _mode.validate_bin()
+        path = self.validatepath(path)
+        if _mode.reading or _mode.appending:
+            raise errors.ResourceReadOnly(path, msg=u"files in a tar stream can't be read or appended to")
+        with self._lock:
+            if path in self._dirs:
+                raise errors.FileExpected(path)
+            self._check_parent(path)
+        return _TarMemberFile(self, path)
+
+    def setbinfile(self, path, file):  # pylint: disable=redefined-builtin
+        path = self.validatepath(path)
+        try:
+            start = file.tell()
+            file.seek(0, os.SEEK_END)
+            size = file.tell() - start
+            file.seek(start)
+        except (AttributeError, IOError, ValueError):
+            # The size isn't known, so the file is read into memory first.
+            super(TarStreamFS, self).setbinfile(path, file)
+            return
+
+        with self._lock:
+            if path in self._dirs:
+                raise errors.FileExpected(path)
+            self._check_parent(path)
+        self._add_file(path, file, size)
+
+    def remove(self, path):
+        raise errors.ResourceReadOnly(path, msg=u"files can't be removed from a tar stream")
+
+    def removedir(self, path):
+        raise errors.ResourceReadOnly(path, msg=u"directories can't be removed from a tar stream")
+
+    def setinfo(self, path, info):
+        self.getinfo(path)
+
+    def close(self):
+        with self._lock:
+            if not self.isclosed():
+                self._tar.close()
+        super(TarStreamFS, self).close()
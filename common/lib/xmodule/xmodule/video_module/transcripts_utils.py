@@ -2,17 +2,21 @@
 Utility functions for transcripts.
 ++++++++++++++++++++++++++++++++++
 """
-from functools import wraps
-from django.conf import settings
-import os
 import copy
+import hashlib
 import json
-import requests
 import logging
+import os
+from functools import wraps
+from HTMLParser import HTMLParser
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from edx_django_utils import monitoring as monitoring_utils
+from lxml import etree
 from pysrt import SubRipTime, SubRipItem, SubRipFile
 from pysrt.srtexc import Error
-from lxml import etree
-from HTMLParser import HTMLParser
 from six import text_type
 
 from xmodule.exceptions import NotFoundError
@@ -31,6 +35,8 @@ log = logging.getLogger(__name__)
 
 NON_EXISTENT_TRANSCRIPT = 'non_existent_dummy_file_name'
 
+DEFAULT_TRANSCRIPT_CONVERSION_MAX_ENTRY_SIZE = 512 * 1024
+
 
 class TranscriptException(Exception):  # pylint: disable=missing-docstring
     pass
@@ -68,6 +74,60 @@ def exception_decorator(func):
     return wrapper
 
 
+def get_transcript_conversion_cache():
+    """
+    Return the Django cache named in the TRANSCRIPT_CONVERSION_CACHE setting, or None if it's disabled.
+
+    Converted transcripts are keyed by a hash of their source content, so they
+    never go stale; TIMEOUT only bounds how long unused ones are kept.
+    """
+    config = getattr(settings, 'TRANSCRIPT_CONVERSION_CACHE', {})
+    if not config.get('TIMEOUT'):
+        return None
+    return caches[config.get('CACHE_ALIAS', 'default')]
+
+
+def transcript_conversion_cache_key(content, input_format, output_format, speed=1.0):
+    """
+    Return the key of transcript `content` converted from `input_format` to `output_format` at `speed`.
+    """
+    if isinstance(content, text_type):
+        content = content.encode('utf-8')
+    return u'transcript_conversion.{}.{}.{}.{:g}'.format(
+        hashlib.sha1(content).hexdigest(), input_format, output_format, float(speed)
+    )
+
+
+def cache_converted_transcript(cache, key, converted):
+    """
+    Cache the `converted` transcript under `key`, unless it's too large.
+    """
+    config = settings.TRANSCRIPT_CONVERSION_CACHE
+    if len(converted) > config.get('MAX_ENTRY_SIZE', DEFAULT_TRANSCRIPT_CONVERSION_MAX_ENTRY_SIZE):
+        monitoring_utils.increment('transcript_conversion_cache.too_large')
+        return
+    cache.set(key, converted, config['TIMEOUT'])
+
+
+def cache_transcript_formats(content, input_format, speeds=(1.0,)):
+    """
+    Convert transcript `content` into the other formats, and sjson at each of
+    `speeds`, so that requests for them find the conversions already cached.
+
+    Content which can't be converted is logged and skipped.
+    """
+    if get_transcript_conversion_cache() is None:
+        return
+    conversions = [(output_format, 1.0) for output_format in (Transcript.SRT, Transcript.TXT)]
+    conversions += [(Transcript.SJSON, speed) for speed in speeds]
+    for output_format, speed in conversions:
+        try:
+            Transcript.convert(content, input_format, output_format, speed)
+        except (TranscriptsGenerationException, UnicodeDecodeError, ValueError, KeyError) as ex:
+            log.warning(u"Can't convert %s transcript to %s: %s", input_format, output_format, text_type(ex))
+            return
+
+
 def generate_subs(speed, source_speed, source_subs):
     """
     Generate transcripts from one speed to another speed.
@@ -274,6 +334,10 @@ def generate_subs_from_source(speed_subs, subs_type, subs_filedata, item, langua
             language
         )
 
+    # Youtube translations are served scaled to the speed of their video,
+    # from the transcript saved for speed 1.0.
+    cache_transcript_formats(json.dumps(subs, indent=2), Transcript.SJSON, speeds=set(speed_subs))
+
     return subs
 
 
@@ -434,16 +498,15 @@ def manage_video_subtitles_save(item, user, old_metadata=None, generate_translat
                     remove_subs_from_store(video_id, item, lang)
 
         reraised_message = ''
+        speed_subs = {speed: subs_id for subs_id, speed in youtube_speed_dict(item).iteritems()}
         for lang in new_langs:  # 3b
             try:
-                generate_sjson_for_all_speeds(
-                    item,
-                    item.transcripts[lang],
-                    {speed: subs_id for subs_id, speed in youtube_speed_dict(item).iteritems()},
-                    lang,
-                )
-            except TranscriptException as ex:
-                pass
+                srt_transcripts = generate_sjson_for_all_speeds(item, item.transcripts[lang], speed_subs, lang)
+            except TranscriptException:
+                continue
+            # Convert the uploaded transcript into the other formats now,
+            # rather than on the first request for each of them.
+            cache_transcript_formats(srt_transcripts, Transcript.SRT)
         if reraised_message:
             item.save_with_metadata(user)
             raise TranscriptException(reraised_message)
@@ -474,6 +537,8 @@ def generate_sjson_for_all_speeds(item, user_filename, result_subs_dict, lang):
     Generates sjson from srt for given lang.
 
     `item` is module object.
+
+    Returns the content of the srt transcript.
     """
     _ = item.runtime.service(item, "i18n").ugettext
 
@@ -496,6 +561,7 @@ def generate_sjson_for_all_speeds(item, user_filename, result_subs_dict, lang):
         item,
         lang
     )
+    return srt_transcripts.data
 
 
 def get_or_create_sjson(item, transcripts):
@@ -629,19 +695,48 @@ class Transcript(object):
     }
 
     @staticmethod
-    def convert(content, input_format, output_format):
+    def convert(content, input_format, output_format, speed=1.0):
         """
         Convert transcript `content` from `input_format` to `output_format`.
 
         Accepted input formats: sjson, srt.
         Accepted output format: srt, txt, sjson.
 
+        The timings of sjson output are scaled from speed 1.0 to `speed`.
+        Conversions are cached by a hash of `content`, see `get_transcript_conversion_cache`.
+
         Raises:
             TranscriptsGenerationException: On parsing the invalid srt content during conversion from srt to sjson.
         """
         assert input_format in ('srt', 'sjson')
         assert output_format in ('txt', 'srt', 'sjson')
 
+        scaled = output_format == 'sjson' and speed != 1
+        if input_format == output_format and not scaled:
+            return content
+
+        cache = get_transcript_conversion_cache()
+        if cache is not None:
+            key = transcript_conversion_cache_key(content, input_format, output_format, speed)
+            converted = cache.get(key)
+            if converted is not None:
+                monitoring_utils.increment('transcript_conversion_cache.hits')
+                return converted
+            monitoring_utils.increment('transcript_conversion_cache.misses')
+
+        converted = Transcript.convert_format(content, input_format, output_format)
+        if scaled:
+            converted = json.dumps(generate_subs(speed, 1, json.loads(converted)))
+
+        if cache is not None:
+            cache_converted_transcript(cache, key, converted)
+        return converted
+
+    @staticmethod
+    def convert_format(content, input_format, output_format):
+        """
+        Convert transcript `content` from `input_format` to `output_format`, without caching it.
+        """
         if input_format == output_format:
             return content
 
@@ -975,16 +1070,13 @@ def get_transcript_from_contentstore(video, language, output_format, transcripts
     # add language prefix to transcript file only if language is not None
     language_prefix = '{}_'.format(language) if language else ''
     transcript_name = u'{}{}.{}'.format(language_prefix, base_name, output_format)
-    transcript_content = Transcript.convert(transcript_content, input_format=input_format, output_format=output_format)
+    speed = youtube_speed_dict(video).get(youtube_id, 1) if youtube_id else 1
+    transcript_content = Transcript.convert(
+        transcript_content, input_format=input_format, output_format=output_format, speed=speed
+    )
     if not transcript_content.strip():
         raise NotFoundError('No transcript content')
 
-    if youtube_id:
-        youtube_ids = youtube_speed_dict(video)
-        transcript_content = json.dumps(
-            generate_subs(youtube_ids.get(youtube_id, 1), 1, json.loads(transcript_content))
-        )
-
     return transcript_content, transcript_name, Transcript.mime_types[output_format]
 
 
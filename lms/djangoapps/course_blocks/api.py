@@ -2,12 +2,19 @@
 API entry point to the course_blocks app with top-level
 get_course_blocks function.
 """
+from collections import defaultdict
+
 from django.conf import settings
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
 
 from edx_when import field_data
+from edx_when.models import ContentDate, UserDate
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from openedx.core.djangoapps.user_api.course_tag.api import BulkCourseTags
 from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
+from student.models import CourseEnrollment
+from student.roles import BulkRoleCache
 
 from .transformers import library_content, load_override_data, start_date, user_partitions, visibility
 from .usage_info import CourseUsageInfo
@@ -16,6 +23,19 @@ INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER = (
     'lms.djangoapps.courseware.student_field_overrides.IndividualStudentOverrideProvider'
 )
 
+# Request cache namespace of the users whose course blocks data is to be
+# prefetched once the course blocks of any of them are transformed.
+DEFERRED_PREFETCH_CACHE_NAMESPACE = u'course_blocks.api.deferred_prefetch'
+
+# Request cache namespace of the keys under which the course dates of the
+# last batch of users were cached.
+COURSE_DATES_CACHE_NAMESPACE = u'course_blocks.api.course_dates'
+
+# Format of the request cache keys under which edx_when.api.get_dates_for_course
+# caches the dates of a user in a course, as of edx-when 0.1.2.  It has no API
+# to cache the dates of several users at once.
+EDX_WHEN_COURSE_DATES_CACHE_KEY = u'course_dates.{course_key}.{user_id}'
+
 
 def has_individual_student_override_provider():
     """
@@ -86,6 +106,7 @@ def get_course_blocks(
             exactly equivalent to the blocks that the given user has
             access.
     """
+    _run_deferred_prefetch(starting_block_usage_key.course_key, user)
     if not transformers:
         transformers = BlockStructureTransformers(get_course_block_access_transformers(user))
     transformers.usage_info = CourseUsageInfo(starting_block_usage_key.course_key, user)
@@ -95,3 +116,106 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def prefetch_course_blocks_data(course_key, users):
+    """
+    Pre-fetches and caches, for the duration of the request, the
+    per-user data that the default course block transformers look up
+    for the given users in the given course: enrollment tracks, cohort
+    and other partition group assignments, course staff roles and date
+    overrides.
+
+    Arguments:
+        course_key (CourseKey) - The course whose blocks are to be
+            transformed.
+
+        users (list(django.contrib.auth.models.User)) - User objects
+            for which the course blocks are to be transformed.
+    """
+    # Import here to avoid pulling in courseware, through cohorts,
+    # wherever this module is imported.
+    from openedx.core.djangoapps.course_groups.cohorts import bulk_cache_cohorts
+
+    CourseEnrollment.bulk_fetch_enrollment_states(users, course_key)
+    bulk_cache_cohorts(course_key, users)
+    BulkCourseTags.prefetch(course_key, users)
+    BulkRoleCache.prefetch(users)
+    _bulk_cache_course_dates(course_key, users)
+    if has_individual_student_override_provider():
+        load_override_data.bulk_cache_overrides(course_key, users)
+
+
+def defer_prefetch_course_blocks_data(course_key, users):
+    """
+    Arranges for prefetch_course_blocks_data to be called for the given
+    users the first time that get_course_blocks transforms the course
+    blocks of any of them, so that nothing is fetched if it never does.
+    Replaces the users of any previous call.
+
+    Arguments:
+        course_key (CourseKey) - The course whose blocks may be
+            transformed.
+
+        users (list(django.contrib.auth.models.User)) - User objects
+            for which the course blocks may be transformed.
+    """
+    cache = RequestCache(DEFERRED_PREFETCH_CACHE_NAMESPACE)
+    cache.clear()
+    users = list(users)
+    for user in users:
+        cache.data[(course_key, user.id)] = users
+
+
+def _run_deferred_prefetch(course_key, user):
+    """
+    Calls prefetch_course_blocks_data for the users deferred along with
+    the given user, if any.
+    """
+    cache = RequestCache(DEFERRED_PREFETCH_CACHE_NAMESPACE)
+    users = cache.data.get((course_key, user.id))
+    if users is not None:
+        cache.clear()
+        prefetch_course_blocks_data(course_key, users)
+
+
+def _bulk_cache_course_dates(course_key, users):
+    """
+    Pre-fetches the dates of the given users in the given course and
+    stores them in the request cache under the keys read by
+    edx_when.api.get_dates_for_course, which the DateOverrideTransformer
+    calls for each user.  The dates cached by the previous call are
+    removed, and users without date overrides share the same dict of the
+    course's dates, to keep memory usage low.
+    """
+    dates_cache = RequestCache(COURSE_DATES_CACHE_NAMESPACE)
+    for cache_key in dates_cache.data.get('cache_keys', ()):
+        DEFAULT_REQUEST_CACHE.data.pop(cache_key, None)
+    dates_cache.clear()
+
+    course_dates = {}
+    date_keys_by_id = {}
+    for content_date in ContentDate.objects.filter(course_id=course_key, active=True).select_related('policy'):
+        date_key = (content_date.location, content_date.field)
+        course_dates[date_key] = content_date.policy.abs_date
+        date_keys_by_id[content_date.id] = date_key
+
+    user_dates = defaultdict(list)
+    for user_date in UserDate.objects.filter(
+            user__in=users,
+            content_date__course_id=course_key,
+            content_date__active=True,
+    ).select_related('content_date__policy').order_by('modified'):
+        user_dates[user_date.user_id].append(user_date)
+
+    cache_keys = []
+    for user in users:
+        dates = course_dates
+        if user_dates[user.id]:
+            dates = dict(course_dates)
+            for user_date in user_dates[user.id]:
+                dates[date_keys_by_id[user_date.content_date_id]] = user_date.actual_date
+        cache_key = EDX_WHEN_COURSE_DATES_CACHE_KEY.format(course_key=course_key, user_id=user.id)
+        DEFAULT_REQUEST_CACHE.data[cache_key] = dates
+        cache_keys.append(cache_key)
+    dates_cache.data['cache_keys'] = cache_keys
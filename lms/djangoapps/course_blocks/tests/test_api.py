@@ -0,0 +1,77 @@
+"""
+Tests for course_blocks/api.py
+"""
+from datetime import datetime, timedelta
+
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from edx_when import api as when_api
+from mock import patch
+from pytz import UTC
+
+from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import (
+    EDX_WHEN_COURSE_DATES_CACHE_KEY,
+    _bulk_cache_course_dates,
+    defer_prefetch_course_blocks_data,
+    get_course_blocks
+)
+
+
+class TestPrefetchCourseBlocksData(SharedModuleStoreTestCase):
+    """
+    Tests for prefetching the course blocks data of several users.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestPrefetchCourseBlocksData, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category='chapter')
+        cls.sequential = ItemFactory.create(parent=chapter, category='sequential')
+
+    def setUp(self):
+        super(TestPrefetchCourseBlocksData, self).setUp()
+        self.users = [UserFactory.create(), UserFactory.create(), AdminFactory.create()]
+        for user in self.users:
+            CourseEnrollmentFactory.create(user=user, course_id=self.course.id)
+
+    def _cache_key(self, user):
+        return EDX_WHEN_COURSE_DATES_CACHE_KEY.format(course_key=self.course.id, user_id=user.id)
+
+    def test_deferred_prefetch(self):
+        with patch('lms.djangoapps.course_blocks.api.prefetch_course_blocks_data') as mock_prefetch:
+            defer_prefetch_course_blocks_data(self.course.id, self.users[:2])
+            get_course_blocks(self.users[2], self.course.location)
+            self.assertFalse(mock_prefetch.called)
+
+            get_course_blocks(self.users[1], self.course.location)
+            get_course_blocks(self.users[0], self.course.location)
+        mock_prefetch.assert_called_once_with(self.course.id, self.users[:2])
+
+    def test_course_dates_of_previous_batch_removed(self):
+        _bulk_cache_course_dates(self.course.id, self.users[:2])
+        _bulk_cache_course_dates(self.course.id, self.users[2:])
+        self.assertEqual(
+            [self._cache_key(user) in DEFAULT_REQUEST_CACHE.data for user in self.users],
+            [False, False, True],
+        )
+
+    def test_course_dates_read_by_edx_when(self):
+        due = datetime(2019, 1, 1, tzinfo=UTC)
+        when_api.set_date_for_block(self.course.id, self.sequential.location, 'due', due)
+        when_api.set_date_for_block(
+            self.course.id, self.sequential.location, 'due', None, rel_date=2, user=self.users[0],
+        )
+
+        # One query for the course dates, and one for the users' dates along
+        # with the course dates that relative ones are based on.
+        with self.assertNumQueries(2):
+            _bulk_cache_course_dates(self.course.id, self.users)
+
+        for user, user_due in zip(self.users, [due + timedelta(days=2), due, due]):
+            expected_dates = {(self.sequential.location, 'due'): user_due}
+            with self.assertNumQueries(0):
+                self.assertEqual(when_api.get_dates_for_course(self.course.id, user), expected_dates)
+            self.assertEqual(when_api.get_dates_for_course(self.course.id, user, use_cached=False), expected_dates)
@@ -3,6 +3,8 @@ Load Override Data Transformer
 """
 import json
 
+from edx_django_utils.cache import RequestCache
+
 from courseware.models import StudentFieldOverride
 from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
 
@@ -13,6 +15,8 @@ REQUESTED_FIELDS = [
     'due'
 ]
 
+OVERRIDE_CACHE_NAMESPACE = u'course_blocks.load_override_data'
+
 
 def _get_override_query(course_key, location_list, user_id):
     """
@@ -31,6 +35,40 @@ def _get_override_query(course_key, location_list, user_id):
     )
 
 
+def _override_cache_key(user_id, course_key):
+    """
+    Returns the cache key for the given user_id and course_key.
+    """
+    return u"{}.{}".format(user_id, course_key)
+
+
+def bulk_cache_overrides(course_key, users):
+    """
+    Pre-fetches and caches the override data of the given users in the
+    given course, for later fast retrieval by override_xblock_fields.
+
+    Args:
+        course_key (CourseLocator): Course locator object
+        users (List<User>): List of users
+    """
+    # before populating the cache with another bulk set of data,
+    # remove previously cached entries to keep memory usage low.
+    RequestCache(OVERRIDE_CACHE_NAMESPACE).clear()
+    cache = RequestCache(OVERRIDE_CACHE_NAMESPACE).data
+
+    overrides_by_user = {user.id: [] for user in users}
+    query = StudentFieldOverride.objects.filter(
+        course_id=course_key,
+        field__in=REQUESTED_FIELDS,
+        student__in=users,
+    )
+    for student_field_override in query:
+        overrides_by_user[student_field_override.student_id].append(student_field_override)
+
+    for user_id, overrides in overrides_by_user.iteritems():
+        cache[_override_cache_key(user_id, course_key)] = overrides
+
+
 def override_xblock_fields(course_key, location_list, block_structure, user_id):
     """
     loads override data of block
@@ -41,7 +79,12 @@ def override_xblock_fields(course_key, location_list, block_structure, user_id):
         block_structure (BlockStructure): block structure class
         user_id (int): User id
     """
-    query = _get_override_query(course_key, location_list, user_id)
+    cached_overrides = RequestCache(OVERRIDE_CACHE_NAMESPACE).data.get(_override_cache_key(user_id, course_key))
+    if cached_overrides is not None:
+        locations = set(location_list)
+        query = [override for override in cached_overrides if override.location in locations]
+    else:
+        query = _get_override_query(course_key, location_list, user_id)
     for student_field_override in query:
         value = json.loads(student_field_override.value)
         field = student_field_override.field
@@ -58,6 +101,7 @@ class OverrideDataTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     def __init__(self, user):
         self.user = user
@@ -11,7 +11,11 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import ToyCourseFactory
 
-from lms.djangoapps.course_blocks.transformers.load_override_data import REQUESTED_FIELDS, OverrideDataTransformer
+from lms.djangoapps.course_blocks.transformers.load_override_data import (
+    REQUESTED_FIELDS,
+    OverrideDataTransformer,
+    bulk_cache_overrides
+)
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 
 expected_overrides = {
@@ -152,3 +156,39 @@ class TestOverrideDataTransformer(ModuleStoreTestCase):
             assert get_override_for_user(self.learner, self.block, field) == expected_overrides.get(field)
             # other learner2 dont have overridden data
             assert get_override_for_user(self.learner2, self.block, field) is None
+
+    def test_transform_with_bulk_cached_overrides(self):
+        """Test overriding of fields from overrides cached in bulk"""
+        section = self.course.get_children()[0]
+        for field in REQUESTED_FIELDS:
+            override_field_for_user(
+                self.learner,
+                section,
+                field,
+                expected_overrides.get(field)
+            )
+        bulk_cache_overrides(self.course_key, [self.learner, self.learner2])
+
+        # collect phase
+        OverrideDataTransformer.collect(self.block_structure)
+        self.block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        original_values = {
+            field: self.block_structure.get_xblock_field(section.location, field) for field in REQUESTED_FIELDS
+        }
+
+        # transform phase, using the cached overrides
+        with self.assertNumQueries(0):
+            learner2_block_structure = self.block_structure.copy()
+            OverrideDataTransformer(self.learner2).transform(
+                usage_info=self.course_usage_key,
+                block_structure=learner2_block_structure,
+            )
+            OverrideDataTransformer(self.learner).transform(
+                usage_info=self.course_usage_key,
+                block_structure=self.block_structure,
+            )
+
+        # verify overridden data
+        for field in REQUESTED_FIELDS:
+            assert self.block_structure.get_xblock_field(section.location, field) == expected_overrides.get(field)
+            assert learner2_block_structure.get_xblock_field(section.location, field) == original_values[field]
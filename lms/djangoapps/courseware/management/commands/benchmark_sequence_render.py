@@ -0,0 +1,98 @@
+"""
+Benchmark rendering the student view of a sequence.
+
+Binds the sequence to a user and renders it as the courseware page does,
+several times over.  For each run, prints the number of database queries made
+and the wall time taken, both to load the sequence's user state and to render
+it, so that the cost of each unit in a sequence can be seen on real courses.
+"""
+from __future__ import absolute_import, division, print_function
+
+from textwrap import dedent
+from timeit import default_timer
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import UsageKey
+
+from courseware.model_data import FieldDataCache
+from courseware.module_render import get_module_for_descriptor
+from xmodule.modulestore.django import modulestore
+from xmodule.x_module import STUDENT_VIEW
+
+
+class Command(BaseCommand):
+    """Benchmark rendering a sequence"""
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('usage_id', help='the sequence to render')
+        parser.add_argument('username', help='the user the sequence is rendered for')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='the number of times to render the sequence',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            usage_key = UsageKey.from_string(options['usage_id'])
+        except InvalidKeyError:
+            raise CommandError(u'Invalid usage_id: {}'.format(options['usage_id']))
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(u'No user named {}'.format(options['username']))
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        store = modulestore()
+        course = store.get_course(usage_key.course_key)
+        if course is None:
+            raise CommandError(u'Course not found: {}'.format(usage_key.course_key))
+
+        print(u'{:>4} {:>6} {:>16} {:>16} {:>16} {:>16}'.format(
+            'run', 'units', 'load queries', 'load (ms)', 'render queries', 'render (ms)'
+        ))
+        for run in range(options['repeat']):
+            units, (load_queries, load_time), (render_queries, render_time) = self._render(
+                store, course, usage_key, user
+            )
+            print(u'{:>4} {:>6} {:>16} {:>16.1f} {:>16} {:>16.1f}'.format(
+                run + 1, units, load_queries, load_time * 1000, render_queries, render_time * 1000
+            ))
+
+    def _render(self, store, course, usage_key, user):
+        """
+        Render the student view of the sequence at `usage_key` for `user`.
+
+        Returns the number of units in the sequence, and the (number of queries, seconds)
+        taken to load the sequence's user state and to render it.
+        """
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = {}
+
+        with CaptureQueriesContext(connection) as queries:
+            start = default_timer()
+            sequence = store.get_item(usage_key, depth=None, lazy=False)
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course.id, user, sequence, depth=None)
+            sequence = get_module_for_descriptor(
+                user, request, sequence, field_data_cache, course.id, course=course
+            )
+            load = (len(queries), default_timer() - start)
+
+        if sequence is None:
+            raise CommandError(u'{} can not access {}'.format(user.username, usage_key))
+
+        with CaptureQueriesContext(connection) as queries:
+            start = default_timer()
+            sequence.render(STUDENT_VIEW, {'user_authenticated': True})
+            render = (len(queries), default_timer() - start)
+
+        return len(sequence.get_display_items()), load, render
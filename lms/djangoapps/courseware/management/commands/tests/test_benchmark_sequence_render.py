@@ -0,0 +1,45 @@
+"""
+Tests for the benchmark_sequence_render management command
+"""
+import mock
+from django.core.management import CommandError, call_command
+
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestBenchmarkSequenceRender(SharedModuleStoreTestCase):
+    """
+    Tests for the benchmark_sequence_render management command
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestBenchmarkSequenceRender, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category='chapter')
+        cls.sequence = ItemFactory.create(parent=chapter, category='sequential')
+        for __ in range(3):
+            vertical = ItemFactory.create(parent=cls.sequence, category='vertical')
+            ItemFactory.create(parent=vertical, category='html')
+
+    def setUp(self):
+        super(TestBenchmarkSequenceRender, self).setUp()
+        self.user = UserFactory.create()
+
+    @mock.patch('courseware.management.commands.benchmark_sequence_render.print', create=True)
+    def test_benchmark(self, mock_print):
+        call_command('benchmark_sequence_render', unicode(self.sequence.location), self.user.username, '--repeat', '2')
+
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual(len(printed), 3)
+        for run, line in enumerate(printed[1:], 1):
+            self.assertEqual(line.split()[:2], [str(run), '3'])
+
+    def test_invalid_usage_key(self):
+        with self.assertRaisesRegexp(CommandError, 'Invalid usage_id'):
+            call_command('benchmark_sequence_render', 'not a usage key', self.user.username)
+
+    def test_unknown_user(self):
+        with self.assertRaisesRegexp(CommandError, 'No user named'):
+            call_command('benchmark_sequence_render', unicode(self.sequence.location), 'no-such-user')
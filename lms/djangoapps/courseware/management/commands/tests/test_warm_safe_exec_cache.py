@@ -0,0 +1,103 @@
+"""
+Tests for the warm_safe_exec_cache management command.
+"""
+from __future__ import absolute_import
+
+from django.core.management import CommandError, call_command
+from mock import patch
+
+from capa.safe_exec import SafeExecCache
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+SCRIPT_PROBLEM = """
+<problem>
+<script type="loncapa/python" uses_anonymous_student_id="{uses_anonymous_student_id}">
+# {randomization}
+x = random.randint(0, 1000)
+</script>
+<p>Enter $x</p>
+<numericalresponse answer="$x"><formulaequationinput/></numericalresponse>
+</problem>
+"""
+
+PLAIN_PROBLEM = """
+<problem>
+<p>Enter 5</p>
+<numericalresponse answer="5"><formulaequationinput/></numericalresponse>
+</problem>
+"""
+
+
+class WarmSafeExecCacheTest(SharedModuleStoreTestCase):
+    """
+    Test pre-warming the safe_exec cache of a course.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(WarmSafeExecCacheTest, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.per_student = ItemFactory.create(
+            parent=cls.course,
+            category='problem',
+            data=SCRIPT_PROBLEM.format(randomization='per_student', uses_anonymous_student_id='false'),
+            metadata={'rerandomize': 'per_student'},
+        )
+        cls.never = ItemFactory.create(
+            parent=cls.course,
+            category='problem',
+            data=SCRIPT_PROBLEM.format(randomization='never', uses_anonymous_student_id='false'),
+            metadata={'rerandomize': 'never'},
+        )
+        cls.always = ItemFactory.create(
+            parent=cls.course,
+            category='problem',
+            data=SCRIPT_PROBLEM.format(randomization='always', uses_anonymous_student_id='false'),
+            metadata={'rerandomize': 'always'},
+        )
+        cls.per_student_id = ItemFactory.create(
+            parent=cls.course,
+            category='problem',
+            data=SCRIPT_PROBLEM.format(randomization='always', uses_anonymous_student_id='true'),
+            metadata={'rerandomize': 'always'},
+        )
+        ItemFactory.create(parent=cls.course, category='problem', data=PLAIN_PROBLEM)
+
+    def setUp(self):
+        super(WarmSafeExecCacheTest, self).setUp()
+        self.cache = SafeExecCache()
+        patcher = patch(
+            'lms.djangoapps.courseware.management.commands.warm_safe_exec_cache.get_safe_exec_cache',
+            self.cache.for_course,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_warm(self):
+        output = call_command('warm_safe_exec_cache', unicode(self.course.id), max_seeds=50)
+        # 20 per-student variants, 1 variant when never randomized, and 50 when always randomized.
+        # The problem whose code may read anonymous_student_id is skipped.
+        self.assertEqual(
+            output,
+            'Built 71 problem variants, 0 of them were already cached.\n'
+            'Skipped 1 problems whose code may read anonymous_student_id.\n'
+        )
+
+        output = call_command('warm_safe_exec_cache', unicode(self.course.id), max_seeds=50)
+        self.assertEqual(
+            output,
+            'Built 71 problem variants, 71 of them were already cached.\n'
+            'Skipped 1 problems whose code may read anonymous_student_id.\n'
+        )
+
+        counts = self.cache.lookup_counts()
+        self.assertEqual(counts[(self.course.id, self.per_student.location.html_id())], (20, 20))
+        self.assertEqual(counts[(self.course.id, self.never.location.html_id())], (1, 1))
+        self.assertEqual(counts[(self.course.id, self.always.location.html_id())], (50, 50))
+        self.assertNotIn((self.course.id, self.per_student_id.location.html_id()), counts)
+
+    def test_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_safe_exec_cache', 'not a course')
+        with self.assertRaises(CommandError):
+            call_command('warm_safe_exec_cache', 'course-v1:edX+None+None')
@@ -0,0 +1,142 @@
+"""
+Pre-warm the cache of sandboxed code results for a course.
+
+Builds every seeded variant of each of the course's problems that run Python
+code, so that the results of that code are in the shared cache before students
+open the problems.  Only problems whose scripts opt out of the
+anonymous_student_id global, with uses_anonymous_student_id="false", are built,
+since the results of the others are cached separately for each student.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from lxml import etree
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from capa.capa_problem import LoncapaProblem, LoncapaSystem, reads_anonymous_student_id
+from xmodule.capa_base import MAX_RANDOMIZATION_BINS, NUM_RANDOMIZATION_BINS, RANDOMIZATION
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.django import modulestore
+from xmodule.util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, get_safe_exec_cache
+
+log = logging.getLogger(__name__)
+
+
+def problem_seeds(problem, max_seeds):
+    """
+    Return the seeds that students can get for `problem`, at most `max_seeds` of them.
+    """
+    if problem.rerandomize == RANDOMIZATION.NEVER:
+        return [1]
+    elif problem.rerandomize == RANDOMIZATION.PER_STUDENT:
+        return range(min(NUM_RANDOMIZATION_BINS, max_seeds))
+    return range(min(MAX_RANDOMIZATION_BINS, max_seeds))
+
+
+class Command(BaseCommand):
+    """Pre-warm the cache of sandboxed code results for a course"""
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', help='the course to pre-warm')
+        parser.add_argument(
+            '--max-seeds',
+            type=int,
+            default=MAX_RANDOMIZATION_BINS,
+            help='the largest number of seeded variants to build for each problem',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            raise CommandError('Invalid course_id: {}'.format(options['course_id']))
+
+        store = modulestore()
+        if not store.has_course(course_key):
+            raise CommandError('Course not found: {}'.format(course_key))
+
+        cache = get_safe_exec_cache(course_key)
+        hits_before, misses_before = self._count_lookups(cache, course_key)
+        skipped = 0
+        for problem in store.get_items(course_key, qualifiers={'category': 'problem'}):
+            if '<script' not in problem.data:
+                continue
+            if self._reads_anonymous_student_id(problem):
+                log.info('Skipping %s, its code may read anonymous_student_id', problem.location)
+                skipped += 1
+                continue
+
+            seeds = problem_seeds(problem, options['max_seeds'])
+            log.info('Building %d variants of %s', len(seeds), problem.location)
+            for seed in seeds:
+                try:
+                    self._build_problem(problem, seed, cache)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception('Could not build %s with seed %d, skipping it', problem.location, seed)
+                    break
+
+        hits, misses = self._count_lookups(cache, course_key)
+        hits -= hits_before
+        misses -= misses_before
+        return (
+            'Built {} problem variants, {} of them were already cached.\n'
+            'Skipped {} problems whose code may read anonymous_student_id.\n'
+        ).format(hits + misses, hits, skipped)
+
+    def _reads_anonymous_student_id(self, problem):
+        """
+        Return whether the code of `problem` may read anonymous_student_id, in which case
+        its results are cached per student and there's no point building it.
+        """
+        try:
+            return reads_anonymous_student_id(etree.XML(problem.data))
+        except etree.XMLSyntaxError:
+            return True
+
+    def _count_lookups(self, cache, course_key):
+        """
+        Return the numbers of hits and misses counted by `cache` for the problems of `course_key`.
+        """
+        hits = misses = 0
+        for (course_id, _slug), (problem_hits, problem_misses) in cache.lookup_counts().items():
+            if course_id == course_key:
+                hits += problem_hits
+                misses += problem_misses
+        return hits, misses
+
+    def _build_problem(self, problem, seed, cache):
+        """
+        Build `problem` with `seed` as the LMS would, which runs its code through `cache`.
+        """
+        course_key = problem.location.course_key
+        capa_system = LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_key)),
+            get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_key)),
+            DEBUG=False,
+            filestore=problem.runtime.resources_fs,
+            i18n=problem.runtime.service(problem, 'i18n'),
+            node_path=settings.NODE_PATH,
+            render_template=None,
+            seed=seed,
+            STATIC_URL=None,
+            xqueue=None,
+            matlab_api_key=None,
+        )
+        LoncapaProblem(
+            problem_text=problem.data,
+            id=problem.location.html_id(),
+            capa_system=capa_system,
+            capa_module=problem,
+            state={},
+            seed=seed,
+            extract_tree=False,
+        )
@@ -2,7 +2,7 @@
 Defines an endpoint for gradebook data related to a course.
 """
 import logging
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
 from functools import wraps
 
@@ -23,10 +23,12 @@ from lms.djangoapps.grades.api.v1.utils import (
     get_course_key,
     verify_course_exists
 )
-from lms.djangoapps.grades.config.waffle import WRITABLE_GRADEBOOK, waffle_flags
+from lms.djangoapps.grades.bulk_course_grade import BulkCourseGrades
+from lms.djangoapps.grades.config.waffle import GRADEBOOK_PERSISTED_GRADES_ONLY, WRITABLE_GRADEBOOK, waffle_flags
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.context import graded_subsections_for_course
 from lms.djangoapps.grades.course_data import CourseData
+from lms.djangoapps.grades.course_grade import PersistedCourseGrade, ZeroCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
 from lms.djangoapps.grades.events import SUBSECTION_GRADE_CALCULATED, subsection_grade_calculated
 from lms.djangoapps.grades.models import (
@@ -457,6 +459,56 @@ class GradebookView(GradeViewMixin, PaginatedAPIView):
             })
         return breakdown
 
+    def _grade_absent_course_grades(self, course, course_structure, user_grades):
+        """
+        Returns the given list of (user, course_grade) pairs, where the ZeroCourseGrade of
+        each user without a stored course grade is replaced by a grade computed from their
+        stored subsection grades.  Those users are graded together, with a single query,
+        against the whole course structure.  If some graded blocks are not visible to every
+        learner, each user is graded against their own course blocks instead, together
+        with the users who see the same blocks.
+
+        Args:
+            course: A Course Descriptor object.
+            course_structure: The collected block structure of the course.
+            user_grades: A list of (User, CourseGrade) pairs, as read with persisted_only.
+        """
+        absent_grades = [
+            (user, course_grade) for user, course_grade in user_grades
+            if isinstance(course_grade, ZeroCourseGrade)
+        ]
+        if not absent_grades:
+            return user_grades
+
+        if BulkCourseGrades.is_course_wide(course_structure):
+            absent_grades_by_structure = [(course_structure, absent_grades)]
+        else:
+            absent_grades_by_structure = self._group_by_course_blocks(absent_grades)
+
+        computed_grades = {}
+        for structure, grades in absent_grades_by_structure:
+            bulk_grades = BulkCourseGrades.read([user for user, _ in grades], course, structure)
+            for index, (user, course_grade) in enumerate(grades):
+                computed_grades[user.id] = PersistedCourseGrade(
+                    user,
+                    course_grade.course_data,
+                    percent=float(bulk_grades.percents[index]),
+                    letter_grade=bulk_grades.letter_grades[index],
+                    passed=bool(bulk_grades.passed[index]),
+                )
+        return [(user, computed_grades.get(user.id, course_grade)) for user, course_grade in user_grades]
+
+    def _group_by_course_blocks(self, user_grades):
+        """
+        Returns a list of (block structure, user_grades) pairs, grouping the given list of
+        (user, course_grade) pairs by the course blocks that each user sees.
+        """
+        user_grades_by_blocks = OrderedDict()
+        for user, course_grade in user_grades:
+            structure = course_grade.course_data.structure
+            user_grades_by_blocks.setdefault(frozenset(structure), (structure, []))[1].append((user, course_grade))
+        return user_grades_by_blocks.values()
+
     def _gradebook_entry(self, user, course, graded_subsections, course_grade):
         """
         Returns a dictionary of course- and subsection-level grade data for
@@ -502,9 +554,18 @@ class GradebookView(GradeViewMixin, PaginatedAPIView):
         course_data = CourseData(user=None, course=course)
         graded_subsections = list(graded_subsections_for_course(course_data.collected_structure))
 
+        # In large courses, computing the grades that haven't been stored yet, from each learner's
+        # course blocks and scores, is too slow for a page of learners.  There, absent subsection
+        # grades are zeros, and absent course grades are computed from the stored subsection grades.
+        persisted_only = waffle_flags()[GRADEBOOK_PERSISTED_GRADES_ONLY].is_enabled(course_key)
+
         if request.GET.get('username'):
             with self._get_user_or_raise(request, course_key) as grade_user:
-                course_grade = CourseGradeFactory().read(grade_user, course)
+                course_grade = CourseGradeFactory().read(grade_user, course, persisted_only=persisted_only)
+                if persisted_only:
+                    _, course_grade = self._grade_absent_course_grades(
+                        course, course_data.collected_structure, [(grade_user, course_grade)]
+                    )[0]
 
             entry = self._gradebook_entry(grade_user, course, graded_subsections, course_grade)
             serializer = StudentGradebookEntrySerializer(entry)
@@ -528,11 +589,21 @@ class GradebookView(GradeViewMixin, PaginatedAPIView):
             users = self._paginate_users(course_key, filter_kwargs, related_models)
 
             with bulk_gradebook_view_context(course_key, users):
-                for user, course_grade, exc in CourseGradeFactory().iter(
-                    users, course_key=course_key, collected_block_structure=course_data.collected_structure
-                ):
-                    if not exc:
-                        entries.append(self._gradebook_entry(user, course, graded_subsections, course_grade))
+                user_grades = [
+                    (user, course_grade) for user, course_grade, exc in CourseGradeFactory().iter(
+                        users,
+                        course_key=course_key,
+                        collected_block_structure=course_data.collected_structure,
+                        persisted_only=persisted_only,
+                    )
+                    if not exc
+                ]
+                if persisted_only:
+                    user_grades = self._grade_absent_course_grades(
+                        course, course_data.collected_structure, user_grades
+                    )
+                for user, course_grade in user_grades:
+                    entries.append(self._gradebook_entry(user, course, graded_subsections, course_grade))
 
             serializer = StudentGradebookEntrySerializer(entries, many=True)
             return self.get_paginated_response(serializer.data)
@@ -17,13 +17,16 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from six import text_type
 
+from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from course_modes.models import CourseMode
 from lms.djangoapps.courseware.tests.factories import InstructorFactory, StaffFactory
 from lms.djangoapps.grades.api.v1.tests.mixins import GradeViewTestMixin
 from lms.djangoapps.grades.api.v1.views import CourseEnrollmentPagination
-from lms.djangoapps.grades.config.waffle import WRITABLE_GRADEBOOK, waffle_flags
+from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
+from lms.djangoapps.grades.config.waffle import GRADEBOOK_PERSISTED_GRADES_ONLY, WRITABLE_GRADEBOOK, waffle_flags
 from lms.djangoapps.grades.course_data import CourseData
 from lms.djangoapps.grades.course_grade import CourseGrade
+from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
 from lms.djangoapps.grades.models import (
     BlockRecord,
     BlockRecordList,
@@ -37,11 +40,15 @@ from lms.djangoapps.certificates.models import (
 )
 from lms.djangoapps.grades.subsection_grade import ReadSubsectionGrade
 from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from openedx.core.djangoapps.course_groups.views import link_cohort_to_partition_group
 from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.partitions.partitions import Group, UserPartition
 
 
 # pylint: disable=unused-variable
@@ -831,6 +838,123 @@ class GradebookViewTest(GradebookViewTestBase):
                 )
                 self._assert_empty_response(resp)
 
+    @ddt.data(True, False)
+    def test_persisted_grades_only(self, persisted_only):
+        with patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read') as mock_grade:
+            mock_grade.side_effect = [
+                self.mock_course_grade(self.student, passed=True, percent=0.85),
+                self.mock_course_grade(self.other_student, passed=False, percent=0.45),
+            ]
+
+            with override_waffle_flag(self.waffle_flag, active=True):
+                with override_waffle_flag(waffle_flags()[GRADEBOOK_PERSISTED_GRADES_ONLY], active=persisted_only):
+                    self.login_staff()
+                    resp = self.client.get(
+                        self.get_url(course_key=self.course.id)
+                    )
+                    self._assert_data_all_users(resp)
+
+            for call in mock_grade.call_args_list:
+                self.assertEqual(call[1].get('persisted_only', False), persisted_only)
+
+    def test_persisted_grades_only_computes_absent_course_grades(self):
+        # self.student has a stored grade for HW 1, but no stored course grade.
+        homework = self.subsections[self.chapter_1.location][0]
+        PersistentSubsectionGrade.update_or_create_grade(
+            user_id=self.student.id,
+            usage_key=homework.location,
+            course_version=None,
+            subtree_edited_timestamp=None,
+            earned_all=2.0,
+            possible_all=2.0,
+            earned_graded=2.0,
+            possible_graded=2.0,
+            visible_blocks=[BlockRecord(homework.location, 1, 2, True)],
+            first_attempted=datetime(2017, 12, 1, tzinfo=UTC),
+        )
+
+        with persistent_grades_feature_flags(global_flag=True, enabled_for_all_courses=True):
+            with override_waffle_flag(self.waffle_flag, active=True):
+                with override_waffle_flag(waffle_flags()[GRADEBOOK_PERSISTED_GRADES_ONLY], active=True):
+                    self.login_staff()
+                    resp = self.client.get(self.get_url(course_key=self.course.id))
+
+        self.assertEqual(status.HTTP_200_OK, resp.status_code)
+        results = {entry['user_id']: entry for entry in resp.data['results']}
+        # The one homework of the 10 that count is worth 15% / 10, rounded up to 2%.
+        self.assertEqual(results[self.student.id]['percent'], 0.02)
+        self.assertEqual(results[self.other_student.id]['percent'], 0.0)
+        homework_entry = results[self.student.id]['section_breakdown'][0]
+        self.assertEqual(homework_entry['module_id'], text_type(homework.location))
+        self.assertTrue(homework_entry['attempted'])
+        self.assertEqual(homework_entry['score_earned'], 2.0)
+
+    def test_persisted_grades_only_grades_gated_subsections_per_learner(self):
+        # HW 2 is only visible to the cohort linked to the content group, so the
+        # learner outside of it is graded on HW 1 alone, as CourseGradeFactory grades them.
+        content_groups = UserPartition(
+            id=0,
+            name='Content Groups',
+            description='Content Groups',
+            groups=[Group(1, 'Group 1')],
+            scheme_id='cohort',
+        )
+        course = CourseFactory.create(user_partitions=[content_groups])
+        course.set_grading_policy({
+            'GRADER': [{'type': 'Homework', 'min_count': 1, 'drop_count': 0, 'short_label': 'HW', 'weight': 1.0}],
+            'GRADE_CUTOFFS': {'Pass': 0.5},
+        })
+        self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 1',
+            choices=[True, False],
+            choice_names=['choice_0', 'choice_1'],
+        )
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        homeworks = []
+        for group_access in ({}, {content_groups.id: [1]}):
+            homework = ItemFactory.create(
+                parent=chapter,
+                category='sequential',
+                format='Homework',
+                graded=True,
+                group_access=group_access,
+            )
+            ItemFactory.create(parent=homework, category='problem', data=problem_xml)
+            homeworks.append(homework)
+
+        config_course_cohorts(course, is_cohorted=True)
+        cohort = CohortFactory(course_id=course.id)
+        link_cohort_to_partition_group(cohort, content_groups.id, 1)
+        in_group, out_of_group = UserFactory.create_batch(2)
+        for user in (in_group, out_of_group):
+            CourseEnrollmentFactory(course_id=course.id, user=user)
+            PersistentSubsectionGrade.update_or_create_grade(
+                user_id=user.id,
+                usage_key=homeworks[0].location,
+                course_version=None,
+                subtree_edited_timestamp=None,
+                earned_all=1.0,
+                possible_all=1.0,
+                earned_graded=1.0,
+                possible_graded=1.0,
+                visible_blocks=[BlockRecord(homeworks[0].location, 1, 1, True)],
+                first_attempted=datetime(2017, 12, 1, tzinfo=UTC),
+            )
+        add_user_to_cohort(cohort, in_group)
+
+        with persistent_grades_feature_flags(global_flag=True, enabled_for_all_courses=True):
+            with override_waffle_flag(self.waffle_flag, active=True):
+                with override_waffle_flag(waffle_flags()[GRADEBOOK_PERSISTED_GRADES_ONLY], active=True):
+                    self.login_staff()
+                    resp = self.client.get(self.get_url(course_key=course.id))
+
+            self.assertEqual(status.HTTP_200_OK, resp.status_code)
+            percents = {entry['user_id']: entry['percent'] for entry in resp.data['results']}
+            self.assertEqual(percents, {in_group.id: 0.5, out_of_group.id: 1.0})
+            for user in (in_group, out_of_group):
+                self.assertEqual(percents[user.id], CourseGradeFactory().read(user, course).percent)
+
     @ddt.data(None, 2, 3, 10, 60, 80)
     def test_page_size_parameter(self, page_size):
         user_size = 60
@@ -176,8 +176,8 @@ class GradeViewMixin(DeveloperErrorViewMixin):
         enrollments_in_course = use_read_replica_if_available(
             CourseEnrollment.objects.filter(**filter_kwargs)
         )
-        if related_models:
-            enrollments_in_course = enrollments_in_course.select_related(*related_models)
+        # The users of the enrollments are always needed, so they're joined rather than fetched one at a time.
+        enrollments_in_course = enrollments_in_course.select_related('user', *(related_models or []))
 
         paged_enrollments = self.paginate_queryset(enrollments_in_course)
         return [enrollment.user for enrollment in paged_enrollments]
@@ -0,0 +1,229 @@
+"""
+Course grades of a batch of users, computed together.
+
+CourseGrade grades one user at a time, with a Python object for every one of
+their subsection grades.  BulkCourseGrades instead loads the persisted
+subsection grades of a batch of users into (users x subsections) arrays, and
+applies the course's grader to all of the users at once.
+
+Its results are identical to CourseGrade's as long as every user sees the
+graded blocks of the given course structure (see is_course_wide), and every
+attempted subsection has a persisted grade, so that a missing grade is a zero,
+as with ZeroSubsectionGrade.  To that end, percents are summed in the same order as the
+grader sums them, so that they come out exactly equal, not just close.
+"""
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy
+from pytz import UTC
+
+from lms.djangoapps.course_blocks.transformers.start_date import StartDateTransformer
+from lms.djangoapps.course_blocks.transformers.user_partitions import UserPartitionTransformer
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
+
+from .course_data import CourseData
+from .course_grade import CourseGradeBase
+from .models import PersistentSubsectionGrade
+from .subsection_grade import ZeroSubsectionGrade
+
+
+class BulkCourseGrades(object):
+    """
+    The course grades of a list of users, computed from arrays of their
+    graded subsections' earned and possible scores.
+
+    Arrays are indexed by user in the order of `users`, then by subsection
+    in the order of `subsections`, or by assignment type in the order of
+    the course grader's subgraders:
+
+        subsection_percents: the percent_graded of each subsection grade.
+        grade_breakdown: the weighted percent of each assignment type, as in
+            the grade_breakdown of CourseGrade.grader_result.
+        percents, passed: the percent and passed of each course grade.
+
+    letter_grades is a list of the letter grade (or None) of each user.
+    """
+    def __init__(self, users, course, subsections, earned, possible):
+        self.users = users
+        self.subsections = subsections
+        course = CourseGradeBase._prep_course_for_grading(course)  # pylint: disable=protected-access
+
+        self.subsection_percents = self._compute_subsection_percents(earned, possible)
+        self.grade_breakdown = numpy.zeros((len(users), len(course.grader.subgraders)))
+        total_percents = numpy.zeros(len(users))
+        for index, (subgrader, _, weight) in enumerate(course.grader.subgraders):
+            columns = [
+                column for column, subsection in enumerate(subsections)
+                if getattr(subsection, 'format', '') == subgrader.type
+            ]
+            self.grade_breakdown[:, index] = self._compute_assignment_percents(
+                subgrader, self.subsection_percents[:, columns], possible[:, columns] > 0,
+            ) * weight
+            total_percents = total_percents + self.grade_breakdown[:, index]
+
+        self.percents = self._compute_percents(total_percents)
+        self.letter_grades = self._compute_letter_grades(course.grade_cutoffs, self.percents)
+        self.passed = self._compute_passed(course.grade_cutoffs, self.percents)
+
+    @classmethod
+    def read(cls, users, course, course_structure):
+        """
+        Returns the BulkCourseGrades of the given users, from their persisted
+        grades for the graded subsections in `course_structure`.
+        """
+        subsections = list(cls._graded_subsections(course_structure))
+        course_data = CourseData(None, course=course, structure=course_structure)
+
+        # Subsections without a persisted grade are zeros, out of the points
+        # possible in the course structure.
+        earned = numpy.zeros((len(users), len(subsections)))
+        possible = numpy.tile(
+            [ZeroSubsectionGrade(subsection, course_data).graded_total.possible for subsection in subsections],
+            (len(users), 1),
+        )
+
+        rows = {user.id: row for row, user in enumerate(users)}
+        columns = {subsection.location: column for column, subsection in enumerate(subsections)}
+        grades = PersistentSubsectionGrade.objects.filter(
+            user_id__in=list(rows),
+            course_id=course.id,
+        ).values_list(
+            'user_id',
+            'usage_key',
+            'earned_graded',
+            'possible_graded',
+            'override__earned_graded_override',
+            'override__possible_graded_override',
+        )
+        for user_id, usage_key, earned_graded, possible_graded, earned_override, possible_override in grades:
+            if usage_key.run is None:
+                usage_key = usage_key.replace(course_key=course.id)
+            column = columns.get(usage_key)
+            if column is not None:
+                row = rows[user_id]
+                earned[row, column] = earned_graded if earned_override is None else earned_override
+                possible[row, column] = possible_graded if possible_override is None else possible_override
+
+        return cls(users, course, subsections, earned, possible)
+
+    @classmethod
+    def is_course_wide(cls, course_structure):
+        """
+        Returns whether every learner sees the same graded blocks in the given
+        collected course structure, so that their grades can be read against
+        it.  They don't when graded blocks are restricted to groups (cohorts,
+        content groups, enrollment tracks or experiment groups), picked at
+        random from a library, visible to staff only, or not released yet.
+        """
+        now = datetime.now(UTC)
+        return not any(
+            cls._is_learner_specific(course_structure, block_key, now)
+            for subsection in cls._graded_subsections(course_structure)
+            for block_key in course_structure.topological_traversal(start_node=subsection.location)
+        )
+
+    @staticmethod
+    def _is_learner_specific(course_structure, block_key, now):
+        """
+        Returns whether some learners may not see the given block, or see it differently.
+        """
+        if block_key.block_type == 'library_content':
+            return True
+        merged_group_access = course_structure.get_transformer_block_field(
+            block_key, UserPartitionTransformer, 'merged_group_access',
+        )
+        if merged_group_access is not None and merged_group_access.get_allowed_groups():
+            return True
+        if course_structure.get_transformer_block_field(
+                block_key, VisibilityTransformer, VisibilityTransformer.MERGED_VISIBLE_TO_STAFF_ONLY,
+        ):
+            return True
+        start = course_structure.get_transformer_block_field(
+            block_key, StartDateTransformer, StartDateTransformer.MERGED_START_DATE,
+        )
+        return start is not None and start > now
+
+    @staticmethod
+    def _graded_subsections(course_structure):
+        """
+        Yields the graded subsections of the course, in the order CourseGrade finds them.
+        """
+        subsection_keys = OrderedDict()
+        for chapter_key in course_structure.get_children(course_structure.root_block_usage_key):
+            for subsection_key in course_structure.get_children(chapter_key):
+                subsection_keys[subsection_key] = None
+        for subsection_key in subsection_keys:
+            subsection = course_structure[subsection_key]
+            if getattr(subsection, 'graded', False):
+                yield subsection
+
+    @staticmethod
+    def _compute_subsection_percents(earned, possible):
+        """
+        Computes the percents of the given subsection scores, as compute_percent does.
+        """
+        ratios = numpy.divide(earned, possible, out=numpy.zeros_like(earned), where=possible > 0)
+        return numpy.around(ratios, decimals=2)
+
+    @staticmethod
+    def _compute_assignment_percents(subgrader, percents, attempted):
+        """
+        Computes the percent that the AssignmentFormatGrader `subgrader` gives
+        each user, given the percents of its subsections.  Only the
+        subsections that are `attempted` (that have points possible) count.
+        """
+        users = numpy.arange(percents.shape[0])[:, numpy.newaxis]
+        counts = attempted.sum(axis=1)
+        slots = numpy.maximum(counts, subgrader.min_count)
+
+        # The grader pads the scores with zeros up to min_count, and drops the
+        # lowest scores, the later of equal scores first.  So padding is
+        # dropped before any score, and scores are dropped in order of their
+        # rank from lowest to highest, with ties ranked from the right.
+        dropped_counts = numpy.maximum(subgrader.drop_count - (slots - counts), 0)
+        reversed_percents = numpy.where(attempted, percents, numpy.inf)[:, ::-1]
+        ranks = numpy.empty(percents.shape, dtype=int)
+        ranks[users, numpy.argsort(reversed_percents, axis=1, kind='mergesort')] = numpy.arange(percents.shape[1])
+        kept = attempted & (ranks[:, ::-1] >= dropped_counts[:, numpy.newaxis])
+
+        totals = numpy.zeros(percents.shape[0])
+        for column in range(percents.shape[1]):
+            totals = totals + numpy.where(kept[:, column], percents[:, column], 0.0)
+
+        averaged_counts = slots - subgrader.drop_count
+        return numpy.where(averaged_counts > 0, totals / numpy.maximum(averaged_counts, 1), totals)
+
+    @staticmethod
+    def _compute_percents(total_percents):
+        """
+        Computes the course grade percents, as CourseGrade._compute_percent does.
+        """
+        # Python's round rounds halves away from zero, unlike numpy.around.
+        values = total_percents * 100 + 0.05
+        rounded = numpy.floor(values)
+        rounded += values - rounded >= 0.5
+        return rounded / 100
+
+    @staticmethod
+    def _compute_letter_grades(grade_cutoffs, percents):
+        """
+        Computes the letter grades, as CourseGrade._compute_letter_grade does.
+        """
+        letter_grades = numpy.full(len(percents), None, dtype=object)
+        graded = numpy.zeros(len(percents), dtype=bool)
+        for possible_grade in sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True):
+            newly_graded = ~graded & (percents >= grade_cutoffs[possible_grade])
+            letter_grades[newly_graded] = possible_grade
+            graded |= newly_graded
+        return letter_grades.tolist()
+
+    @staticmethod
+    def _compute_passed(grade_cutoffs, percents):
+        """
+        Computes whether the percents pass, as CourseGrade._compute_passed does.
+        """
+        nonzero_cutoffs = [cutoff for cutoff in grade_cutoffs.values() if cutoff > 0]
+        if not nonzero_cutoffs:
+            return numpy.zeros(len(percents), dtype=bool)
+        return percents >= min(nonzero_cutoffs)
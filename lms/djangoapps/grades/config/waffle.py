@@ -10,11 +10,13 @@ WAFFLE_NAMESPACE = u'grades'
 # Switches
 ASSUME_ZERO_GRADE_IF_ABSENT = u'assume_zero_grade_if_absent'
 DISABLE_REGRADE_ON_POLICY_CHANGE = u'disable_regrade_on_policy_change'
+WRITE_COMPACT_VISIBLE_BLOCKS = u'write_compact_visible_blocks'
 
 # Course Flags
 REJECTED_EXAM_OVERRIDES_GRADE = u'rejected_exam_overrides_grade'
 ENFORCE_FREEZE_GRADE_AFTER_COURSE_END = u'enforce_freeze_grade_after_course_end'
 WRITABLE_GRADEBOOK = u'writable_gradebook'
+GRADEBOOK_PERSISTED_GRADES_ONLY = u'gradebook_persisted_grades_only'
 
 
 def waffle():
@@ -47,4 +49,11 @@ def waffle_flags():
             WRITABLE_GRADEBOOK,
             flag_undefined_default=True,
         ),
+        # Serve the gradebook from stored grades only, taking absent grades to be zero
+        # rather than computing them, for courses with too many learners to compute them.
+        GRADEBOOK_PERSISTED_GRADES_ONLY: CourseWaffleFlag(
+            namespace,
+            GRADEBOOK_PERSISTED_GRADES_ONLY,
+            flag_undefined_default=False,
+        ),
     }
@@ -321,5 +321,19 @@ class CourseGrade(CourseGradeBase):
         return success_cutoff and percent >= success_cutoff
 
 
+class PersistedCourseGrade(CourseGrade):
+    """
+    Course Grade class for grades read from storage, whose subsection grades
+    are only read from storage too.  Subsections without a stored grade get
+    a ZeroSubsectionGrade, rather than one computed from the user's course
+    blocks and scores.
+    """
+    def _get_subsection_grade(self, subsection, force_update_subsections=False):
+        subsection_grade = self._subsection_grade_factory._get_bulk_cached_grade(  # pylint: disable=protected-access
+            subsection
+        )
+        return subsection_grade or ZeroSubsectionGrade(subsection, self.course_data)
+
+
 def _uniqueify_and_keep_order(iterable):
     return OrderedDict([(item, None) for item in iterable]).keys()
@@ -2,17 +2,19 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from six import text_type
 
+from lms.djangoapps.course_blocks.api import defer_prefetch_course_blocks_data
 from openedx.core.djangoapps.signals.signals import (COURSE_GRADE_CHANGED,
                                                      COURSE_GRADE_NOW_PASSED,
                                                      COURSE_GRADE_NOW_FAILED)
 
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
-from .course_grade import CourseGrade, ZeroCourseGrade
+from .course_grade import CourseGrade, PersistedCourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade, prefetch
 
 log = getLogger(__name__)
@@ -24,6 +26,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose course blocks data is prefetched together in iter.
+    USER_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -32,22 +37,28 @@ class CourseGradeFactory(object):
             course_structure=None,
             course_key=None,
             create_if_needed=True,
+            persisted_only=False,
     ):
         """
         Returns the CourseGrade for the given user in the course.
         Reads the value from storage.
-        If not in storage, returns a ZeroGrade if ASSUME_ZERO_GRADE_IF_ABSENT.
+        If not in storage, returns a ZeroGrade if ASSUME_ZERO_GRADE_IF_ABSENT
+        or persisted_only.
         Else if create_if_needed, computes and returns a new value.
         Else, returns None.
 
+        If persisted_only, subsection grades are only read from storage too,
+        and are zero if absent, so the user's course blocks and scores are
+        never loaded.
+
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
         try:
-            return self._read(user, course_data)
+            return self._read(user, course_data, persisted_only)
         except PersistentCourseGrade.DoesNotExist:
-            if assume_zero_if_absent(course_data.course_key):
+            if persisted_only or assume_zero_if_absent(course_data.course_key):
                 return self._create_zero(user, course_data)
             elif create_if_needed:
                 return self._update(user, course_data)
@@ -84,6 +95,7 @@ class CourseGradeFactory(object):
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            persisted_only=False,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -93,6 +105,8 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        If persisted_only, grades are only read from storage, as in read.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -103,10 +117,29 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        for users_batch in self._batch_users(users):
+            # Bulk-fetch the per-user data needed to transform the course
+            # blocks of each user in the batch, once grades need to be
+            # computed for any of them, which they don't if they're all read
+            # from storage.
+            defer_prefetch_course_blocks_data(course_data.course_key, users_batch)
+            for user in users_batch:
+                yield self._iter_grade_result(user, course_data, force_update, persisted_only)
+
+    @classmethod
+    def _batch_users(cls, users):
+        """
+        Yields lists of up to USER_BATCH_SIZE users from the given
+        iterable of users.
+        """
+        users = iter(users)
+        while True:
+            users_batch = list(islice(users, cls.USER_BATCH_SIZE))
+            if not users_batch:
+                return
+            yield users_batch
 
-    def _iter_grade_result(self, user, course_data, force_update):
+    def _iter_grade_result(self, user, course_data, force_update, persisted_only=False):
         try:
             kwargs = {
                 'user': user,
@@ -116,6 +149,8 @@ class CourseGradeFactory(object):
             }
             if force_update:
                 kwargs['force_update_subsections'] = True
+            elif persisted_only:
+                kwargs['persisted_only'] = True
 
             method = CourseGradeFactory().update if force_update else CourseGradeFactory().read
             course_grade = method(**kwargs)
@@ -140,10 +175,11 @@ class CourseGradeFactory(object):
         return ZeroCourseGrade(user, course_data)
 
     @staticmethod
-    def _read(user, course_data):
+    def _read(user, course_data, persisted_only=False):
         """
         Returns a CourseGrade object based on stored grade information
-        for the given user and course.
+        for the given user and course.  If persisted_only, it only reads
+        its subsection grades from storage too.
         """
         if not should_persist_grades(course_data.course_key):
             raise PersistentCourseGrade.DoesNotExist
@@ -151,7 +187,8 @@ class CourseGradeFactory(object):
         persistent_grade = PersistentCourseGrade.read(user.id, course_data.course_key)
         log.debug(u'Grades: Read, %s, User: %s, %s', unicode(course_data), user.id, persistent_grade)
 
-        return CourseGrade(
+        course_grade_class = PersistedCourseGrade if persisted_only else CourseGrade
+        return course_grade_class(
             user,
             course_data,
             persistent_grade.percent_grade,
@@ -0,0 +1,127 @@
+"""
+Command to rewrite the blocks of existing VisibleBlocks rows in the compact encoding.
+
+Rows keep their hash, so the subsection grades that refer to them don't change.
+Rows already stored compactly are skipped.  With --dry-run nothing is written,
+which makes it a benchmark: either way, the command reports the storage size of
+the rows read in both encodings, and how long decoding them took.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from lms.djangoapps.grades.models import BlockRecordList, VisibleBlocks
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms compact_visible_blocks --course_id course-v1:edX+DemoX+Demo_Course --settings=devstack
+        $ ./manage.py lms compact_visible_blocks --dry-run --limit 10000 --settings=devstack
+    """
+    help = 'Rewrites the blocks of VisibleBlocks rows in the compact encoding, and reports the space saved.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course_id',
+            dest='course_id',
+            help='Only rewrite the rows of this course.',
+        )
+        parser.add_argument(
+            '--batch_size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of rows read and written at a time.',
+        )
+        parser.add_argument(
+            '--limit',
+            dest='limit',
+            type=int,
+            help='Stop after this many rows.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help='Report sizes and decode times without writing anything.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('batch_size must be at least 1.')
+
+        queryset = VisibleBlocks.objects.order_by('id')
+        if options['course_id']:
+            try:
+                queryset = queryset.filter(course_id=CourseKey.from_string(options['course_id']))
+            except InvalidKeyError:
+                raise CommandError('Invalid course_id: {}'.format(options['course_id']))
+
+        stats = dict.fromkeys(['rows', 'compacted', 'json_size', 'compact_size', 'json_time', 'compact_time'], 0)
+        last_id = 0
+        while options['limit'] is None or stats['rows'] < options['limit']:
+            batch_size = options['batch_size']
+            if options['limit'] is not None:
+                batch_size = min(batch_size, options['limit'] - stats['rows'])
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for visible_blocks in batch:
+                self._compact(visible_blocks, stats, options['dry_run'])
+            log.info('compact_visible_blocks: read %d rows, up to id %d.', stats['rows'], last_id)
+
+        self._report(stats, options['dry_run'])
+
+    def _compact(self, visible_blocks, stats, dry_run):
+        """
+        Measures `visible_blocks` in both encodings, and stores it in the
+        compact encoding unless it already is or this is a dry run.
+        """
+        blocks = BlockRecordList.from_json(visible_blocks.blocks_json)
+        json_value, compact_value = blocks.json_value, blocks.compact_value
+
+        stats['rows'] += 1
+        stats['json_size'] += len(json_value)
+        stats['compact_size'] += len(compact_value)
+        stats['json_time'] += self._decode_time(json_value)
+        stats['compact_time'] += self._decode_time(compact_value)
+
+        if visible_blocks.blocks_json != compact_value and not dry_run:
+            VisibleBlocks.objects.filter(id=visible_blocks.id).update(blocks_json=compact_value)
+            stats['compacted'] += 1
+
+    @staticmethod
+    def _decode_time(value):
+        """
+        Returns the seconds taken to decode all the blocks in the serialized BlockRecordList `value`.
+        """
+        start = default_timer()
+        BlockRecordList.from_json(value).blocks  # pylint: disable=expression-not-assigned
+        return default_timer() - start
+
+    def _report(self, stats, dry_run):
+        """
+        Prints the sizes and decode times of the rows read, in both encodings.
+        """
+        print('{:>10} {:>14} {:>14} {:>18} {:>18}'.format(
+            'rows', 'json bytes', 'compact bytes', 'json decode (ms)', 'compact decode (ms)'
+        ))
+        print('{:>10} {:>14} {:>14} {:>18.1f} {:>18.1f}'.format(
+            stats['rows'],
+            stats['json_size'],
+            stats['compact_size'],
+            stats['json_time'] * 1000,
+            stats['compact_time'] * 1000,
+        ))
+        if not dry_run:
+            print('Rewrote {} rows in the compact encoding.'.format(stats['compacted']))
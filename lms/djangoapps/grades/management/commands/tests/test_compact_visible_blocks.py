@@ -0,0 +1,66 @@
+"""
+Tests for the compact_visible_blocks management command.
+"""
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from lms.djangoapps.grades.models import BlockRecord, BlockRecordList, VisibleBlocks
+
+
+class TestCompactVisibleBlocks(TestCase):
+    """
+    Tests the compact_visible_blocks management command.
+    """
+    def setUp(self):
+        super(TestCompactVisibleBlocks, self).setUp()
+        self.course_key = CourseLocator(org='some_org', course='some_course', run='some_run')
+        self.block_lists = [
+            BlockRecordList([
+                BlockRecord(BlockUsageLocator(self.course_key, 'problem', 'block_{}'.format(index)), 1, 10, True)
+                for index in range(count)
+            ], self.course_key)
+            for count in range(1, 4)
+        ]
+        for block_list in self.block_lists:
+            VisibleBlocks.objects.create(
+                blocks_json=block_list.json_value, hashed=block_list.hash_value, course_id=self.course_key
+            )
+
+    def _call_command(self, *args):
+        """
+        Calls the command, and returns the lines it printed.
+        """
+        with patch('lms.djangoapps.grades.management.commands.compact_visible_blocks.print', create=True) as mock_print:
+            call_command('compact_visible_blocks', *args)
+        return [call[0][0] for call in mock_print.call_args_list]
+
+    def test_compact(self):
+        printed = self._call_command('--batch_size', '2')
+        self.assertEqual(printed[-1], 'Rewrote 3 rows in the compact encoding.')
+        self.assertEqual(printed[1].split()[0], '3')
+
+        for block_list in self.block_lists:
+            visible_blocks = VisibleBlocks.objects.get(hashed=block_list.hash_value)
+            self.assertEqual(visible_blocks.blocks_json, block_list.compact_value)
+            self.assertEqual(visible_blocks.blocks, block_list)
+
+        printed = self._call_command()
+        self.assertEqual(printed[-1], 'Rewrote 0 rows in the compact encoding.')
+
+    def test_dry_run(self):
+        printed = self._call_command('--dry-run', '--limit', '2')
+        rows, json_size, compact_size = [int(value) for value in printed[1].split()[:3]]
+        self.assertEqual(rows, 2)
+        self.assertLess(compact_size, json_size)
+        self.assertEqual(len(printed), 2)
+        for block_list in self.block_lists:
+            self.assertEqual(VisibleBlocks.objects.get(hashed=block_list.hash_value).blocks_json, block_list.json_value)
+
+    def test_course_id(self):
+        printed = self._call_command('--course_id', 'course-v1:other_org+other_course+other_run')
+        self.assertEqual(printed[-1], 'Rewrote 0 rows in the compact encoding.')
+
+        with self.assertRaisesRegexp(CommandError, 'Invalid course_id'):
+            self._call_command('--course_id', 'not a course')
@@ -24,6 +24,7 @@ from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from coursewarehistoryextended.fields import UnsignedBigIntAutoField, UnsignedBigIntOneToOneField
 from lms.djangoapps.grades import events
+from lms.djangoapps.grades.config.waffle import WRITE_COMPACT_VISIBLE_BLOCKS, waffle
 from openedx.core.lib.cache_utils import get_cache
 
 
@@ -32,6 +33,9 @@ log = logging.getLogger(__name__)
 
 BLOCK_RECORD_LIST_VERSION = 1
 
+# Version of the compact encoding of BlockRecordLists, see BlockRecordList.compact_value.
+BLOCK_RECORD_LIST_COMPACT_VERSION = 2
+
 # Used to serialize information about a block at the time it was used in
 # grade calculation.
 BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'graded'])
@@ -40,13 +44,23 @@ BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'g
 class BlockRecordList(object):
     """
     An immutable ordered list of BlockRecord objects.
+
+    The blocks are only read from the given iterable when they're first used,
+    so lists read from the database aren't decoded unless they're needed.
     """
 
     def __init__(self, blocks, course_key, version=None):
-        self.blocks = tuple(blocks)
+        self._blocks = blocks
         self.course_key = course_key
         self.version = version or BLOCK_RECORD_LIST_VERSION
 
+    @lazy
+    def blocks(self):
+        """
+        Returns the tuple of BlockRecords in this list.
+        """
+        return tuple(self._blocks)
+
     def __eq__(self, other):
         assert isinstance(other, BlockRecordList)
         return self.json_value == other.json_value
@@ -96,12 +110,56 @@ class BlockRecordList(object):
             sort_keys=True,
         )
 
+    @lazy
+    def compact_value(self):
+        """
+        Return a compact serialized version of the list of block records.
+
+        This is a JSON array of the compact version, the course key, the block
+        types used, and a row for each block.  A block in the course is stored
+        as [block type index, block id, weight, raw_possible, graded], and any
+        other block as [locator, weight, raw_possible, graded].  Unlike
+        json_value, it depends on more than the blocks, such as the order their
+        types appear in, so it's only for storage, and json_value remains what's
+        hashed and compared.
+        """
+        block_types = []
+        type_indexes = {}
+        rows = []
+        for block in self.blocks:
+            locator = block.locator
+            if self._is_relative(locator):
+                if locator.block_type not in type_indexes:
+                    type_indexes[locator.block_type] = len(block_types)
+                    block_types.append(locator.block_type)
+                row = [type_indexes[locator.block_type], locator.block_id]
+            else:
+                row = [unicode(locator)]
+            rows.append(row + [block.weight, block.raw_possible, block.graded])
+        return json.dumps(
+            [BLOCK_RECORD_LIST_COMPACT_VERSION, unicode(self.course_key), block_types, rows],
+            separators=(',', ':'),
+        )
+
+    def _is_relative(self, locator):
+        """
+        Return whether `locator` can be stored relative to this list's course key.
+        """
+        return (
+            getattr(locator, 'course_key', None) == self.course_key and
+            self.course_key.make_usage_key(locator.block_type, locator.block_id) == locator
+        )
+
     @classmethod
     def from_json(cls, blockrecord_json):
         """
-        Return a BlockRecordList from previously serialized json.
+        Return a BlockRecordList from previously serialized json, either
+        json_value or compact_value.
         """
         data = json.loads(blockrecord_json)
+        if isinstance(data, list):
+            return cls._from_compact(data)
+
         course_key = CourseKey.from_string(data['course_key'])
         block_dicts = data['blocks']
         record_generator = (
@@ -115,6 +173,29 @@ class BlockRecordList(object):
         )
         return cls(record_generator, course_key, version=data['version'])
 
+    @classmethod
+    def _from_compact(cls, data):
+        """
+        Return a BlockRecordList from the decoded JSON of compact_value.
+        """
+        version, course_key, block_types, rows = data
+        if version != BLOCK_RECORD_LIST_COMPACT_VERSION:
+            raise ValueError(u'Unknown compact BlockRecordList version {}'.format(version))
+        course_key = CourseKey.from_string(course_key)
+
+        def record_generator():
+            """
+            Yields the BlockRecord of each row.
+            """
+            for row in rows:
+                if len(row) == 5:
+                    locator = course_key.make_usage_key(block_types[row[0]], row[1])
+                else:
+                    locator = UsageKey.from_string(row[0]).replace(course_key=course_key)
+                yield BlockRecord(locator, *row[-3:])
+
+        return cls(record_generator(), course_key)
+
     @classmethod
     def from_list(cls, blocks, course_key):
         """
@@ -132,6 +213,11 @@ class VisibleBlocks(models.Model):
     in the blocks_json field. A hash of this json array is used for lookup
     purposes.
 
+    The blocks are stored in BlockRecordList's compact encoding when the
+    WRITE_COMPACT_VISIBLE_BLOCKS waffle switch is on, and otherwise as JSON.
+    Either way, the hash is of the JSON, so the same blocks are found under
+    the same hash however they're stored.
+
     .. no_pii:
     """
     blocks_json = models.TextField()
@@ -188,16 +274,26 @@ class VisibleBlocks(models.Model):
                 # another user may have had this block hash created,
                 # even if the user we checked the cache for hasn't yet.
                 model, _ = cls.objects.get_or_create(
-                    hashed=blocks.hash_value, blocks_json=blocks.json_value, course_id=blocks.course_key,
+                    hashed=blocks.hash_value,
+                    defaults={u'blocks_json': cls.encode(blocks), u'course_id': blocks.course_key},
                 )
                 cls._update_cache(user_id, blocks.course_key, [model])
         else:
             model, _ = cls.objects.get_or_create(
                 hashed=blocks.hash_value,
-                defaults={u'blocks_json': blocks.json_value, u'course_id': blocks.course_key},
+                defaults={u'blocks_json': cls.encode(blocks), u'course_id': blocks.course_key},
             )
         return model
 
+    @staticmethod
+    def encode(blocks):
+        """
+        Returns the value stored in blocks_json for the given BlockRecordList.
+        """
+        if waffle().is_enabled(WRITE_COMPACT_VISIBLE_BLOCKS):
+            return blocks.compact_value
+        return blocks.json_value
+
     @classmethod
     def bulk_create(cls, user_id, course_key, block_record_lists):
         """
@@ -208,7 +304,7 @@ class VisibleBlocks(models.Model):
         """
         created = cls.objects.bulk_create([
             VisibleBlocks(
-                blocks_json=brl.json_value,
+                blocks_json=cls.encode(brl),
                 hashed=brl.hash_value,
                 course_id=course_key,
             )
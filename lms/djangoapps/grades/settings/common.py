@@ -1,6 +1,19 @@
 def plugin_settings(settings):
+    """Common settings for Grades"""
     # Queue to use for updating persistent grades
     settings.RECALCULATE_GRADES_ROUTING_KEY = settings.DEFAULT_PRIORITY_QUEUE
 
     # Queue to use for updating grades due to grading policy change
     settings.POLICY_CHANGE_GRADES_ROUTING_KEY = settings.DEFAULT_PRIORITY_QUEUE
+
+    # Score changes to the same problem for the same learner are coalesced into
+    # one subsection grade recalculation, using the cache named by CACHE_ALIAS.
+    #   WINDOW_SECONDS: how long a recalculation waits for more score changes
+    #     before it runs; 0 enqueues one recalculation per score change.
+    #   TIMEOUT: seconds after which score changes stop being folded into a
+    #     recalculation that still hasn't run.
+    settings.SUBSECTION_GRADE_UPDATE_COALESCING = {
+        'CACHE_ALIAS': 'default',
+        'WINDOW_SECONDS': 5,
+        'TIMEOUT': 300,
+    }
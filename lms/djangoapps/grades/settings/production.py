@@ -12,3 +12,7 @@ def plugin_settings(settings):
     settings.POLICY_CHANGE_GRADES_ROUTING_KEY = settings.ENV_TOKENS.get(
         'POLICY_CHANGE_GRADES_ROUTING_KEY', settings.DEFAULT_PRIORITY_QUEUE,
     )
+
+    settings.SUBSECTION_GRADE_UPDATE_COALESCING.update(
+        settings.ENV_TOKENS.get('SUBSECTION_GRADE_UPDATE_COALESCING', {})
+    )
@@ -1,3 +1,4 @@
 def plugin_settings(settings):
     settings.FEATURES['PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS'] = True
     settings.FEATURES['ASSUME_ZERO_GRADE_IF_ABSENT_FOR_ALL_TESTS'] = True
+    settings.SUBSECTION_GRADE_UPDATE_COALESCING = dict(settings.SUBSECTION_GRADE_UPDATE_COALESCING, WINDOW_SECONDS=0)
@@ -9,8 +9,10 @@ from celery import task
 from celery_utils.persist_on_failure import LoggedPersistOnFailureTask
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.db.utils import DatabaseError
+from edx_django_utils.cache import RequestCache
 from edx_django_utils.monitoring import set_custom_metric, set_custom_metrics_for_course_key
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import CourseLocator
@@ -46,6 +48,7 @@ KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on r
 RECALCULATE_GRADE_DELAY_SECONDS = 2  # to prevent excessive _has_db_updated failures. See TNL-6424.
 RETRY_DELAY_SECONDS = 40
 SUBSECTION_GRADE_TIMEOUT_SECONDS = 300
+SUBSECTION_UPDATE_METRICS_NAMESPACE = u'grades.tasks.subsection_update_metrics'
 
 
 @task(base=LoggedPersistOnFailureTask, routing_key=settings.POLICY_CHANGE_GRADES_ROUTING_KEY)
@@ -179,6 +182,97 @@ def recalculate_subsection_grade_v3(self, **kwargs):
     _recalculate_subsection_grade(self, **kwargs)
 
 
+def enqueue_subsection_grade_recalculation(task_kwargs):
+    """
+    Enqueues recalculate_subsection_grade_v3 with the given keyword arguments,
+    unless a task is already pending for the same user and scored block, in
+    which case this score change is folded into that task instead.
+
+    Score changes are coalesced as configured by the
+    SUBSECTION_GRADE_UPDATE_COALESCING setting.  A pending task delays
+    starting by WINDOW_SECONDS, and when it starts it runs with the keyword
+    arguments of the latest score change folded into it, so that it checks
+    the database for the latest expected_modified_time.  Score changes that
+    arrive once it has started are enqueued as a new task.
+    """
+    config = getattr(settings, 'SUBSECTION_GRADE_UPDATE_COALESCING', {})
+    window = config.get('WINDOW_SECONDS', 0)
+    if window:
+        cache = caches[config.get('CACHE_ALIAS', 'default')]
+        timeout = config.get('TIMEOUT', 300)
+        pending_key = _pending_subsection_update_key(task_kwargs)
+        _count_subsection_update_metric('subsection_updates_requested')
+
+        # The kwargs are saved before checking for a pending task, so either that
+        # task reads them when it starts, or it has already started and released
+        # pending_key, and a new task is enqueued here.
+        cache.set(pending_key + '.kwargs', task_kwargs, timeout)
+        if not cache.add(pending_key, 1, timeout):
+            try:
+                cache.incr(pending_key)
+            except ValueError:
+                # The pending task started in the meantime.
+                pass
+            else:
+                _count_subsection_update_metric('subsection_updates_coalesced')
+                return
+        task_kwargs = dict(task_kwargs, pending_key=pending_key)
+
+    recalculate_subsection_grade_v3.apply_async(
+        kwargs=task_kwargs,
+        countdown=max(window, RECALCULATE_GRADE_DELAY_SECONDS),
+    )
+
+
+def _count_subsection_update_metric(name):
+    """
+    Adds one to the named count of score changes in the current request or
+    task, and sets it as a custom metric of it.  The counts are kept in the
+    request cache, which is cleared after each request and each celery task.
+    """
+    counts = RequestCache(SUBSECTION_UPDATE_METRICS_NAMESPACE).data
+    counts[name] = counts.get(name, 0) + 1
+    set_custom_metric(name, counts[name])
+
+
+def _pending_subsection_update_key(task_kwargs):
+    """
+    Returns the cache key of the pending subsection grade recalculation that
+    a score change with the given task keyword arguments can be folded into.
+    """
+    return u'grades.subsection_update.{}'.format(u'.'.join(six.text_type(task_kwargs.get(name)) for name in (
+        'user_id',
+        'usage_id',
+        'score_db_table',
+        'only_if_higher',
+        'score_deleted',
+        'force_update_subsections',
+    )))
+
+
+def _take_coalesced_subsection_update(kwargs):
+    """
+    Returns the keyword arguments of the latest score change folded into this
+    task by enqueue_subsection_grade_recalculation, and releases the task's
+    pending key so that later score changes enqueue a new task.
+    """
+    pending_key = kwargs.pop('pending_key', None)
+    if pending_key is None:
+        return kwargs
+
+    cache = caches[getattr(settings, 'SUBSECTION_GRADE_UPDATE_COALESCING', {}).get('CACHE_ALIAS', 'default')]
+    score_changes = cache.get(pending_key) or 1
+    cache.delete(pending_key)
+    set_custom_metric('coalesced_score_changes', score_changes)
+
+    # Whichever score change is later is checked for in the database, in case the
+    # saved kwargs expired, or weren't saved over older ones.
+    latest_kwargs = cache.get(pending_key + '.kwargs')
+    if latest_kwargs is None or latest_kwargs['expected_modified_time'] < kwargs['expected_modified_time']:
+        return kwargs
+    return latest_kwargs
+
+
 def _recalculate_subsection_grade(self, **kwargs):
     """
     Updates a saved subsection grade.
@@ -201,7 +295,11 @@ def _recalculate_subsection_grade(self, **kwargs):
             event at the root of the current event transaction.
         score_db_table (ScoreDatabaseTableEnum): database table that houses
             the changed score. Used in conjunction with expected_modified_time.
+        pending_key (string, OPTIONAL): cache key under which later score
+            changes were folded into this task, see
+            enqueue_subsection_grade_recalculation.
     """
+    kwargs = _take_coalesced_subsection_update(kwargs)
     try:
         course_key = CourseLocator.from_string(kwargs['course_id'])
         if are_grades_frozen(course_key):
@@ -0,0 +1,153 @@
+"""
+Tests for BulkCourseGrades, which must agree exactly with CourseGrade.
+"""
+import random
+
+import ddt
+from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..bulk_course_grade import BulkCourseGrades
+from ..course_data import CourseData
+from ..course_grade import CourseGrade
+from ..models import BlockRecord, PersistentSubsectionGrade, PersistentSubsectionGradeOverride
+
+
+@ddt.ddt
+class BulkCourseGradesTest(SharedModuleStoreTestCase):
+    """
+    Tests that BulkCourseGrades grades users just as CourseGrade does.
+    """
+    SUBSECTION_FORMATS = ['Homework'] * 5 + ['Lab'] * 2 + ['Final Exam', None]
+
+    @classmethod
+    def setUpClass(cls):
+        super(BulkCourseGradesTest, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        with cls.store.bulk_operations(cls.course.id):
+            cls.subsections = []
+            for index, subsection_format in enumerate(cls.SUBSECTION_FORMATS):
+                if index % 3 == 0:
+                    chapter = ItemFactory.create(parent=cls.course, category='chapter')
+                subsection = ItemFactory.create(
+                    parent=chapter,
+                    category='sequential',
+                    graded=subsection_format is not None,
+                    format=subsection_format,
+                )
+                ItemFactory.create(parent=subsection, category='problem', data=problem_xml)
+                cls.subsections.append(subsection)
+
+        cls.course.set_grading_policy({
+            'GRADER': [
+                {'type': 'Homework', 'min_count': 4, 'drop_count': 2, 'short_label': 'HW', 'weight': 0.3},
+                {'type': 'Lab', 'min_count': 3, 'drop_count': 1, 'short_label': 'Lab', 'weight': 0.3},
+                {'type': 'Final Exam', 'min_count': 1, 'drop_count': 0, 'short_label': 'Final', 'weight': 0.4},
+            ],
+            'GRADE_CUTOFFS': {'A': 0.87, 'B': 0.7, 'C': 0.5},
+        })
+        cls.store.update_item(cls.course, 0)
+
+    def setUp(self):
+        super(BulkCourseGradesTest, self).setUp()
+        self.users = [UserFactory.create() for _ in range(8)]
+        for user in self.users:
+            CourseEnrollment.enroll(user, self.course.id)
+        self.course_structure = get_course_blocks(self.users[0], self.course.location)
+
+    def _persist_grades(self, seed):
+        """
+        Persists random subsection grades for the users, many of them tied,
+        with some subsections left ungraded and some grades overridden.
+        """
+        rnd = random.Random(seed)
+        for user in self.users:
+            for subsection in self.subsections:
+                if rnd.random() < 0.2:
+                    continue
+                possible = rnd.choice([0, 1, 2, 4])
+                earned = rnd.choice([0, possible, possible / 2.0, round(rnd.uniform(0, possible), 1)])
+                grade = PersistentSubsectionGrade.update_or_create_grade(
+                    user_id=user.id,
+                    usage_key=subsection.location,
+                    course_version=None,
+                    subtree_edited_timestamp=None,
+                    earned_all=earned,
+                    possible_all=possible,
+                    earned_graded=earned,
+                    possible_graded=possible,
+                    visible_blocks=[BlockRecord(subsection.location, 1, possible, True)],
+                    first_attempted=None,
+                )
+                if rnd.random() < 0.1:
+                    PersistentSubsectionGradeOverride.update_or_create_override(
+                        requesting_user=None,
+                        subsection_grade_model=grade,
+                        earned_graded_override=rnd.choice([0, 1]),
+                        possible_graded_override=rnd.choice([None, 1]),
+                    )
+
+    @ddt.data(*range(5))
+    def test_parity(self, seed):
+        self._persist_grades(seed)
+        bulk_grades = BulkCourseGrades.read(self.users, self.course, self.course_structure)
+        self.assertEqual(
+            [subsection.location for subsection in bulk_grades.subsections],
+            [subsection.location for subsection in self.subsections if subsection.graded],
+        )
+
+        for row, user in enumerate(self.users):
+            course_grade = CourseGrade(user, CourseData(user, course=self.course)).update()
+            self.assertEqual(bulk_grades.percents[row], course_grade.percent)
+            self.assertEqual(bulk_grades.letter_grades[row], course_grade.letter_grade)
+            self.assertEqual(bulk_grades.passed[row], bool(course_grade.passed))
+            self.assertEqual(
+                list(bulk_grades.grade_breakdown[row]),
+                [breakdown['percent'] for breakdown in course_grade.grader_result['grade_breakdown'].values()],
+            )
+            for column, subsection in enumerate(bulk_grades.subsections):
+                self.assertEqual(
+                    bulk_grades.subsection_percents[row, column],
+                    course_grade.subsection_grade(subsection.location).percent_graded,
+                )
+
+    def test_is_course_wide(self):
+        self.assertTrue(BulkCourseGrades.is_course_wide(CourseData(None, course=self.course).collected_structure))
+
+    def test_no_grades(self):
+        bulk_grades = BulkCourseGrades.read(self.users, self.course, self.course_structure)
+        self.assertEqual(bulk_grades.percents.tolist(), [0.0] * len(self.users))
+        self.assertEqual(bulk_grades.letter_grades, [None] * len(self.users))
+        self.assertFalse(bulk_grades.passed.any())
+
+    def test_drop_lowest(self):
+        homework = [subsection for subsection in self.subsections if subsection.format == 'Homework']
+        earned = [0.5, 0.25, 0.5, 0.25, 0.25]
+        for subsection, subsection_earned in zip(homework, earned):
+            PersistentSubsectionGrade.update_or_create_grade(
+                user_id=self.users[0].id,
+                usage_key=subsection.location,
+                course_version=None,
+                subtree_edited_timestamp=None,
+                earned_all=subsection_earned,
+                possible_all=1,
+                earned_graded=subsection_earned,
+                possible_graded=1,
+                visible_blocks=[BlockRecord(subsection.location, 1, 1, True)],
+                first_attempted=None,
+            )
+
+        bulk_grades = BulkCourseGrades.read(self.users[:1], self.course, self.course_structure)
+        course_grade = CourseGrade(self.users[0], CourseData(self.users[0], course=self.course)).update()
+        homework_percent = course_grade.grader_result['grade_breakdown']['Homework']['percent']
+        self.assertEqual(homework_percent, (0.5 + 0.25 + 0.5) / 3 * 0.3)
+        self.assertEqual(bulk_grades.grade_breakdown[0, 0], homework_percent)
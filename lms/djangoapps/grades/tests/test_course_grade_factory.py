@@ -16,7 +16,7 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
-from ..course_grade import CourseGrade, ZeroCourseGrade
+from ..course_grade import CourseGrade, PersistedCourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .base import GradeTestBase
@@ -153,6 +153,29 @@ class TestCourseGradeFactory(GradeTestBase):
                 self.assertFalse(mocked_get_score.called)  # no calls to CSM/submissions tables
                 self.assertFalse(mocked_course_blocks.called)  # no user-specific transformer calculation
 
+    def test_read_persisted_only(self):
+        grade_factory = CourseGradeFactory()
+        with patch('lms.djangoapps.grades.course_data.get_course_blocks') as mocked_course_blocks:
+            self.assertIsInstance(
+                grade_factory.read(self.request.user, self.course, create_if_needed=True, persisted_only=True),
+                ZeroCourseGrade,
+            )
+            self.assertFalse(mocked_course_blocks.called)
+
+        with mock_get_score(1, 2):
+            self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
+        grade_factory.update(self.request.user, self.course)
+
+        with patch('lms.djangoapps.grades.course_data.get_course_blocks') as mocked_course_blocks:
+            with patch('lms.djangoapps.grades.subsection_grade.get_score') as mocked_get_score:
+                course_grade = grade_factory.read(self.request.user, self.course, persisted_only=True)
+                self.assertIsInstance(course_grade, PersistedCourseGrade)
+                self.assertEqual(course_grade.percent, 0.25)
+                self.assertIsInstance(course_grade.subsection_grade(self.sequence.location), ReadSubsectionGrade)
+                self.assertIsInstance(course_grade.subsection_grade(self.sequence2.location), ZeroSubsectionGrade)
+                self.assertFalse(mocked_get_score.called)
+                self.assertFalse(mocked_course_blocks.called)
+
     def test_subsection_grade(self):
         grade_factory = CourseGradeFactory()
         with mock_get_score(1, 2):
@@ -185,6 +208,17 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    @ddt.data(True, False)
+    def test_iter_persisted_only(self, persisted_only):
+        with patch('lms.djangoapps.course_blocks.api.prefetch_course_blocks_data') as mock_prefetch:
+            with patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read') as mock_read:
+                set(CourseGradeFactory().iter(
+                    users=[self.request.user], course=self.course, persisted_only=persisted_only,
+                ))
+        # No course blocks were transformed, so nothing was prefetched for them.
+        self.assertFalse(mock_prefetch.called)
+        self.assertEqual(mock_read.call_args[1].get('persisted_only', False), persisted_only)
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -16,7 +16,9 @@ from freezegun import freeze_time
 from mock import patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
+from lms.djangoapps.grades.config.waffle import WRITE_COMPACT_VISIBLE_BLOCKS, waffle
 from lms.djangoapps.grades.models import (
+    BLOCK_RECORD_LIST_COMPACT_VERSION,
     BLOCK_RECORD_LIST_VERSION,
     BlockRecord,
     BlockRecordList,
@@ -60,6 +62,49 @@ class BlockRecordListTestCase(TestCase):
             brs
         )
 
+    def test_compact_value(self):
+        locator = BlockUsageLocator(self.course_key, block_type='problem', block_id='block_id_a')
+        other_course_locator = BlockUsageLocator(
+            CourseLocator(org='other_org', course='other_course', run='other_run'), 'html', 'block_id_b'
+        )
+        brs = BlockRecordList([
+            BlockRecord(locator, weight=1, raw_possible=10, graded=True),
+            BlockRecord(other_course_locator, weight=None, raw_possible=2.5, graded=False),
+        ], self.course_key)
+
+        self.assertEqual(
+            json.loads(brs.compact_value),
+            [
+                BLOCK_RECORD_LIST_COMPACT_VERSION,
+                unicode(self.course_key),
+                ['problem'],
+                [[0, 'block_id_a', 1, 10, True], [unicode(other_course_locator), None, 2.5, False]],
+            ]
+        )
+        # Like the JSON, the locators of other courses are read back into this list's course.
+        decoded = BlockRecordList.from_json(brs.compact_value)
+        self.assertEqual(decoded, BlockRecordList.from_json(brs.json_value))
+        self.assertEqual(decoded.blocks[0], brs.blocks[0])
+
+    def test_compact_value_hash(self):
+        locator = BlockUsageLocator(self.course_key, block_type='problem', block_id='block_id_a')
+        brs = BlockRecordList([BlockRecord(locator, weight=1, raw_possible=10.0, graded=True)], self.course_key)
+        decoded = BlockRecordList.from_json(brs.compact_value)
+        self.assertEqual(decoded.json_value, brs.json_value)
+        self.assertEqual(decoded.hash_value, brs.hash_value)
+
+    def test_compact_value_unknown_version(self):
+        with self.assertRaises(ValueError):
+            BlockRecordList.from_json('[3,"{}",[],[]]'.format(self.course_key))
+
+    def test_decoded_lazily(self):
+        locator = BlockUsageLocator(self.course_key, block_type='problem', block_id='block_id_a')
+        compact_value = BlockRecordList([BlockRecord(locator, 1, 10, True)], self.course_key).compact_value
+        with patch('lms.djangoapps.grades.models.BlockRecord') as mock_block_record:
+            brs = BlockRecordList.from_json(compact_value)
+            self.assertFalse(mock_block_record.called)
+        self.assertEqual(brs.blocks[0].locator, locator)
+
 
 class GradesModelTestCase(TestCase):
     """
@@ -197,6 +242,24 @@ class VisibleBlocksTest(GradesModelTestCase):
         with self.assertRaises(AttributeError):
             visible_blocks.blocks = expected_blocks
 
+    def test_write_compact(self):
+        """
+        Ensures that visible blocks are stored compactly when the switch is
+        on, under the same hash as when they're stored as JSON.
+        """
+        json_vblocks = self._create_block_record_list([self.record_a])
+        with waffle().override(WRITE_COMPACT_VISIBLE_BLOCKS, active=True):
+            compact_vblocks = self._create_block_record_list([self.record_b])
+            same_vblocks = self._create_block_record_list([self.record_a])
+
+        self.assertEqual(json_vblocks.pk, same_vblocks.pk)
+        self.assertEqual(json_vblocks.blocks_json, same_vblocks.blocks_json)
+
+        expected_blocks = BlockRecordList.from_list([self.record_b], self.course_key)
+        self.assertEqual(compact_vblocks.blocks_json, expected_blocks.compact_value)
+        self.assertEqual(compact_vblocks.hashed, expected_blocks.hash_value)
+        self.assertEqual(compact_vblocks.blocks, expected_blocks)
+
 
 @ddt.ddt
 class PersistentSubsectionGradeTest(GradesModelTestCase):
@@ -11,9 +11,12 @@ import ddt
 import pytz
 import six
 from django.conf import settings
+from django.core.cache import caches
 from django.db.utils import IntegrityError
+from django.test.utils import override_settings
 from django.utils import timezone
-from mock import MagicMock, patch
+from edx_django_utils.cache import RequestCache
+from mock import MagicMock, call, patch
 
 from lms.djangoapps.grades import tasks
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
@@ -459,6 +462,95 @@ class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase
             offset_expected += test_batch_size
 
 
+@override_settings(
+    CACHES={'coalescing': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'coalescing'}},
+    SUBSECTION_GRADE_UPDATE_COALESCING={'CACHE_ALIAS': 'coalescing', 'WINDOW_SECONDS': 5, 'TIMEOUT': 60},
+)
+@patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
+class CoalesceSubsectionGradeRecalculationTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
+    """
+    Ensures that score changes to the same problem are coalesced into one recalculate_subsection_grade_v3 task.
+    """
+    def setUp(self):
+        super(CoalesceSubsectionGradeRecalculationTest, self).setUp()
+        self.user = UserFactory()
+        PersistentGradesEnabledFlag.objects.create(enabled_for_all_courses=True, enabled=True)
+        self.set_up_course()
+        caches['coalescing'].clear()
+
+    def _send_score_changes(self, *modified_times, **kwargs):
+        """
+        Sends a PROBLEM_WEIGHTED_SCORE_CHANGED signal for each of the given
+        modified times, and returns the mocked apply_async of the task.
+        """
+        with patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async') as mock_task_apply:
+            for modified in modified_times:
+                PROBLEM_WEIGHTED_SCORE_CHANGED.send(
+                    sender=None, **dict(self.problem_weighted_score_changed_kwargs, modified=modified, **kwargs)
+                )
+        return mock_task_apply
+
+    def test_score_changes_coalesced(self):
+        earlier = self.frozen_now_datetime - timedelta(seconds=30)
+        mock_task_apply = self._send_score_changes(earlier, self.frozen_now_datetime)
+        self.assertEqual(mock_task_apply.call_count, 1)
+
+        task_kwargs = mock_task_apply.call_args[1]['kwargs']
+        self.assertEqual(mock_task_apply.call_args[1]['countdown'], 5)
+        self.assertEqual(task_kwargs['expected_modified_time'], to_timestamp(earlier))
+        self.assertIn('pending_key', task_kwargs)
+
+        # The task checks the database for the latest score change folded into it.
+        with patch('lms.djangoapps.grades.tasks._has_db_updated_with_new_score', return_value=True) as mock_db_check:
+            with patch('lms.djangoapps.grades.tasks._update_subsection_grades') as mock_update:
+                recalculate_subsection_grade_v3.apply(kwargs=task_kwargs)
+        self.assertEqual(mock_db_check.call_args[1]['expected_modified_time'], self.frozen_now_timestamp)
+        self.assertNotIn('pending_key', mock_db_check.call_args[1])
+        self.assertEqual(mock_update.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.set_custom_metric')
+    def test_coalescing_metrics(self, mock_set_custom_metric):
+        RequestCache.clear_all_namespaces()
+        self._send_score_changes(self.frozen_now_datetime, self.frozen_now_datetime, self.frozen_now_datetime)
+        # The counts add up over the score changes of the current request or task.
+        mock_set_custom_metric.assert_has_calls([
+            call('subsection_updates_requested', 1),
+            call('subsection_updates_requested', 2),
+            call('subsection_updates_coalesced', 1),
+            call('subsection_updates_requested', 3),
+            call('subsection_updates_coalesced', 2),
+        ])
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.retry')
+    def test_retry_when_latest_score_not_in_db(self, mock_retry):
+        earlier = self.frozen_now_datetime - timedelta(seconds=30)
+        mock_task_apply = self._send_score_changes(earlier, self.frozen_now_datetime)
+
+        with patch('lms.djangoapps.grades.tasks.get_score', return_value=MagicMock(modified=earlier)):
+            recalculate_subsection_grade_v3.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        self.assertTrue(mock_retry.called)
+        self.assertEqual(mock_retry.call_args[1]['kwargs']['expected_modified_time'], self.frozen_now_timestamp)
+
+    def test_new_task_once_started(self):
+        mock_task_apply = self._send_score_changes(self.frozen_now_datetime)
+        tasks._take_coalesced_subsection_update(mock_task_apply.call_args[1]['kwargs'])  # pylint: disable=protected-access
+
+        mock_task_apply = self._send_score_changes(self.frozen_now_datetime + timedelta(seconds=1))
+        self.assertEqual(mock_task_apply.call_count, 1)
+
+    def test_different_changes_not_coalesced(self):
+        mock_task_apply = self._send_score_changes(self.frozen_now_datetime)
+        mock_task_apply_deleted = self._send_score_changes(self.frozen_now_datetime, score_deleted=True)
+        self.assertEqual(mock_task_apply.call_count, 1)
+        self.assertEqual(mock_task_apply_deleted.call_count, 1)
+
+    @override_settings(SUBSECTION_GRADE_UPDATE_COALESCING={'WINDOW_SECONDS': 0})
+    def test_coalescing_disabled(self):
+        mock_task_apply = self._send_score_changes(self.frozen_now_datetime, self.frozen_now_datetime)
+        self.assertEqual(mock_task_apply.call_count, 2)
+        self.assertNotIn('pending_key', mock_task_apply.call_args[1]['kwargs'])
+
+
 class RecalculateGradesForUserTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
     """
     Test recalculate_course_and_subsection_grades_for_user task.
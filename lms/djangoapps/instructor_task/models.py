@@ -18,12 +18,14 @@ import hashlib
 import json
 import logging
 import os.path
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
@@ -233,6 +235,10 @@ class DjangoStorageReportStore(ReportStore):
     """
     ReportStore implementation that delegates to django's storage api.
     """
+    # Maximum size of a report that is kept in memory, rather than in a
+    # temporary file, while it is written.
+    SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
     def __init__(self, storage_class=None, storage_kwargs=None):
         if storage_kwargs is None:
             storage_kwargs = {}
@@ -271,14 +277,51 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` can be any iterable, such as a generator.  Rows are encoded
+        and written as they are produced, so the report never needs to
+        be held in memory as a whole.
+        """
+        with self._open_for_writing(course_id, filename) as output_file:
+            # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+            output_file.write(codecs.BOM_UTF8)
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+
+    @contextmanager
+    def _open_for_writing(self, course_id, filename):
+        """
+        Context manager that yields a file to write the contents of the
+        file named `filename` for the given `course_id` to.
+
+        The contents are spooled to a temporary file, which is stored once
+        it has been written, so the storage backend uploads it in one go,
+        compressing it if it's configured to.  Nothing is stored if an
+        exception is raised while writing.
+        """
+        with SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as output_file:
+            yield output_file
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+    def open(self, course_id, filename):
+        """
+        Return a file-like object for reading the stored file named
+        `filename` for the given `course_id`.
+        """
+        return self.storage.open(self.path_to(course_id, filename))
+
+    def exists(self, course_id, filename):
+        """
+        Return whether a file named `filename` is stored for the given `course_id`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the stored file named `filename` for the given `course_id`.
         """
-        output_buffer = ContentFile('')
-        # Adding unicode signature (BOM) for MS Excel 2013 compatibility
-        output_buffer.write(codecs.BOM_UTF8)
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
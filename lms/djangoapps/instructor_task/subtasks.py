@@ -293,11 +293,51 @@ def queue_subtasks_for_query(
 
     Returns:  the task progress as stored in the InstructorTask object.
 
+    """
+    # Calculate the number of tasks that will be created.
+    total_num_subtasks = _get_number_of_subtasks(total_num_items, items_per_task)
+
+    # Construct a generator that will return the recipients to use for each subtask.
+    # Pass in the desired fields to fetch for each recipient.
+    item_list_generator = _generate_items_for_subtask(
+        item_querysets,
+        item_fields,
+        total_num_items,
+        items_per_task,
+        total_num_subtasks,
+        entry.course_id,
+    )
+    return _queue_subtasks(
+        entry, action_name, create_subtask_fcn, item_list_generator, total_num_subtasks, total_num_items,
+    )
+
+
+def queue_subtasks_for_item_lists(entry, action_name, create_subtask_fcn, item_lists, total_num_items):
+    """
+    Queues subtasks to each execute one of the given, already chunked, lists of "items".
+
+    Arguments:
+        `entry` : the InstructorTask object for which subtasks are being queued.
+        `action_name` : a past-tense verb that can be used for constructing readable status messages.
+        `create_subtask_fcn` : a function of two arguments that constructs the desired kind of subtask object.
+            Arguments are the list of items to be processed by this subtask, and a SubtaskStatus
+            object reflecting initial status (and containing the subtask's id).
+        `item_lists` : a list containing the list of items to pass to each subtask.
+        `total_num_items` : total amount of items that will be processed by the subtasks
+
+    Returns:  the task progress as stored in the InstructorTask object.
+    """
+    return _queue_subtasks(entry, action_name, create_subtask_fcn, item_lists, len(item_lists), total_num_items)
+
+
+def _queue_subtasks(entry, action_name, create_subtask_fcn, item_lists, total_num_subtasks, total_num_items):
+    """
+    Queues a subtask for each list of items in `item_lists`, which is an
+    iterable of `total_num_subtasks` lists.  See queue_subtasks_for_query.
     """
     task_id = entry.task_id
 
-    # Calculate the number of tasks that will be created, and create a list of ids for each task.
-    total_num_subtasks = _get_number_of_subtasks(total_num_items, items_per_task)
+    # Create a list of ids for each task.
     subtask_id_list = [str(uuid4()) for _ in range(total_num_subtasks)]
 
     # Update the InstructorTask  with information about the subtasks we've defined.
@@ -312,17 +352,6 @@ def queue_subtasks_for_query(
     with outer_atomic():
         progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list)
 
-    # Construct a generator that will return the recipients to use for each subtask.
-    # Pass in the desired fields to fetch for each recipient.
-    item_list_generator = _generate_items_for_subtask(
-        item_querysets,
-        item_fields,
-        total_num_items,
-        items_per_task,
-        total_num_subtasks,
-        entry.course_id,
-    )
-
     # Now create the subtasks, and start them running.
     TASK_LOG.info(
         u"Task %s: creating %s subtasks to process %s items.",
@@ -331,7 +360,7 @@ def queue_subtasks_for_query(
         total_num_items,
     )
     num_subtasks = 0
-    for item_list in item_list_generator:
+    for item_list in item_lists:
         subtask_id = subtask_id_list[num_subtasks]
         num_subtasks += 1
         subtask_status = SubtaskStatus.create(subtask_id)
@@ -448,7 +477,7 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, complete_parent=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -459,16 +488,23 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Once the last of the subtasks is done, the InstructorTask is marked as having succeeded,
+    unless `complete_parent` is False, in which case it is left for the caller to complete.
+
+    Returns True if this update completed the last of the InstructorTask's subtasks.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_parent)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
         if retry_count < MAX_DATABASE_LOCK_RETRIES:
             TASK_LOG.info(u"Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(
+                entry_id, current_task_id, new_subtask_status, retry_count, complete_parent,
+            )
         else:
             TASK_LOG.info(u"Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -481,7 +517,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
 
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_parent=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -501,12 +537,15 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     subtasks.  'Total' is expected to have been set at the time the subtasks were created.
     The other three counters are incremented depending on the value of `status`.  Once the counters
     for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
+    "status" is changed to SUCCESS, unless `complete_parent` is False.
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
     about failure messages, progress made, etc.
+
+    Returns True if this update completed the last of the subtasks.  Since the InstructorTask is
+    locked during the update, this is True for exactly one of the subtasks.
     """
     TASK_LOG.info(u"Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -557,7 +596,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        if num_remaining <= 0 and complete_parent:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -566,6 +605,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         entry.save()
         TASK_LOG.info(u"Task output updated to %s for subtask %s of instructor task %d",
                       entry.task_output, current_task_id, entry_id)
+        return num_remaining <= 0
     except Exception:
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         raise
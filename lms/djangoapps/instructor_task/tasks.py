@@ -187,6 +187,20 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_shard(
+    xmodule_instance_args, entry_id, action_name, shard, report_timestamp, subtask_status_dict
+):
+    """
+    Grade one shard of the enrollees of a course, as a subtask of a sharded
+    `calculate_grades_csv` task.  The last shard to complete merges the
+    results of all shards and pushes them to an S3 bucket for download.
+    """
+    return CourseGradeReport.generate_shard(
+        xmodule_instance_args, entry_id, action_name, shard, report_timestamp, subtask_status_dict
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
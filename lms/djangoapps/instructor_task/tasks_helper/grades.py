@@ -1,25 +1,37 @@
 """
 Functionality for generating grade reports.
 """
+import codecs
+import csv
+import json
 import logging
 import re
+import shutil
+import traceback
 from collections import defaultdict, OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, groupby, islice, izip_longest
+from tempfile import TemporaryFile
+from operator import itemgetter
 from time import time
 
+from celery.states import FAILURE, SUCCESS
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db.models import Q
+from edx_user_state_client.interface import XBlockUserState
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
 from six import text_type
+from six.moves import cPickle as pickle
+from xblock.fields import Scope
 
 from course_blocks.api import get_course_blocks
 from courseware.courses import get_course_by_id
+from courseware.models import StudentModule
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from instructor_analytics.basic import list_problem_responses
-from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
@@ -36,12 +48,17 @@ from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
+from ..exceptions import GradeReportShardError
+from ..models import InstructorTask, ReportStore
+from ..subtasks import SubtaskStatus, check_subtask_is_valid, queue_subtasks_for_item_lists, update_subtask_status
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_to_report_store, upload_file_to_report_store
 
 WAFFLE_NAMESPACE = 'instructor_task'
 WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
+SHARDED_COURSE_GRADE_REPORT = 'sharded_course_grade_report'
+BULK_PROBLEM_RESPONSES_REPORT = 'bulk_problem_responses_report'
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -201,15 +218,240 @@ class CourseGradeReport(object):
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
+    # Number of enrollees graded by each subtask of a sharded grade report.
+    USERS_PER_SHARD = 10000
+
+    # Report store directory in which the partial CSVs of sharded grade
+    # reports are kept until they are merged.
+    SHARD_DIRECTORY = u'grade_report_shards'
+
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Public method to generate a grade report.
         """
+        if WAFFLE_SWITCHES.is_enabled(SHARDED_COURSE_GRADE_REPORT):
+            shards = cls._shards(course_id)
+            if len(shards) > 1:
+                return cls._queue_shards(_xmodule_instance_args, _entry_id, shards, action_name)
+
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def generate_shard(cls, xmodule_instance_args, entry_id, action_name, shard, report_timestamp, subtask_status_dict):
+        """
+        Public method to grade one shard of a sharded grade report, as a
+        subtask of the given InstructorTask.  The subtask that completes
+        last merges the partial CSVs of all shards into the report, and only
+        then marks the InstructorTask as having succeeded or failed.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+
+        # Check that the requested subtask is actually known to the current
+        # InstructorTask entry, and that it has not already been run.
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        with modulestore().bulk_operations(entry.course_id):
+            context = _CourseGradeReportContext(
+                xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+            )
+            report = CourseGradeReport()
+            try:
+                num_succeeded, num_failed = report.grade_shard(context, entry_id, shard)
+            except Exception:
+                TASK_LOG.exception(u'%s, Grading shard %s failed unexpectedly', context.task_info_string, shard)
+                # Since we don't know how far the shard got, count all of
+                # its users as having failed.
+                subtask_status.increment(failed=shard['num_users'], state=FAILURE)
+                if update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False):
+                    report.merge_shards(context, entry_id, report_timestamp)
+                raise
+
+            subtask_status.increment(succeeded=num_succeeded, failed=num_failed, state=SUCCESS)
+            if update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False):
+                report.merge_shards(context, entry_id, report_timestamp)
+        return subtask_status.to_dict()
+
+    @classmethod
+    def _shards(cls, course_id):
+        """
+        Returns the list of shards for a sharded grade report of the given
+        course.  Each shard is a dict with the range of ids of the
+        `USERS_PER_SHARD` enrollees that it grades.
+        """
+        user_ids = list(
+            get_user_model().objects.filter(
+                courseenrollment__course_id=course_id,
+            ).values_list('id', flat=True).order_by('id')
+        )
+        shards = []
+        for index, start in enumerate(range(0, len(user_ids), cls.USERS_PER_SHARD)):
+            shard_user_ids = user_ids[start:start + cls.USERS_PER_SHARD]
+            shards.append({
+                'index': index,
+                'min_user_id': shard_user_ids[0],
+                'max_user_id': shard_user_ids[-1],
+                'num_users': len(shard_user_ids),
+            })
+        return shards
+
+    @classmethod
+    def _queue_shards(cls, xmodule_instance_args, entry_id, shards, action_name):
+        """
+        Queues a subtask to grade each of the given shards, and returns
+        the task progress.
+        """
+        # Import here to avoid a circular import, as the tasks module
+        # imports this one.
+        from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        # All shards use the time the report was started in the names of
+        # the CSVs, as the report is uploaded by whichever shard is last.
+        report_timestamp = time()
+
+        def _create_shard_subtask(shard, initial_subtask_status):
+            """Creates a subtask to grade the users of the given shard."""
+            return calculate_grades_csv_shard.subtask(
+                (
+                    xmodule_instance_args,
+                    entry_id,
+                    action_name,
+                    shard,
+                    report_timestamp,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        TASK_LOG.info(
+            u'InstructorTask ID: %s, Course: %s, Task type: %s, Queueing %s grade report shards',
+            entry_id, entry.course_id, action_name, len(shards),
+        )
+        return queue_subtasks_for_item_lists(
+            entry,
+            action_name,
+            _create_shard_subtask,
+            shards,
+            sum(shard['num_users'] for shard in shards),
+        )
+
+    def grade_shard(self, context, entry_id, shard):
+        """
+        Grades the users of the given shard and storing
+        their rows as partial CSVs.  Returns the number of users that were
+        and were not successfully graded.
+        """
+        TASK_LOG.info(u'%s, Task type: %s, Grading shard %s', context.task_info_string, context.action_name, shard)
+        error_rows = []
+        success_rows = self._compile(context, self._batched_rows(context, shard), error_rows)
+
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        # The success CSV is stored even if it is empty, since the merge
+        # treats a missing success CSV as a failed shard.
+        success_filename = self._shard_filename(entry_id, 'grade_report', shard['index'])
+        report_store.store_rows(context.course_id, success_filename, success_rows)
+        if error_rows:
+            try:
+                report_store.store_rows(
+                    context.course_id, self._shard_filename(entry_id, 'grade_report_err', shard['index']), error_rows,
+                )
+            except Exception:
+                report_store.delete(context.course_id, success_filename)
+                raise
+        return context.task_progress.succeeded, context.task_progress.failed
+
+    def merge_shards(self, context, entry_id, report_timestamp):
+        """
+        Merges the partial CSVs of all shards of a sharded grade report into
+        the final report, and marks the InstructorTask as having succeeded.
+        If any shard failed, or the merge fails, the InstructorTask is marked
+        as failed instead.  The partial CSVs are only deleted once the report
+        has been uploaded, so that a failed merge can be recovered from them.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        num_shards = json.loads(entry.subtasks)['total']
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+
+        success_filenames, error_filenames, failed_shards = [], [], []
+        for index in range(num_shards):
+            success_filename = self._shard_filename(entry_id, 'grade_report', index)
+            if report_store.exists(context.course_id, success_filename):
+                success_filenames.append(success_filename)
+            else:
+                failed_shards.append(index)
+            error_filename = self._shard_filename(entry_id, 'grade_report_err', index)
+            if report_store.exists(context.course_id, error_filename):
+                error_filenames.append(error_filename)
+
+        if failed_shards:
+            message = u'Grade report shards {} failed'.format(u', '.join(unicode(index) for index in failed_shards))
+            TASK_LOG.error(u'%s, Task type: %s, %s', context.task_info_string, context.action_name, message)
+            entry.task_state = FAILURE
+            entry.task_output = InstructorTask.create_output_for_failure(GradeReportShardError(message), None)
+            entry.save_now()
+            return
+
+        TASK_LOG.info(
+            u'%s, Task type: %s, Merging grade report shards', context.task_info_string, context.action_name,
+        )
+        try:
+            date = datetime.fromtimestamp(report_timestamp, UTC)
+            self._upload_merged(
+                report_store, context.course_id, 'grade_report', self._success_headers(context), success_filenames,
+                date,
+            )
+            if error_filenames:
+                self._upload_merged(
+                    report_store, context.course_id, 'grade_report_err', self._error_headers(), error_filenames, date,
+                )
+        except Exception as exception:
+            TASK_LOG.exception(
+                u'%s, Task type: %s, Merging grade report shards failed', context.task_info_string, context.action_name,
+            )
+            entry.task_state = FAILURE
+            entry.task_output = InstructorTask.create_output_for_failure(exception, traceback.format_exc())
+            entry.save_now()
+            raise
+
+        entry.task_state = SUCCESS
+        entry.save_now()
+        for filename in success_filenames + error_filenames:
+            report_store.delete(context.course_id, filename)
+
+    def _upload_merged(self, report_store, course_id, csv_name, headers, filenames, date):
+        """
+        Uploads a CSV with the given headers followed by the rows of the
+        given stored partial CSVs.
+        """
+        with TemporaryFile() as merged_file:
+            # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+            merged_file.write(codecs.BOM_UTF8)
+            csv.writer(merged_file).writerow([unicode(header).encode('utf-8') for header in headers])
+            for filename in filenames:
+                with report_store.open(course_id, filename) as part_file:
+                    if part_file.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+                        part_file.seek(0)
+                    shutil.copyfileobj(part_file, merged_file)
+            merged_file.seek(0)
+            upload_file_to_report_store(merged_file, csv_name, course_id, date)
+
+    def _shard_filename(self, entry_id, csv_name, index):
+        """
+        Returns the report store filename of a shard's partial CSV.
+        """
+        return u'{directory}/{entry_id}/{csv_name}_{index}.csv'.format(
+            directory=self.SHARD_DIRECTORY,
+            entry_id=entry_id,
+            csv_name=csv_name,
+            index=index,
+        )
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
@@ -219,10 +461,11 @@ class CourseGradeReport(object):
         error_headers = self._error_headers()
         batched_rows = self._batched_rows(context)
 
-        context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
-
-        context.update_status(u'Uploading grades')
+        # Rows are compiled as they are uploaded, so only a batch of
+        # success rows is held in memory at a time.
+        context.update_status(u'Compiling and uploading grades')
+        error_rows = []
+        success_rows = self._compile(context, batched_rows, error_rows)
         self._upload(context, success_headers, success_rows, error_headers, error_rows)
 
         return context.update_status(u'Completed grades')
@@ -248,37 +491,41 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
-    def _batched_rows(self, context):
+    def _batched_rows(self, context, shard=None):
         """
-        A generator of batches of (success_rows, error_rows) for this report.
+        A generator of batches of (success_rows, error_rows) for this report,
+        or for the given shard of it.
         """
-        for users in self._batch_users(context):
+        for users in self._batch_users(context, shard):
             users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _compile(self, context, batched_rows, error_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        A generator of the success rows for the given batched_rows and
+        context.  Error rows are appended to the given error_rows list, and
+        the metrics on task status are updated, as each batch is compiled.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        for batch_success_rows, batch_error_rows in batched_rows:
+            error_rows.extend(batch_error_rows)
+
+            # update metrics on task status
+            context.task_progress.succeeded += len(batch_success_rows)
+            context.task_progress.failed += len(batch_error_rows)
+            context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+            context.task_progress.total = context.task_progress.attempted
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+            for row in batch_success_rows:
+                yield row
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Creates and uploads a CSV for the given headers and rows.  The
+        success rows may be a generator, which is consumed before the
+        error rows are uploaded.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), 'grade_report', context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
@@ -295,9 +542,10 @@ class CourseGradeReport(object):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
-    def _batch_users(self, context):
+    def _batch_users(self, context, shard=None):
         """
-        Returns a generator of batches of users.
+        Returns a generator of batches of users, optionally limited to the
+        range of user ids of the given shard.
         """
         def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
             args = [iter(iterable)] * chunk_size
@@ -315,7 +563,7 @@ class CourseGradeReport(object):
             users = users.select_related('profile')
             return grouper(users)
 
-        def users_for_course_v2(course_id):
+        def users_for_course_v2(course_id, user_id_range=None):
             """
             Get all the enrolled users in a course chunk by chunk.
 
@@ -326,7 +574,10 @@ class CourseGradeReport(object):
                 'courseenrollment__course_id': course_id,
             }
 
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            user_ids_list = get_user_model().objects.filter(**filter_kwargs)
+            if user_id_range is not None:
+                user_ids_list = user_ids_list.filter(id__range=user_id_range)
+            user_ids_list = user_ids_list.values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
@@ -339,6 +590,9 @@ class CourseGradeReport(object):
                 ).select_related('profile')
                 yield users
 
+        if shard is not None:
+            return users_for_course_v2(context.course_id, (shard['min_user_id'], shard['max_user_id']))
+
         task_log_message = u'{}, Task type: {}'.format(context.task_info_string, context.action_name)
         if WAFFLE_SWITCHES.is_enabled(OPTIMIZE_GET_LEARNERS_FOR_COURSE):
             TASK_LOG.info(u'%s, Creating Course Grade with optimization', task_log_message)
@@ -509,7 +763,6 @@ class ProblemGradeReport(object):
         """
         start_time = time()
         start_date = datetime.now(UTC)
-        status_interval = 100
         enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
         task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
@@ -522,15 +775,36 @@ class ProblemGradeReport(object):
         graded_scorable_blocks = cls._graded_scorable_blocks_to_header(course)
 
         # Just generate the static fields for now.
-        rows = [list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())]
+        header = list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())
         error_rows = [list(header_row.values()) + ['error_msg']]
-        current_step = {'step': 'Calculating Grades'}
 
-        # Bulk fetch and cache enrollment states so we can efficiently determine
-        # whether each user is currently enrolled in the course.
-        CourseEnrollment.bulk_fetch_enrollment_states(enrolled_students, course_id)
+        # Rows are generated as they are uploaded, so that only a batch of
+        # them is held in memory at a time.
+        rows = cls._rows(course, enrolled_students, header_row, graded_scorable_blocks, task_progress, error_rows)
+        first_row = next(rows, None)
+
+        # Perform the upload if any students have been successfully graded
+        if first_row is not None:
+            upload_csv_to_report_store(chain([header, first_row], rows), 'problem_grade_report', course_id, start_date)
+        # If there are any error rows, write them out as well
+        if len(error_rows) > 1:
+            upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
 
-        for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
+        return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+    @classmethod
+    def _rows(cls, course, enrolled_students, header_row, graded_scorable_blocks, task_progress, error_rows):
+        """
+        A generator of the rows of the given students that were successfully
+        graded.  Rows of the students that failed to be graded are appended
+        to the given error_rows list, and the task progress is updated, as
+        the students are graded.
+        """
+        course_id = course.id
+        status_interval = 100
+        current_step = {'step': 'Calculating Grades'}
+
+        for student, course_grade, error in cls._iter_grades(course, enrolled_students):
             student_fields = [getattr(student, field_name) for field_name in header_row]
             task_progress.attempted += 1
 
@@ -557,20 +831,32 @@ class ProblemGradeReport(object):
                     else:
                         earned_possible_values.append([u'Not Attempted', problem_score.possible])
 
-            rows.append(student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values))
-
             task_progress.succeeded += 1
             if task_progress.attempted % status_interval == 0:
                 task_progress.update_task_state(extra_meta=current_step)
 
-        # Perform the upload if any students have been successfully graded
-        if len(rows) > 1:
-            upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-        # If there are any error rows, write them out as well
-        if len(error_rows) > 1:
-            upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+            yield student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values)
 
-        return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+    @classmethod
+    def _iter_grades(cls, course, enrolled_students):
+        """
+        Yields the GradeResult of each of the given students, in batches of
+        students whose enrollment states are bulk fetched and cached, so we
+        can efficiently determine whether each user is currently enrolled in
+        the course.  The collected course structure is retrieved once, so
+        the same version of the course is used to grade all students.
+        """
+        collected_block_structure = get_course_in_cache(course.id)
+        students = enrolled_students.iterator()
+        while True:
+            students_batch = list(islice(students, CourseGradeFactory.USER_BATCH_SIZE))
+            if not students_batch:
+                return
+            CourseEnrollment.bulk_fetch_enrollment_states(students_batch, course.id)
+            for grade_result in CourseGradeFactory().iter(
+                    students_batch, course, collected_block_structure=collected_block_structure,
+            ):
+                yield grade_result
 
     @classmethod
     def _graded_scorable_blocks_to_header(cls, course):
@@ -644,18 +930,32 @@ class ProblemResponses(object):
                 containing the student data which will be included in the
                 final csv, and the features/keys to include in that CSV.
         """
+        student_data_keys = set()
+        student_data = list(cls._iter_student_data(user_id, course_key, usage_key_str, student_data_keys))
+        return student_data, cls._student_data_keys_list(student_data_keys)
+
+    @classmethod
+    def _iter_student_data(cls, user_id, course_key, usage_key_str, student_data_keys):
+        """
+        Generate the problem responses for all problems under the
+        ``problem_location`` root, as for ``_build_student_data``, as they
+        are fetched.
+
+        The keys of the data returned by the xblock report generators are
+        added to the given ``student_data_keys`` set.
+
+        Yields:
+            Dict: the student data of a response
+        """
         usage_key = UsageKey.from_string(usage_key_str).map_into_course(course_key)
         user = get_user_model().objects.get(pk=user_id)
         course_blocks = get_course_blocks(user, usage_key)
 
-        student_data = []
         max_count = settings.FEATURES.get('MAX_PROBLEM_RESPONSES_COUNT')
 
         store = modulestore()
         user_state_client = DjangoXBlockUserStateClient()
 
-        student_data_keys = set()
-
         with store.bulk_operations(course_key):
             for title, path, block_key in cls._build_problem_list(course_blocks, usage_key):
                 # Chapter and sequential blocks are filtered out since they include state
@@ -663,58 +963,195 @@ class ProblemResponses(object):
                 if block_key.block_type in ('sequential', 'chapter'):
                     continue
 
-                block = store.get_item(block_key)
-                generated_report_data = defaultdict(list)
-
-                # Blocks can implement the generate_report_data method to provide their own
-                # human-readable formatting for user state.
-                if hasattr(block, 'generate_report_data'):
-                    try:
-                        user_state_iterator = user_state_client.iter_all_for_block(block_key)
-                        for username, state in block.generate_report_data(user_state_iterator, max_count):
-                            generated_report_data[username].append(state)
-                    except NotImplementedError:
-                        pass
-
-                responses = []
-
-                for response in list_problem_responses(course_key, block_key, max_count):
-                    response['title'] = title
-                    # A human-readable location for the current block
-                    response['location'] = ' > '.join(path)
-                    # A machine-friendly location for the current block
-                    response['block_key'] = str(block_key)
-                    # A block that has a single state per user can contain multiple responses
-                    # within the same state.
-                    user_states = generated_report_data.get(response['username'], [])
-                    if user_states:
-                        # For each response in the block, copy over the basic data like the
-                        # title, location, block_key and state, and add in the responses
-                        for user_state in user_states:
-                            user_response = response.copy()
-                            user_response.update(user_state)
-                            student_data_keys = student_data_keys.union(user_state.keys())
-                            responses.append(user_response)
-                    else:
-                        responses.append(response)
-
-                student_data += responses
+                responses = cls._block_responses(
+                    store.get_item(block_key),
+                    block_key,
+                    title,
+                    path,
+                    list_problem_responses(course_key, block_key, max_count),
+                    user_state_client.iter_all_for_block(block_key),
+                    max_count,
+                    student_data_keys,
+                )
+                for response in responses:
+                    yield response
 
                 if max_count is not None:
                     max_count -= len(responses)
                     if max_count <= 0:
                         break
 
+    @classmethod
+    def _iter_student_data_bulk(cls, user_id, course_key, usage_key_str, student_data_keys):
+        """
+        Generate the problem responses for all problems under the
+        ``problem_location`` root, as for ``_iter_student_data``, but read
+        with a single scan over the course's StudentModules rather than
+        with queries for each problem.
+
+        Responses are generated in (block key, StudentModule id) order, a
+        batch of StudentModules at a time.
+        """
+        usage_key = UsageKey.from_string(usage_key_str).map_into_course(course_key)
+        user = get_user_model().objects.get(pk=user_id)
+        course_blocks = get_course_blocks(user, usage_key)
+
+        max_count = settings.FEATURES.get('MAX_PROBLEM_RESPONSES_COUNT')
+
+        # Map of each problem's block key to its title and path.  Chapter and
+        # sequential blocks are filtered out since they include state which
+        # isn't useful for this report.
+        problems = {
+            block_key: (title, path)
+            for title, path, block_key in cls._build_problem_list(course_blocks, usage_key)
+            if block_key.block_type not in ('sequential', 'chapter')
+        }
+        if usage_key.block_type == 'course':
+            # Every block in the course is under the root, so there is no
+            # need to filter the StudentModules by block.
+            student_modules = cls._iter_student_modules(course_key)
+        else:
+            student_modules = cls._iter_student_modules(course_key, problems.keys())
+
+        store = modulestore()
+        with store.bulk_operations(course_key):
+            for module_state_key, block_rows in groupby(student_modules, key=itemgetter(1)):
+                block_key = module_state_key.map_into_course(course_key)
+                if block_key not in problems:
+                    continue
+                title, path = problems[block_key]
+                block = store.get_item(block_key)
+
+                # Handle a batch of the block's StudentModules at a time, so
+                # that memory use doesn't grow with the number of learners.
+                while True:
+                    rows = list(islice(block_rows, settings.USER_STATE_BATCH_SIZE))
+                    if not rows:
+                        break
+                    states = [
+                        (username, json.loads(state or '{}'), modified) for _, _, username, state, modified in rows
+                    ]
+                    responses = cls._block_responses(
+                        block,
+                        block_key,
+                        title,
+                        path,
+                        [{'username': username, 'state': state} for _, _, username, state, _ in rows[:max_count]],
+                        (
+                            XBlockUserState(username, block_key, state, modified, Scope.user_state)
+                            for username, state, modified in states if state != {}
+                        ),
+                        max_count,
+                        student_data_keys,
+                    )
+                    for response in responses:
+                        yield response
+
+                    if max_count is not None:
+                        max_count -= len(responses)
+                        if max_count <= 0:
+                            return
+
+    @classmethod
+    def _iter_student_modules(cls, course_key, block_keys=None):
+        """
+        Generates (id, module_state_key, username, state, modified) tuples
+        for the StudentModules of the given course, optionally limited to
+        those of the given blocks, ordered by (module_state_key, id).
+
+        The StudentModules are read in batches using keyset pagination,
+        which, unlike offsets, keeps each batch's query cheap however far
+        into the course it is.
+        """
+        student_modules = StudentModule.objects.filter(course_id=course_key)
+        if block_keys is not None:
+            student_modules = student_modules.filter(module_state_key__in=block_keys)
+        student_modules = student_modules.order_by('module_state_key', 'id').values_list(
+            'id', 'module_state_key', 'student__username', 'state', 'modified',
+        )
+
+        batch_size = settings.USER_STATE_BATCH_SIZE
+        batch = list(student_modules[:batch_size])
+        while batch:
+            for row in batch:
+                yield row
+            if len(batch) < batch_size:
+                return
+            last_id, last_module_state_key = batch[-1][:2]
+            batch = list(student_modules.filter(
+                Q(module_state_key__gt=last_module_state_key) |
+                Q(module_state_key=last_module_state_key, id__gt=last_id)
+            )[:batch_size])
+
+    @classmethod
+    def _block_responses(
+        cls, block, block_key, title, path, responses, user_state_iterator, max_count, student_data_keys
+    ):
+        """
+        Returns the given responses to the given block, annotated with the
+        block's title, path and key.  If the block implements
+        generate_report_data, each response is expanded into the
+        human-readable states it generates for the given user states.  The
+        keys of those states are added to the given ``student_data_keys`` set.
+        """
+        generated_report_data = defaultdict(list)
+
+        # Blocks can implement the generate_report_data method to provide their own
+        # human-readable formatting for user state.
+        if hasattr(block, 'generate_report_data'):
+            try:
+                for username, state in block.generate_report_data(user_state_iterator, max_count):
+                    generated_report_data[username].append(state)
+            except NotImplementedError:
+                pass
+
+        block_responses = []
+
+        for response in responses:
+            response['title'] = title
+            # A human-readable location for the current block
+            response['location'] = ' > '.join(path)
+            # A machine-friendly location for the current block
+            response['block_key'] = str(block_key)
+            # A block that has a single state per user can contain multiple responses
+            # within the same state.
+            user_states = generated_report_data.get(response['username'], [])
+            if user_states:
+                # For each response in the block, copy over the basic data like the
+                # title, location, block_key and state, and add in the responses
+                for user_state in user_states:
+                    user_response = response.copy()
+                    user_response.update(user_state)
+                    student_data_keys.update(user_state.keys())
+                    block_responses.append(user_response)
+            else:
+                block_responses.append(response)
+
+        return block_responses
+
+    @staticmethod
+    def _student_data_keys_list(student_data_keys):
+        """
+        Returns the list of features/keys to include in the CSV, given the
+        keys of the data returned by the xblock report generators.
+        """
         # Keep the keys in a useful order, starting with username, title and location,
         # then the columns returned by the xblock report generator in sorted order and
         # finally end with the more machine friendly block_key and state.
-        student_data_keys_list = (
+        return (
             ['username', 'title', 'location'] +
             sorted(student_data_keys) +
             ['block_key', 'state']
         )
 
-        return student_data, student_data_keys_list
+    @staticmethod
+    def _load_student_data(student_data_file, num_rows):
+        """
+        Generates the given number of pickled student data dicts from the
+        given file.
+        """
+        for _ in range(num_rows):
+            yield pickle.load(student_data_file)
 
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -730,31 +1167,42 @@ class ProblemResponses(object):
         task_progress.update_task_state(extra_meta=current_step)
         problem_location = task_input.get('problem_location')
 
-        # Compute result table and format it
-        student_data, student_data_keys = cls._build_student_data(
-            user_id=task_input.get('user_id'),
-            course_key=course_id,
-            usage_key_str=problem_location
-        )
-
-        for data in student_data:
-            for key in student_data_keys:
-                data.setdefault(key, '')
-
-        header, rows = format_dictlist(student_data, student_data_keys)
+        # The CSV's columns depend on all of the student data, so spool the
+        # data to a temporary file as it is computed, rather than holding
+        # it in memory, and then upload it.
+        if WAFFLE_SWITCHES.is_enabled(BULK_PROBLEM_RESPONSES_REPORT):
+            iter_student_data = cls._iter_student_data_bulk
+        else:
+            iter_student_data = cls._iter_student_data
 
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
+        student_data_keys = set()
+        with TemporaryFile() as student_data_file:
+            num_rows = 0
+            for data in iter_student_data(
+                user_id=task_input.get('user_id'),
+                course_key=course_id,
+                usage_key_str=problem_location,
+                student_data_keys=student_data_keys,
+            ):
+                pickle.dump(data, student_data_file, pickle.HIGHEST_PROTOCOL)
+                num_rows += 1
 
-        rows.insert(0, header)
+            task_progress.attempted = task_progress.succeeded = num_rows
+            task_progress.skipped = task_progress.total - task_progress.attempted
 
-        current_step = {'step': 'Uploading CSV'}
-        task_progress.update_task_state(extra_meta=current_step)
+            current_step = {'step': 'Uploading CSV'}
+            task_progress.update_task_state(extra_meta=current_step)
 
-        # Perform the upload
-        problem_location = re.sub(r'[:/]', '_', problem_location)
-        csv_name = 'student_state_from_{}'.format(problem_location)
-        report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+            # Perform the upload
+            header = cls._student_data_keys_list(student_data_keys)
+            student_data_file.seek(0)
+            rows = (
+                [data.get(key, '') for key in header]
+                for data in cls._load_student_data(student_data_file, num_rows)
+            )
+            problem_location = re.sub(r'[:/]', '_', problem_location)
+            csv_name = 'student_state_from_{}'.format(problem_location)
+            report_name = upload_csv_to_report_store(chain([header], rows), csv_name, course_id, start_date)
         current_step = {'step': 'CSV uploaded', 'report_name': report_name}
 
         return task_progress.update_task_state(extra_meta=current_step)
@@ -24,6 +24,8 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows, such as a generator, may be given; the
+            rows are written to the report store as they are produced.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
 
@@ -31,17 +33,45 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         report_name: string - Name of the generated report
     """
     report_store = ReportStore.from_config(config_name)
-    report_name = u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-        course_prefix=course_filename_prefix_generator(course_id),
-        csv_name=csv_name,
-        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-    )
+    report_name = _report_name(csv_name, course_id, timestamp)
 
     report_store.store_rows(course_id, report_name, rows)
     tracker_emit(csv_name)
     return report_name
 
 
+def upload_file_to_report_store(file_obj, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Upload the contents of an already encoded CSV file using ReportStore.
+
+    Arguments:
+        file_obj: file-like object containing the CSV data, ready to be
+            read from the beginning
+        csv_name: Name of the resulting CSV
+        course_id: ID of the course
+
+    Returns:
+        report_name: string - Name of the generated report
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_name = _report_name(csv_name, course_id, timestamp)
+
+    report_store.store(course_id, report_name, file_obj)
+    tracker_emit(csv_name)
+    return report_name
+
+
+def _report_name(csv_name, course_id, timestamp):
+    """
+    Returns the name of the report of the given name for the given course and time.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
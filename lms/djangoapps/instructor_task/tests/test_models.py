@@ -1,6 +1,7 @@
 """
 Tests for instructor_task/models.py.
 """
+import codecs
 import copy
 import time
 from cStringIO import StringIO
@@ -50,6 +51,35 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_store_rows_from_generator(self):
+        """
+        Test that ReportStore.store_rows() writes rows produced by a generator.
+        """
+        report_store = self.create_report_store()
+        rows = ([u'row{}'.format(index), u'ni\xf1o'] for index in range(3))
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+
+        with report_store.open(self.course_id, 'report.csv') as report_file:
+            self.assertEqual(
+                report_file.read(),
+                codecs.BOM_UTF8 + 'row0,ni\xc3\xb1o\r\nrow1,ni\xc3\xb1o\r\nrow2,ni\xc3\xb1o\r\n',
+            )
+
+    def test_store_rows_failure(self):
+        """
+        Test that ReportStore.store_rows() stores nothing if producing the
+        rows fails.
+        """
+        def rows():
+            """Generates a row, and then fails."""
+            yield [u'row0']
+            raise ValueError
+
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', rows())
+        self.assertFalse(report_store.exists(self.course_id, 'report.csv'))
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -114,6 +144,23 @@ class DjangoStorageReportStoreS3TestCase(MockS3Mixin, ReportStoreTestMixin, Test
             connection.create_bucket(settings.GRADES_DOWNLOAD['STORAGE_KWARGS']['bucket'])
             return ReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    def test_store_rows_larger_than_buffer(self):
+        """
+        Test that a report larger than both the S3 file buffer and the
+        spool is stored whole.
+        """
+        report_store = self.create_report_store()
+        rows = [[u'row{}'.format(index), u'x' * 50] for index in range(500)]
+        with patch.object(report_store.storage, 'file_buffer_size', 1024):
+            with patch.object(report_store, 'SPOOL_MAX_SIZE', 2048):
+                report_store.store_rows(self.course_id, 'report.csv', iter(rows))
+
+        with report_store.open(self.course_id, 'report.csv') as report_file:
+            self.assertEqual(
+                report_file.read(),
+                codecs.BOM_UTF8 + ''.join('row{},{}\r\n'.format(index, 'x' * 50) for index in range(500)),
+            )
+
 
 class TestS3ReportStorage(MockS3Mixin, TestCase):
     """
@@ -1,11 +1,12 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
 from mock import Mock, patch
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_item_lists, queue_subtasks_for_query
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -79,3 +80,27 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+    def test_queue_subtasks_for_item_lists(self):
+        """Test queue_subtasks_for_item_lists() queues a subtask for each of the given item lists."""
+
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_type='grade_course',
+        )
+        item_lists = [['a', 'b'], ['c'], ['d', 'e']]
+        mock_create_subtask_fcn = Mock()
+        progress = queue_subtasks_for_item_lists(
+            entry=instructor_task,
+            action_name='action_name',
+            create_subtask_fcn=mock_create_subtask_fcn,
+            item_lists=item_lists,
+            total_num_items=5,
+        )
+
+        self.assertEqual(progress['total'], 5)
+        self.assertEqual([args[0][0] for args in mock_create_subtask_fcn.call_args_list], item_lists)
+        subtask_ids = [args[0][1].task_id for args in mock_create_subtask_fcn.call_args_list]
+        self.assertItemsEqual(subtask_ids, json.loads(instructor_task.subtasks)['status'].keys())
+        self.assertEqual(mock_create_subtask_fcn.return_value.apply_async.call_count, 3)
@@ -9,16 +9,19 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 from __future__ import unicode_literals
 
+import json
 import os
 import shutil
 import tempfile
 import urllib
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 import ddt
 import unicodecsv
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from celery.states import FAILURE, SUCCESS
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
 from courseware.tests.factories import InstructorFactory
@@ -66,8 +69,11 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_students_csv,
 )
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    BULK_PROBLEM_RESPONSES_REPORT,
     ENROLLED_IN_COURSE,
     NOT_ENROLLED_IN_COURSE,
+    SHARDED_COURSE_GRADE_REPORT,
+    WAFFLE_SWITCHES,
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
@@ -77,6 +83,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data,
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -89,7 +96,7 @@ from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 from openedx.core.djangoapps.credit.tests.factories import CreditCourseFactory
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
-from ..models import ReportStore
+from ..models import InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -414,7 +421,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
 
         RequestCache.clear_all_namespaces()
 
-        expected_query_count = 49
+        expected_query_count = 45
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with check_mongo_calls(mongo_count):
                 with self.assertNumQueries(expected_query_count):
@@ -443,6 +450,137 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         )
 
 
+@patch.object(CourseGradeReport, 'USERS_PER_SHARD', 2)
+class TestShardedInstructorGradeReport(InstructorGradeReportTestCase):
+    """
+    Tests that CSV grade report generation works when sharded across subtasks.
+    """
+    def setUp(self):
+        super(TestShardedInstructorGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+        self.usernames = ['student{}'.format(index) for index in range(5)]
+        for username in self.usernames:
+            self.create_student(username)
+        self.entry = InstructorTaskFactory.create(
+            task_type='grade_course',
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+        )
+
+    def _generate(self):
+        """
+        Generates a sharded grade report for the InstructorTask entry and
+        returns the updated entry.
+        """
+        with WAFFLE_SWITCHES.override(SHARDED_COURSE_GRADE_REPORT, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                CourseGradeReport.generate(None, self.entry.id, self.course.id, None, 'graded')
+        return InstructorTask.objects.get(id=self.entry.id)
+
+    def _shard_csvs(self):
+        """
+        Returns the names of the partial CSVs of the shards left in the report store.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        shard_directory = report_store.path_to(self.course.id, CourseGradeReport.SHARD_DIRECTORY)
+        return sorted(filename for _, _, filenames in os.walk(shard_directory) for filename in filenames)
+
+    def _verify_shard_csvs_deleted(self):
+        """
+        Verifies that no partial CSVs of the shards are left in the report store.
+        """
+        self.assertEqual(self._shard_csvs(), [])
+
+    def test_sharded_report(self):
+        entry = self._generate()
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output)
+        )
+        subtasks = json.loads(entry.subtasks)
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 3, 'failed': 0}, subtasks)
+        self.assertEqual(
+            sorted(status['succeeded'] for status in subtasks['status'].values()),
+            [1, 2, 2],
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{'Username': username} for username in self.usernames],
+            ignore_other_columns=True,
+        )
+        self._verify_shard_csvs_deleted()
+
+    def test_matches_unsharded_report(self):
+        self._generate()
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        with report_store.open(self.course.id, report_store.links_for(self.course.id)[0][0]) as csv_file:
+            sharded_report = csv_file.read().splitlines()
+        shutil.rmtree(report_store.path_to(self.course.id))
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        with report_store.open(self.course.id, report_store.links_for(self.course.id)[0][0]) as csv_file:
+            unsharded_report = csv_file.read().splitlines()
+        self.assertEqual(sharded_report[0], unsharded_report[0])
+        self.assertEqual(sorted(sharded_report[1:]), sorted(unsharded_report[1:]))
+
+    def test_shard_failure(self):
+        original_rows_for_users = CourseGradeReport._rows_for_users  # pylint: disable=protected-access
+
+        def rows_for_users(report, context, users):
+            """Fails to grade the shard that contains the first student."""
+            if any(user.username == self.usernames[0] for user in users):
+                raise TypeError('Cannot grade shard')
+            return original_rows_for_users(report, context, users)
+
+        with patch.object(CourseGradeReport, '_rows_for_users', rows_for_users):
+            entry = self._generate()
+
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['message'], 'Grade report shards 0 failed')
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 2, 'failed': 1}, json.loads(entry.subtasks))
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+        self.assertEqual(self._shard_csvs(), ['grade_report_1.csv', 'grade_report_2.csv'])
+
+    def test_merge_failure(self):
+        with patch.object(CourseGradeReport, '_upload_merged', side_effect=IOError('Cannot upload')):
+            entry = self._generate()
+
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['message'], 'Cannot upload')
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 3, 'failed': 0}, json.loads(entry.subtasks))
+        self.assertEqual(
+            self._shard_csvs(),
+            ['grade_report_0.csv', 'grade_report_1.csv', 'grade_report_2.csv'],
+        )
+
+    def test_not_succeeded_before_merge(self):
+        original_merge_shards = CourseGradeReport.merge_shards
+
+        def merge_shards(report, context, entry_id, report_timestamp):
+            """Checks the state of the task before merging."""
+            self.assertNotEqual(InstructorTask.objects.get(id=entry_id).task_state, SUCCESS)
+            return original_merge_shards(report, context, entry_id, report_timestamp)
+
+        with patch.object(CourseGradeReport, 'merge_shards', merge_shards):
+            entry = self._generate()
+        self.assertEqual(entry.task_state, SUCCESS)
+
+    def test_single_shard_is_not_sharded(self):
+        with patch.object(CourseGradeReport, 'USERS_PER_SHARD', 10):
+            entry = self._generate()
+        self.assertEqual(entry.subtasks, '')
+        self.verify_rows_in_csv(
+            [{'Username': username} for username in self.usernames],
+            verify_order=False,
+            ignore_other_columns=True,
+        )
+
+
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
 
@@ -481,6 +619,7 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
 
 
 # pylint: disable=protected-access
+@ddt.ddt
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
     Tests that generation of CSV files listing student answers to a
@@ -637,6 +776,76 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         mock_generate_report_data.assert_called_with(ANY, ANY)
         mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
 
+    def _iter_student_data(self, bulk, usage_key_str):
+        """
+        Returns the problem responses under the given root, generated by
+        either the bulk or the per-problem read path, in a canonical order.
+        """
+        iter_student_data = ProblemResponses._iter_student_data_bulk if bulk else ProblemResponses._iter_student_data
+        student_data_keys = set()
+        student_data = list(iter_student_data(
+            user_id=self.instructor.id,
+            course_key=self.course.id,
+            usage_key_str=usage_key_str,
+            student_data_keys=student_data_keys,
+        ))
+        return sorted(student_data, key=lambda data: sorted(data.items())), student_data_keys
+
+    @ddt.data(True, False)
+    @override_settings(USER_STATE_BATCH_SIZE=2)
+    def test_bulk_student_data(self, course_root):
+        """
+        Ensure that the bulk read path generates the same student data as
+        reading the responses of each problem.
+        """
+        problems = [self.define_option_problem('Problem{}'.format(index)) for index in range(3)]
+        for ctr in range(5):
+            student = self.create_student('student{}'.format(ctr))
+            for problem in problems[:ctr]:
+                self.submit_student_answer(student.username, problem.display_name, ['Option 1'])
+
+        usage_key_str = str(self.course.location if course_root else problems[1].location)
+        student_data, student_data_keys = self._iter_student_data(False, usage_key_str)
+        self.assertEqual(len(student_data), 9 if course_root else 3)
+        self.assertEqual(self._iter_student_data(True, usage_key_str), (student_data, student_data_keys))
+
+    @patch.dict('django.conf.settings.FEATURES', {'MAX_PROBLEM_RESPONSES_COUNT': 4})
+    @override_settings(USER_STATE_BATCH_SIZE=3)
+    def test_bulk_student_data_limit(self):
+        """
+        Ensure that the bulk read path respects the global setting for
+        maximum responses to return in a report.
+        """
+        self.define_option_problem(u'Problem1')
+        for ctr in range(5):
+            student = self.create_student('student{}'.format(ctr))
+            self.submit_student_answer(student.username, u'Problem1', ['Option 1'])
+
+        student_data, _ = self._iter_student_data(True, str(self.course.location))
+        self.assertEquals(len(student_data), 4)
+
+    def test_bulk_success(self):
+        self.define_option_problem(u'Problem1')
+        self.submit_student_answer(self.student.username, u'Problem1', ['Option 1'])
+        task_input = {
+            'problem_location': str(self.course.location),
+            'user_id': self.instructor.id
+        }
+        with WAFFLE_SWITCHES.override(BULK_PROBLEM_RESPONSES_REPORT, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                result = ProblemResponses.generate(None, None, self.course.id, task_input, 'calculated')
+
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
+        self.verify_rows_in_csv(
+            [{
+                'username': 'student',
+                'title': 'Problem1',
+                'location': 'test_course > Section > Subsection > Problem1',
+                'Answer': 'Option 1',
+            }],
+            ignore_other_columns=True,
+        )
+
     def test_success(self):
         task_input = {
             'problem_location': str(self.course.location),
@@ -644,15 +853,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         }
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
-                       '.ProblemResponses._build_student_data') as mock_build_student_data:
-                mock_build_student_data.return_value = (
-                    [
-                        {'username': 'user0', 'state': u'state0'},
-                        {'username': 'user1', 'state': u'state1'},
-                        {'username': 'user2', 'state': u'state2'},
-                    ],
-                    ['username', 'state']
-                )
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter([
+                    {'username': 'user0', 'state': u'state0'},
+                    {'username': 'user1', 'state': u'state1'},
+                    {'username': 'user2', 'state': u'state2'},
+                ])
                 result = ProblemResponses.generate(
                     None, None, self.course.id, task_input, 'calculated'
                 )
@@ -662,6 +868,11 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         self.assertEquals(len(links), 1)
         self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
         self.assertIn("report_name", result)
+        self.verify_rows_in_csv([
+            {'username': 'user0', 'title': '', 'location': '', 'block_key': '', 'state': 'state0'},
+            {'username': 'user1', 'title': '', 'location': '', 'block_key': '', 'state': 'state1'},
+            {'username': 'user2', 'title': '', 'location': '', 'block_key': '', 'state': 'state2'},
+        ])
 
 
 @ddt.ddt
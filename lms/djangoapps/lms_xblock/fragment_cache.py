@@ -0,0 +1,155 @@
+"""
+A cache of the rendered views of XBlocks that don't depend on the user.
+
+Every anonymous visitor to a public course sees the same public view of its
+blocks, so rendering it again for each of them repeats the same work.  Those
+views are cached in the Django cache named in the XBLOCK_FRAGMENT_CACHE
+setting, along with the other views of blocks which have no per-user state.
+
+Fragments are keyed by the block, the version of the course structure it was
+read from, the view, the rendering context, the language and the theme.
+Publishing a course gives it a new version, so the fragments cached for the
+old version are no longer found, and expire.  Blocks from modulestores which
+don't version their courses aren't cached.  Views can also change as dates
+pass, such as when a section is released, so fragments are only kept for
+TIMEOUT seconds.
+
+Only the outermost view rendered is cached, not the views of its children
+that it renders along the way.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import translation
+from edx_django_utils import monitoring as monitoring_utils
+from six import text_type
+from web_fragments.fragment import Fragment
+from xblock.fields import UserScope
+
+from openedx.core.djangoapps.theming.helpers import get_current_theme
+from xmodule.x_module import PUBLIC_VIEW
+
+# Stands in for the request token in cached fragments, which is different for every request.
+REQUEST_TOKEN_PLACEHOLDER = u'__xblock_request_token__'
+
+# Whether a cached view is being rendered in this thread, so the views of its children aren't cached too.
+_RENDERING = threading.local()
+
+
+class XBlockFragmentCache(object):
+    """
+    Caches the fragments rendered for XBlock views in a Django cache.
+    """
+    def __init__(self, cache, timeout, max_entry_size):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_entry_size = max_entry_size
+
+    @staticmethod
+    def is_cacheable(user, block, view_name):
+        """
+        Return whether the `view_name` view of `block` rendered for `user` can be cached.
+        """
+        if user is None or user.is_authenticated:
+            return False
+        if getattr(block, 'course_version', None) is None:
+            return False
+        return view_name == PUBLIC_VIEW or not any(
+            field.scope.user != UserScope.NONE for field in block.fields.itervalues()
+        )
+
+    @staticmethod
+    def cache_key(block, view_name, context):
+        """
+        Return the key of the fragment rendered for the `view_name` view of
+        `block` with `context`, or None if `context` can't be part of a key.
+        """
+        try:
+            # Values that aren't JSON are keyed by their repr, so objects
+            # without a stable repr just miss the cache.
+            context_json = json.dumps(context, sort_keys=True, default=repr)
+        except (TypeError, ValueError):
+            return None
+        theme = get_current_theme()
+        parts = (
+            text_type(block.scope_ids.usage_id),
+            text_type(block.course_version),
+            view_name,
+            context_json,
+            translation.get_language() or u'',
+            theme.theme_dir_name if theme else u'',
+        )
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return u'xblock_fragment.{}'.format(digest.hexdigest())
+
+    def render(self, block, view_name, context, render, request_token):
+        """
+        Return the fragment for the `view_name` view of `block` with `context`,
+        from the cache or else by calling `render(block, view_name, context)`.
+        """
+        if getattr(_RENDERING, 'active', False):
+            return render(block, view_name, context)
+        key = self.cache_key(block, view_name, context)
+        if key is None:
+            return render(block, view_name, context)
+
+        fragment = self._get(key, request_token)
+        if fragment is not None:
+            monitoring_utils.increment('xblock_fragment_cache.hits')
+            return fragment
+        monitoring_utils.increment('xblock_fragment_cache.misses')
+
+        _RENDERING.active = True
+        try:
+            fragment = render(block, view_name, context)
+        finally:
+            _RENDERING.active = False
+        self._set(key, fragment, request_token)
+        return fragment
+
+    def _get(self, key, request_token):
+        """
+        Return the fragment cached under `key`, for the request with `request_token`, or None.
+        """
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        if request_token:
+            data = data.replace(REQUEST_TOKEN_PLACEHOLDER, request_token)
+        return Fragment.from_dict(json.loads(data))
+
+    def _set(self, key, fragment, request_token):
+        """
+        Cache `fragment`, rendered for the request with `request_token`, under `key`.
+        """
+        try:
+            data = json.dumps(fragment.to_dict())
+        except (TypeError, ValueError):
+            return
+        if request_token:
+            data = data.replace(request_token, REQUEST_TOKEN_PLACEHOLDER)
+        if len(data) > self.max_entry_size:
+            monitoring_utils.increment('xblock_fragment_cache.too_large')
+            return
+        self.cache.set(key, data, self.timeout)
+
+
+def get_xblock_fragment_cache():
+    """
+    Return the XBlockFragmentCache configured by the XBLOCK_FRAGMENT_CACHE setting, or None if it's disabled.
+    """
+    config = getattr(settings, 'XBLOCK_FRAGMENT_CACHE', {})
+    timeout = config.get('TIMEOUT', 0)
+    if not timeout:
+        return None
+    return XBlockFragmentCache(
+        caches[config.get('CACHE_ALIAS', 'default')],
+        timeout,
+        config.get('MAX_ENTRY_SIZE', 512 * 1024),
+    )
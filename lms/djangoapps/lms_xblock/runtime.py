@@ -9,6 +9,7 @@ import xblock.reference.plugins
 
 from badges.service import BadgingService
 from badges.utils import badges_enabled
+from lms.djangoapps.lms_xblock.fragment_cache import XBlockFragmentCache, get_xblock_fragment_cache
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
 from openedx.core.djangoapps.user_api.course_tag import api as user_course_tag_api
 from openedx.core.lib.url_utils import quote_slashes
@@ -152,8 +153,22 @@ class LmsModuleSystem(ModuleSystem):  # pylint: disable=abstract-method
         if badges_enabled():
             services['badging'] = BadgingService(course_id=kwargs.get('course_id'), modulestore=store)
         self.request_token = kwargs.pop('request_token', None)
+        self._user = user
+        self.fragment_cache = get_xblock_fragment_cache()
         super(LmsModuleSystem, self).__init__(**kwargs)
 
+    def render(self, block, view_name, context=None):
+        """
+        Render the `view_name` view of `block`, using the fragment cache for
+        views that are the same for every anonymous user.
+
+        See :method:`xblock.runtime:Runtime.render`
+        """
+        render = super(LmsModuleSystem, self).render
+        if self.fragment_cache is None or not XBlockFragmentCache.is_cacheable(self._user, block, view_name):
+            return render(block, view_name, context)
+        return self.fragment_cache.render(block, view_name, context, render, self.request_token)
+
     def handler_url(self, *args, **kwargs):
         """
         Implement the XBlock runtime handler_url interface.
@@ -0,0 +1,134 @@
+"""
+Tests of the cache of rendered XBlock views
+"""
+from bson.objectid import ObjectId
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.utils import translation
+from mock import Mock
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+from web_fragments.fragment import Fragment
+from xblock.fields import Integer, Scope, ScopeIds, String
+
+from lms.djangoapps.lms_xblock.fragment_cache import (
+    REQUEST_TOKEN_PLACEHOLDER,
+    XBlockFragmentCache,
+    get_xblock_fragment_cache
+)
+from xmodule.x_module import PUBLIC_VIEW, STUDENT_VIEW
+
+
+def make_block(user_state=False, course_version=None):
+    """
+    Return a mock block, with a user_state field if `user_state`.
+    """
+    usage_key = BlockUsageLocator(CourseLocator('org', 'course', 'run'), 'html', 'block')
+    fields = {'display_name': String(scope=Scope.settings)}
+    if user_state:
+        fields['position'] = Integer(scope=Scope.user_state)
+    return Mock(
+        scope_ids=ScopeIds(None, 'html', usage_key, usage_key),
+        course_version=course_version or ObjectId(),
+        fields=fields,
+    )
+
+
+class TestXBlockFragmentCache(TestCase):
+    """
+    Test caching the fragments rendered for XBlock views.
+    """
+    def setUp(self):
+        super(TestXBlockFragmentCache, self).setUp()
+        self.fragment_cache = XBlockFragmentCache(LocMemCache('fragments', {}), 60, 10000)
+        self.block = make_block()
+        self.render = Mock(side_effect=self._render)
+
+    @staticmethod
+    def _render(block, view_name, context):
+        """
+        Render a fragment holding the request token, with a resource.
+        """
+        fragment = Fragment(u'<div data-request-token="token1">{} {}</div>'.format(view_name, context['position']))
+        fragment.add_javascript_url('/static/block.js')
+        fragment.initialize_js('Block', {'usage_id': unicode(block.scope_ids.usage_id)})
+        return fragment
+
+    def test_is_cacheable(self):
+        anonymous, user = AnonymousUser(), Mock(is_authenticated=True)
+        self.assertTrue(XBlockFragmentCache.is_cacheable(anonymous, self.block, PUBLIC_VIEW))
+        self.assertTrue(XBlockFragmentCache.is_cacheable(anonymous, self.block, STUDENT_VIEW))
+        self.assertTrue(XBlockFragmentCache.is_cacheable(anonymous, make_block(user_state=True), PUBLIC_VIEW))
+        self.assertFalse(XBlockFragmentCache.is_cacheable(anonymous, make_block(user_state=True), STUDENT_VIEW))
+        self.assertFalse(XBlockFragmentCache.is_cacheable(user, self.block, PUBLIC_VIEW))
+        self.assertFalse(XBlockFragmentCache.is_cacheable(None, self.block, PUBLIC_VIEW))
+
+        unversioned = make_block()
+        unversioned.course_version = None
+        self.assertFalse(XBlockFragmentCache.is_cacheable(anonymous, unversioned, PUBLIC_VIEW))
+
+    def test_render(self):
+        first = self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, self.render, 'token1')
+        second = self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, self.render, 'token2')
+
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(second.content, u'<div data-request-token="token2">public_view 1</div>')
+        self.assertEqual(second.resources, first.resources)
+        self.assertEqual(second.js_init_fn, 'Block')
+        self.assertEqual(second.json_init_args, first.json_init_args)
+
+    def test_cache_key(self):
+        context = {'position': 1}
+        key = XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, context)
+        self.assertEqual(XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, {'position': 1}), key)
+
+        self.assertNotEqual(XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, {'position': 2}), key)
+        self.assertNotEqual(XBlockFragmentCache.cache_key(self.block, STUDENT_VIEW, context), key)
+        self.assertNotEqual(XBlockFragmentCache.cache_key(make_block(), PUBLIC_VIEW, context), key)
+        with translation.override('es'):
+            self.assertNotEqual(XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, context), key)
+        self.assertIsNone(XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, {'data': b'\xff'}))
+
+    def test_children_not_cached(self):
+        child = make_block()
+
+        def render_parent(block, view_name, context):
+            """
+            Render the child while rendering the parent.
+            """
+            self.fragment_cache.render(child, view_name, context, self.render, 'token1')
+            return self._render(block, view_name, context)
+
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, render_parent, 'token1')
+        self.fragment_cache.render(child, PUBLIC_VIEW, {'position': 1}, self.render, 'token1')
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_too_large(self):
+        self.fragment_cache.max_entry_size = 10
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, self.render, 'token1')
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, self.render, 'token1')
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_not_json(self):
+        fragment = Fragment(u'content')
+        fragment.initialize_js('Block', {'value': object()})
+        self.render.side_effect = None
+        self.render.return_value = fragment
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {}, self.render, 'token1')
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {}, self.render, 'token1')
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_placeholder_stored(self):
+        self.fragment_cache.render(self.block, PUBLIC_VIEW, {'position': 1}, self.render, 'token1')
+        key = XBlockFragmentCache.cache_key(self.block, PUBLIC_VIEW, {'position': 1})
+        data = self.fragment_cache.cache.get(key)
+        self.assertIn(REQUEST_TOKEN_PLACEHOLDER, data)
+        self.assertNotIn('token1', data)
+
+    @override_settings(XBLOCK_FRAGMENT_CACHE={'TIMEOUT': 0})
+    def test_disabled(self):
+        self.assertIsNone(get_xblock_fragment_cache())
+
+    @override_settings(XBLOCK_FRAGMENT_CACHE={'CACHE_ALIAS': 'default', 'TIMEOUT': 30})
+    def test_enabled(self):
+        self.assertEqual(get_xblock_fragment_cache().timeout, 30)
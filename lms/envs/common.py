@@ -901,6 +901,30 @@ MODULESTORE = {
     }
 }
 
+# Decoded course structures are kept in a least-recently-used cache in each
+# process, bounded by the total number of blocks in the cached structures.
+# 0 disables it; deployments enable it by setting a size, e.g. 20000.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS = 0
+
+# How course structures are encoded in the 'course_structure_cache'. The
+# serializer is 'pickle' or 'compact' (msgpack, with interned block keys), and
+# the compressor 'zlib', 'lz4' (needs the lz4 package) or 'none'. Structures
+# written with any of these can be read whatever they're set to, but processes
+# running older code can only read 'pickle' and 'zlib'.
+COURSE_STRUCTURE_CACHE_SERIALIZER = 'compact'
+COURSE_STRUCTURE_CACHE_COMPRESSOR = 'zlib'
+
+# The views of XBlocks rendered for anonymous users, such as the public view of
+# a public course, are cached in the Django cache named by CACHE_ALIAS.
+#   TIMEOUT: seconds to keep each rendered view; 0 disables the cache.  Views
+#     can change when dates pass, so this is also how late a release can show.
+#   MAX_ENTRY_SIZE: views larger than this many bytes (as JSON) aren't cached.
+XBLOCK_FRAGMENT_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'MAX_ENTRY_SIZE': 512 * 1024,
+}
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -926,6 +950,18 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Results of sandboxed problem code are cached in a least-recently-used cache
+# in each process, in front of the Django cache named by CACHE_ALIAS.
+#   LOCAL_SIZE: number of results kept in each process.
+#   MAX_ENTRY_SIZE: results larger than this many bytes (as JSON) aren't cached.
+#   TIMEOUT: seconds to keep results in the shared cache; None for the cache's default.
+SAFE_EXEC_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'LOCAL_SIZE': 500,
+    'MAX_ENTRY_SIZE': 100 * 1024,
+    'TIMEOUT': None,
+}
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1927,6 +1963,12 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total number of blocks of collected block structures to
+    # keep deserialized in each process.  Requires storage backing to be
+    # enabled, since entries are keyed by the version of the stored data.
+    # Set to 0 to disable the per-process cache.
+    PROCESS_CACHE_MAX_BLOCKS=0,
 )
 
 ################################ Bulk Email ###################################
@@ -2653,6 +2695,17 @@ VIDEO_TRANSCRIPTS_SETTINGS = dict(
     DIRECTORY_PREFIX='video-transcripts/',
 )
 
+# Transcripts converted between formats and speeds for download and translation
+# are cached in the Django cache named by CACHE_ALIAS, keyed by a hash of the
+# transcript they were converted from.
+#   TIMEOUT: seconds to keep each converted transcript; 0 disables the cache.
+#   MAX_ENTRY_SIZE: converted transcripts larger than this many bytes aren't cached.
+TRANSCRIPT_CONVERSION_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 24 * 60 * 60,
+    'MAX_ENTRY_SIZE': 512 * 1024,
+}
+
 
 # Source:
 # http://loc.gov/standards/iso639-2/ISO-639-2_utf-8.txt according to http://en.wikipedia.org/wiki/ISO_639-1
@@ -389,6 +389,8 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_CACHE.update(ENV_TOKENS.get('SAFE_EXEC_CACHE', {}))
+XBLOCK_FRAGMENT_CACHE.update(ENV_TOKENS.get('XBLOCK_FRAGMENT_CACHE', {}))
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -556,6 +558,15 @@ XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
 # Get the MODULESTORE from auth.json, but if it doesn't exist,
 # use the one from common.py
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS', COURSE_STRUCTURE_LOCAL_CACHE_MAX_BLOCKS
+)
+COURSE_STRUCTURE_CACHE_SERIALIZER = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_SERIALIZER', COURSE_STRUCTURE_CACHE_SERIALIZER
+)
+COURSE_STRUCTURE_CACHE_COMPRESSOR = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_COMPRESSOR', COURSE_STRUCTURE_CACHE_COMPRESSOR
+)
 CONTENTSTORE = AUTH_TOKENS.get('CONTENTSTORE', CONTENTSTORE)
 DOC_STORE_CONFIG = AUTH_TOKENS.get('DOC_STORE_CONFIG', DOC_STORE_CONFIG)
 MONGODB_LOG = AUTH_TOKENS.get('MONGODB_LOG', {})
@@ -806,6 +817,7 @@ VIDEO_IMAGE_SETTINGS = ENV_TOKENS.get('VIDEO_IMAGE_SETTINGS', VIDEO_IMAGE_SETTIN
 
 ##### VIDEO TRANSCRIPTS STORAGE #####
 VIDEO_TRANSCRIPTS_SETTINGS = ENV_TOKENS.get('VIDEO_TRANSCRIPTS_SETTINGS', VIDEO_TRANSCRIPTS_SETTINGS)
+TRANSCRIPT_CONVERSION_CACHE.update(ENV_TOKENS.get('TRANSCRIPT_CONVERSION_CACHE', {}))
 
 ##### ECOMMERCE API CONFIGURATION SETTINGS #####
 ECOMMERCE_PUBLIC_URL_ROOT = ENV_TOKENS.get('ECOMMERCE_PUBLIC_URL_ROOT', ECOMMERCE_PUBLIC_URL_ROOT)
@@ -5,6 +5,7 @@ from django.core.cache import cache
 from xmodule.modulestore.django import modulestore
 
 from .manager import BlockStructureManager
+from .store import BlockStructureStore
 
 
 def get_course_in_cache(course_key):
@@ -43,6 +44,15 @@ def clear_course_from_cache(course_key):
     get_block_structure_manager(course_key).clear()
 
 
+def evict_course_from_process_cache(course_key):
+    """
+    Removes the block structure for the given course_key from this
+    process' cache of collected block structures, without affecting
+    the shared cache or storage.
+    """
+    BlockStructureStore.evict_from_process_cache(modulestore().make_course_usage_key(course_key))
+
+
 def get_block_structure_manager(course_key):
     """
     Returns the manager for managing Block Structures for the given course.
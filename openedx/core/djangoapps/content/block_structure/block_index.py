@@ -0,0 +1,164 @@
+"""
+Module for indexing the blocks of a block structure so that sets of
+blocks can be represented as bitsets.
+
+Each block that is reachable from the root is assigned an integer
+index in topological order.  A set of blocks is then a python int in
+which bit i is set if and only if the block with index i is in the set.
+Combining sets of blocks (union, intersection, difference) is a single
+bitwise operation over the whole structure rather than a python loop
+over its blocks.
+"""
+from itertools import compress
+
+
+class BlockIndex(object):
+    """
+    Topologically ordered index of the blocks in a block structure.
+
+    The index is a snapshot; it is not updated if the block structure's
+    relations are later modified.
+    """
+    def __init__(self, block_structure):
+        # List of the usage keys of the indexed blocks, in topological
+        # order.  The root block, if present, has index 0.
+        # list [UsageKey]
+        self.block_keys = self._topological_sort(block_structure)
+
+        # Map of each indexed block's usage key to its index.
+        # dict {UsageKey: int}
+        self._indices = {block_key: index for index, block_key in enumerate(self.block_keys)}
+
+        # For each indexed block, the indices of its parents.  Since
+        # the blocks are in topological order, a block's parents
+        # always have smaller indices than the block itself.
+        # list [list [int]]
+        self.parent_indices = [
+            [self._indices[parent_key] for parent_key in block_structure.get_parents(block_key)]
+            for block_key in self.block_keys
+        ]
+
+        # Bitset with a bit set for every indexed block.
+        self.all_blocks_mask = (1 << len(self.block_keys)) - 1
+
+    def __len__(self):
+        return len(self.block_keys)
+
+    def removal_masks(self, removal_filters):
+        """
+        Evaluates the given removal filters for the indexed blocks, in
+        topological order, and returns for each filter a bitset of the
+        blocks that it removes.
+
+        As with a combined filter traversal, a filter's removal
+        condition is not evaluated for a block that an earlier filter
+        removes, or for a block whose parents have all been removed
+        along with their descendants.
+
+        Arguments:
+            removal_filters ([(removal_condition, keep_descendants)]) -
+                Each filter's removal condition, a function that takes
+                a block's usage key and returns whether to remove it,
+                and whether the descendants of the blocks it removes
+                are kept (see BlockStructureBlockData.remove_block).
+        """
+        removed_flags = [[False] * len(self.block_keys) for _ in removal_filters]
+
+        # Whether each block is still connected to the root, as a
+        # block that is removed with keep_descendants still connects
+        # its children.
+        connected = [False] * len(self.block_keys)
+
+        for index, block_key in enumerate(self.block_keys):
+            if index and not self._any_set(connected, self.parent_indices[index]):
+                continue
+            connected[index] = True
+            for filter_index, (removal_condition, keep_descendants) in enumerate(removal_filters):
+                if removal_condition(block_key):
+                    removed_flags[filter_index][index] = True
+                    connected[index] = keep_descendants
+                    break
+
+        return [self._from_flags(flags) for flags in removed_flags]
+
+    def reachable_mask(self, removed_mask):
+        """
+        Returns a bitset of the blocks that are still reachable from
+        the root when the blocks in the given removed_mask, and hence
+        all blocks that are only reachable through them, are removed.
+        """
+        removed = self._to_flags(removed_mask)
+        reachable = [False] * len(self.block_keys)
+        for index, parent_indices in enumerate(self.parent_indices):
+            if not removed[index] and (index == 0 or self._any_set(reachable, parent_indices)):
+                reachable[index] = True
+        return self._from_flags(reachable)
+
+    def block_keys_in_mask(self, mask):
+        """
+        Returns the usage keys of the blocks in the given bitset, in
+        topological order.
+        """
+        return list(compress(self.block_keys, self._to_flags(mask)))
+
+    @staticmethod
+    def _topological_sort(block_structure):
+        """
+        Returns the usage keys of the blocks reachable from the root of
+        the given block structure, in topological order.
+
+        As with block_structure.topological_traversal, a block is only
+        included once all of its parents are.  Counting each block's
+        unvisited parents avoids re-checking all of them every time the
+        block is encountered, which matters for large structures.
+        """
+        root_key = block_structure.root_block_usage_key
+        if root_key not in block_structure:
+            return []
+
+        sorted_keys = []
+        num_unvisited_parents = {}
+        stack = [root_key]
+        while stack:
+            block_key = stack.pop()
+            sorted_keys.append(block_key)
+            for child_key in reversed(block_structure.get_children(block_key)):
+                if child_key not in num_unvisited_parents:
+                    num_unvisited_parents[child_key] = len(block_structure.get_parents(child_key))
+                num_unvisited_parents[child_key] -= 1
+                if num_unvisited_parents[child_key] == 0:
+                    stack.append(child_key)
+        return sorted_keys
+
+    def _to_flags(self, mask):
+        """
+        Returns a list of booleans, one per indexed block, for the
+        given bitset.
+        """
+        # Converting through the binary string representation is linear
+        # in the number of blocks, whereas testing each bit with a
+        # shift would be quadratic for large structures.
+        num_blocks = len(self.block_keys)
+        bits = bin(mask & self.all_blocks_mask)[:1:-1]
+        return [bit == '1' for bit in bits] + [False] * (num_blocks - len(bits))
+
+    @staticmethod
+    def _any_set(flags, indices):
+        """
+        Returns whether any of the given flags is set.
+        """
+        # An explicit loop is faster than any() with a generator for
+        # the short lists of parents that blocks typically have.
+        for index in indices:
+            if flags[index]:
+                return True
+        return False
+
+    @staticmethod
+    def _from_flags(flags):
+        """
+        Returns a bitset for the given iterable of booleans, in which
+        the first boolean corresponds to the least significant bit.
+        """
+        bits = ''.join('1' if flag else '0' for flag in flags)
+        return int(bits[::-1], 2) if bits else 0
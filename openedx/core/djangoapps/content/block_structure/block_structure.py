@@ -9,11 +9,11 @@ The following internal data structures are implemented:
     _BlockData - Data structure for a single block's data.
 """
 from copy import deepcopy
-from functools import partial
 from logging import getLogger
 
 from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
 
+from .block_index import BlockIndex
 from .exceptions import TransformerException
 
 
@@ -65,6 +65,13 @@ class BlockStructure(object):
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
+        # Single-item list holding the BlockIndex of this structure, if
+        # computed.  The list is shared with copies of this structure
+        # until either of them is modified, so the index is computed
+        # only once for all copies of a collected structure.
+        # list [BlockIndex or None]
+        self._block_index_holder = [None]
+
     def __iter__(self):
         """
         The default iterator for a block structure is get_block_keys()
@@ -121,6 +128,7 @@ class BlockStructure(object):
         """
         self.root_block_usage_key = usage_key
         self._block_relations[usage_key].parents = []
+        self._clear_block_index()
 
     def __contains__(self, usage_key):
         """
@@ -198,13 +206,29 @@ class BlockStructure(object):
             filter_func=filter_func,
         )
 
+    def get_block_index(self):
+        """
+        Returns a BlockIndex of the blocks in this block structure.
+        """
+        if self._block_index_holder[0] is None:
+            self._block_index_holder[0] = BlockIndex(self)
+        return self._block_index_holder[0]
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
+    def _clear_block_index(self):
+        """
+        Discards this block structure's BlockIndex, which no longer
+        matches its relations, without affecting any copies.
+        """
+        self._block_index_holder = [None]
+
     def _prune_unreachable(self):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
+        self._clear_block_index()
 
         # Create a new block relations map to store only those blocks
         # that are still linked
@@ -237,6 +261,7 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
+        self._clear_block_index()
         self._add_to_relations(self._block_relations, parent_key, child_key)
 
     @staticmethod
@@ -392,6 +417,36 @@ class BlockData(FieldData):
         self.transformer_data = TransformerDataMap()
 
 
+def retain_all_blocks(block_key):  # pylint: disable=unused-argument
+    """
+    Filter function, as returned by create_universal_filter, that
+    retains every block.
+    """
+    return True
+
+
+class RemovalFilter(object):
+    """
+    Filter function, as returned by create_removal_filter, that removes
+    the blocks satisfying its removal_condition.
+
+    The removal_condition is exposed so that removal filters can also
+    be evaluated over a whole BlockIndex at once and combined as
+    bitsets, rather than applied one block at a time.
+    """
+    def __init__(self, block_structure, removal_condition, keep_descendants=False):
+        self.block_structure = block_structure
+        self.removal_condition = removal_condition
+        self.keep_descendants = keep_descendants
+
+    def __call__(self, block_key):
+        return self.block_structure.retain_or_remove(
+            block_key,
+            removal_condition=self.removal_condition,
+            keep_descendants=self.keep_descendants,
+        )
+
+
 class BlockStructureBlockData(BlockStructure):
     """
     Subclass of BlockStructure that is responsible for managing block
@@ -420,12 +475,14 @@ class BlockStructureBlockData(BlockStructure):
         deep-copy of this instance's contents.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             self.root_block_usage_key,
             deepcopy(self._block_relations),
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
         )
+        block_structure._block_index_holder = self._block_index_holder  # pylint: disable=protected-access
+        return block_structure
 
     def iteritems(self):
         """
@@ -618,6 +675,7 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
+        self._clear_block_index()
         children = self._block_relations[usage_key].children
         parents = self._block_relations[usage_key].parents
 
@@ -643,7 +701,7 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns a filter function that always returns True for all blocks.
         """
-        return lambda block_key: True
+        return retain_all_blocks
 
     def create_removal_filter(self, removal_condition, keep_descendants=False):
         """
@@ -658,11 +716,7 @@ class BlockStructureBlockData(BlockStructure):
             keep_descendants (bool) - See the description in
                 remove_block.
         """
-        return partial(
-            self.retain_or_remove,
-            removal_condition=removal_condition,
-            keep_descendants=keep_descendants,
-        )
+        return RemovalFilter(self, removal_condition, keep_descendants)
 
     def retain_or_remove(self, block_key, removal_condition, keep_descendants=False):
         """
@@ -727,6 +781,73 @@ class BlockStructureBlockData(BlockStructure):
         for _ in self.topological_traversal(filter_func=filter_func, **kwargs):
             pass
 
+    def retain_masked_blocks(self, block_index, retained_mask, spliced_mask=0):
+        """
+        Mutates this block structure so that it contains only the
+        blocks in retained_mask, removing all other blocks at once.
+
+        Blocks in spliced_mask are also removed, but as with
+        keep_descendants in remove_block, their parents are reconnected
+        with their children.  This is equivalent to calling
+        remove_block for each removed block in topological order and
+        then pruning unreachable blocks.
+
+        Arguments:
+            block_index (BlockIndex) - Index of this block structure's
+                blocks, against which the masks are defined.
+
+            retained_mask (int) - Bitset of the blocks to retain.
+
+            spliced_mask (int) - Bitset of the removed blocks whose
+                descendants are to be kept.
+        """
+        self._clear_block_index()
+        retained = set(block_index.block_keys_in_mask(retained_mask))
+        spliced = set(block_index.block_keys_in_mask(spliced_mask & ~retained_mask))
+        block_relations = self._block_relations
+
+        def _retained_relatives(block_keys, get_relatives):
+            """
+            Returns the retained blocks among the given block_keys,
+            replacing each spliced block with its own retained
+            relatives.  As in remove_block, the relatives of a spliced
+            block are placed after the block's retained siblings.
+            """
+            relatives = [block_key for block_key in block_keys if block_key in retained]
+            spliced_keys = [block_key for block_key in block_keys if block_key in spliced]
+            if spliced_keys:
+                seen = set(relatives)
+                for spliced_key in spliced_keys:
+                    for relative in _retained_relatives(get_relatives(block_relations[spliced_key]), get_relatives):
+                        if relative not in seen:
+                            seen.add(relative)
+                            relatives.append(relative)
+            return relatives
+
+        # Only the retained blocks related to a removed block need
+        # their relations updated.
+        removed_keys = [block_key for block_key in block_relations if block_key not in retained]
+        affected_keys = set()
+        for block_key in removed_keys:
+            affected_keys.update(block_relations[block_key].parents)
+            affected_keys.update(block_relations[block_key].children)
+        affected_keys &= retained
+
+        updated_relations = {
+            block_key: (
+                _retained_relatives(block_relations[block_key].children, lambda relations: relations.children),
+                _retained_relatives(block_relations[block_key].parents, lambda relations: relations.parents),
+            )
+            for block_key in affected_keys
+        }
+        for block_key, (children, parents) in updated_relations.iteritems():
+            block_relations[block_key].children = children
+            block_relations[block_key].parents = parents
+
+        for block_key in removed_keys:
+            block_relations.pop(block_key)
+            self._block_data_map.pop(block_key, None)
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
@@ -786,6 +907,11 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         # set(string)
         self._requested_xblock_fields = set()
 
+        # Set of usage keys of the blocks whose data is being collected,
+        # during an incremental collect.  None if all blocks are.
+        # set(UsageKey)
+        self._collect_scope = None
+
     def request_xblock_fields(self, *field_names):
         """
         Records request for collecting data for the given xBlock fields.
@@ -812,6 +938,46 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         return self._xblock_map[usage_key]
 
+    def topological_traversal(
+            self,
+            filter_func=None,
+            yield_descendants_of_unyielded=False,
+            start_node=None,
+    ):
+        """
+        Performs a topological sort of the block structure, as in
+        BlockStructure.topological_traversal.
+
+        During an incremental collect, only blocks whose data is being
+        collected are yielded.
+        """
+        return self._filter_to_collect_scope(
+            super(BlockStructureModulestoreData, self).topological_traversal(
+                filter_func=filter_func,
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+                start_node=start_node,
+            )
+        )
+
+    def post_order_traversal(
+            self,
+            filter_func=None,
+            start_node=None,
+    ):
+        """
+        Performs a post-order sort of the block structure, as in
+        BlockStructure.post_order_traversal.
+
+        During an incremental collect, only blocks whose data is being
+        collected are yielded.
+        """
+        return self._filter_to_collect_scope(
+            super(BlockStructureModulestoreData, self).post_order_traversal(
+                filter_func=filter_func,
+                start_node=start_node,
+            )
+        )
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
@@ -836,6 +1002,8 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         collects all xBlock fields that were requested.
         """
         for xblock_usage_key, xblock in self._xblock_map.iteritems():
+            if self._collect_scope is not None and xblock_usage_key not in self._collect_scope:
+                continue
             block_data = self._get_or_create_block(xblock_usage_key)
             for field_name in self._requested_xblock_fields:
                 self._set_xblock_field(block_data, xblock, field_name)
@@ -858,3 +1026,72 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         if hasattr(xblock, field_name):
             setattr(block_data, field_name, getattr(xblock, field_name))
+
+    def _start_incremental_collect(self, previous_block_structure, version_field_name):
+        """
+        Restricts the collect phase to the blocks that changed since the
+        given block structure was collected, along with their ancestors
+        and descendants.  Previously collected data for all other blocks
+        is carried over.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A
+                block structure collected from an earlier version of
+                the same content.
+
+            version_field_name (string) - Name of the xBlock field
+                whose value changes whenever the block is updated.
+
+        Returns:
+            set(UsageKey) - The blocks whose data is to be collected.
+        """
+        changed_blocks = set()
+        for usage_key, xblock in self._xblock_map.iteritems():
+            version = getattr(xblock, version_field_name, None)
+            if version is None or version != previous_block_structure.get_xblock_field(usage_key, version_field_name):
+                changed_blocks.add(usage_key)
+
+        collect_scope = set(changed_blocks)
+        self._add_connected_blocks(collect_scope, changed_blocks, self.get_parents)
+        self._add_connected_blocks(collect_scope, changed_blocks, self.get_children)
+
+        for usage_key in self._xblock_map:
+            if usage_key not in collect_scope:
+                self._block_data_map[usage_key] = previous_block_structure[usage_key]
+        for transformer_name, transformer_data in previous_block_structure.transformer_data.iteritems():
+            self.transformer_data[transformer_name] = transformer_data
+
+        self._collect_scope = collect_scope
+        return collect_scope
+
+    def _end_incremental_collect(self):
+        """
+        Lifts any restriction set by _start_incremental_collect.
+        """
+        self._collect_scope = None
+
+    @staticmethod
+    def _add_connected_blocks(block_keys, start_keys, get_next):
+        """
+        Adds all blocks reachable from start_keys through get_next to
+        the given set of block_keys.
+        """
+        stack = list(start_keys)
+        visited = set()
+        while stack:
+            block_key = stack.pop()
+            for next_key in get_next(block_key):
+                if next_key not in visited:
+                    visited.add(next_key)
+                    block_keys.add(next_key)
+                    stack.append(next_key)
+
+    def _filter_to_collect_scope(self, block_keys):
+        """
+        Returns the given iterable of block keys, filtered to the
+        blocks whose data is being collected.
+        """
+        if self._collect_scope is None:
+            return block_keys
+        collect_scope = self._collect_scope
+        return (block_key for block_key in block_keys if block_key in collect_scope)
@@ -15,6 +15,9 @@ WAFFLE_NAMESPACE = u'block_structure'
 INVALIDATE_CACHE_ON_PUBLISH = u'invalidate_cache_on_publish'
 STORAGE_BACKING_FOR_CACHE = u'storage_backing_for_cache'
 RAISE_ERROR_WHEN_NOT_FOUND = u'raise_error_when_not_found'
+COLUMNAR_SERIALIZATION = u'columnar_serialization'
+INCREMENTAL_COLLECT = u'incremental_collect'
+MASK_BASED_FILTERING = u'mask_based_filtering'
 
 
 def waffle():
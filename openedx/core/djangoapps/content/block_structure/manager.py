@@ -112,22 +112,42 @@ class BlockStructureManager(object):
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                self._update_collected(incremental=config.waffle().is_enabled(config.INCREMENTAL_COLLECT))
 
-    def _update_collected(self):
+    def _update_collected(self, incremental=False):
         """
         The store is updated with newly collected transformers data from
         the modulestore.
+
+        Arguments:
+            incremental (bool) - Whether to reuse data collected for
+                unchanged blocks in the previously stored block
+                structure, if possible.
         """
         with self._bulk_operations():
+            previous_block_structure = self._get_previous_for_incremental_collect() if incremental else None
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
+                lazy=previous_block_structure is not None,
             )
-            BlockStructureTransformers.collect(block_structure)
+            BlockStructureTransformers.collect(block_structure, previous_block_structure)
             self.store.add(block_structure)
             return block_structure
 
+    def _get_previous_for_incremental_collect(self):
+        """
+        Returns the previously stored block structure if it can be used
+        for an incremental collect, else None.
+        """
+        try:
+            previous_block_structure = self.store.get(self.root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+        if not BlockStructureTransformers.supports_incremental_collect(previous_block_structure):
+            return None
+        return previous_block_structure
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
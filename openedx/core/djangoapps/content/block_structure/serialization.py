@@ -0,0 +1,530 @@
+"""
+Module for the columnar serialization format of collected BlockStructures.
+
+The legacy format pickles the entire (block_relations, transformer_data,
+block_data_map) tuple, so every read has to rebuild a BlockData object
+(and its nested TransformerData objects) for every block in the course,
+even when a request only touches a handful of fields.
+
+The columnar format instead stores:
+
+  * An interned usage key table - a list of distinct course keys and
+    block types, with a course index, type index and block_id per block.
+  * Integer-indexed parent/child arrays, in compressed sparse row form.
+  * One value column per xBlock field and per transformer block field,
+    each holding only the blocks that have a value for that field.
+
+The payload is read through a memoryview and each column is only decoded
+the first time one of its values is accessed.  BlockData objects are
+created on demand by _LazyBlockDataMap.
+
+Serialized layout:
+
+    MAGIC (3 bytes) | FORMAT_VERSION (1 byte) | zlib(body)
+
+    body:
+        manifest length (uint32) | pickled manifest | sections...
+"""
+from array import array
+from collections import MutableMapping
+from copy import deepcopy
+from datetime import date, datetime, timedelta
+from itertools import izip
+import struct
+import zlib
+
+from opaque_keys import OpaqueKey
+from six.moves import cPickle as pickle
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+
+# Prefix identifying data serialized in the columnar format.  Data
+# serialized by zpickle always starts with a zlib header byte, so it
+# can never collide with this prefix.
+MAGIC = b'BSC'
+
+# The latest version of the columnar format.  Incrementally update this
+# value whenever the layout changes.
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<3sB')
+_MANIFEST_LENGTH = struct.Struct('<I')
+
+# Typecode of the integer arrays used for relations and column indices.
+_INDEX_TYPECODE = 'I'
+
+# Types of field values that can't be mutated in place, so can be read
+# straight from the decoded columns shared by all copies of a structure.
+_IMMUTABLE_TYPES = (type(None), bool, int, long, float, basestring, date, datetime, timedelta, OpaqueKey)
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data is in the columnar format.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_relations, transformer_data, block_data_map):
+    """
+    Returns the columnar serialization of the given block structure
+    data, as stored in BlockStructureBlockData.
+    """
+    writer = _SectionWriter()
+
+    block_keys = list(block_relations)
+    block_keys.extend(key for key in block_data_map if key not in block_relations)
+    key_to_index = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    manifest = dict(
+        num_blocks=len(block_keys),
+        keys=_write_key_table(writer, block_keys),
+        children=_write_relations(writer, block_keys, block_relations, key_to_index, 'children'),
+        parents=_write_relations(writer, block_keys, block_relations, key_to_index, 'parents'),
+        transformer_data=writer.add_pickle(transformer_data),
+    )
+
+    field_columns = {}
+    transformer_columns = {}
+    transformer_presence = {}
+    for index, block_key in enumerate(block_keys):
+        block_data = block_data_map.get(block_key)
+        if block_data is None:
+            continue
+        for field_name, value in block_data.fields.iteritems():
+            _append_to_column(field_columns, field_name, index, value)
+        for transformer_name, block_transformer_data in block_data.transformer_data.iteritems():
+            transformer_presence.setdefault(transformer_name, array(_INDEX_TYPECODE)).append(index)
+            for key, value in block_transformer_data.fields.iteritems():
+                _append_to_column(transformer_columns, (transformer_name, key), index, value)
+
+    manifest['block_data'] = writer.add_array(
+        array(_INDEX_TYPECODE, sorted(key_to_index[key] for key in block_data_map))
+    )
+    manifest['fields'] = {
+        field_name: writer.add_column(column) for field_name, column in field_columns.iteritems()
+    }
+    manifest['transformer_presence'] = {
+        transformer_name: writer.add_array(indices) for transformer_name, indices in transformer_presence.iteritems()
+    }
+    manifest['transformer_fields'] = {
+        column_name: writer.add_column(column) for column_name, column in transformer_columns.iteritems()
+    }
+    manifest['sections'] = writer.offsets
+
+    manifest_data = pickle.dumps(manifest, pickle.HIGHEST_PROTOCOL)
+    body = b''.join([_MANIFEST_LENGTH.pack(len(manifest_data)), manifest_data] + writer.sections)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(body)
+
+
+def deserialize(serialized_data):
+    """
+    Returns a (block_relations, transformer_data, block_data_map) tuple
+    for the given columnar serialized data.  The returned block_data_map
+    creates BlockData objects lazily, as blocks are accessed.
+
+    Raises:
+        ValueError if the data is not in a supported columnar format.
+    """
+    magic, version = _HEADER.unpack_from(serialized_data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(u'Unsupported block structure serialization format: {!r} v{}'.format(magic, version))
+
+    columns = _BlockColumns(zlib.decompress(serialized_data[_HEADER.size:]))
+
+    block_keys = columns.read_key_table()
+    relations_list = [_BlockRelations() for _ in block_keys]
+    for relation_name in ('children', 'parents'):
+        offsets, related = columns.read_relations(relation_name)
+        for index, relations in enumerate(relations_list):
+            setattr(
+                relations,
+                relation_name,
+                [block_keys[related_index] for related_index in related[offsets[index]:offsets[index + 1]]],
+            )
+    block_relations = dict(izip(block_keys, relations_list))
+
+    transformer_data = columns.read_pickle(columns.manifest['transformer_data'])
+    block_data_map = _LazyBlockDataMap(columns, block_keys)
+    return block_relations, transformer_data, block_data_map
+
+
+class _SectionWriter(object):
+    """
+    Accumulates the binary sections of the columnar format, along with
+    their (offset, length) positions within the body.
+    """
+    def __init__(self):
+        self.sections = []
+        self.offsets = []
+        self._position = 0
+
+    def add(self, data):
+        """
+        Appends the given bytes as a new section and returns its index.
+        """
+        self.sections.append(data)
+        self.offsets.append((self._position, len(data)))
+        self._position += len(data)
+        return len(self.sections) - 1
+
+    def add_pickle(self, value):
+        """
+        Appends the pickled value as a new section and returns its index.
+        """
+        return self.add(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def add_array(self, values):
+        """
+        Appends the given integer array as a new section and returns its index.
+        """
+        return self.add(values.tostring())
+
+    def add_column(self, column):
+        """
+        Appends the given (indices, values) column and returns the
+        indices of its two sections.
+        """
+        indices, values = column
+        return self.add_array(indices), self.add_pickle(values)
+
+
+def _append_to_column(columns, column_name, index, value):
+    """
+    Appends the value for the block at the given index to the named column.
+    """
+    try:
+        indices, values = columns[column_name]
+    except KeyError:
+        indices, values = columns[column_name] = (array(_INDEX_TYPECODE), [])
+    indices.append(index)
+    values.append(value)
+
+
+def _write_key_table(writer, block_keys):
+    """
+    Writes the interned usage key table and returns its manifest entry.
+
+    Opaque usage keys are stored as indices into tables of distinct
+    course keys and block types along with their block_ids.  Any other
+    kind of key (such as the integers used in tests) is pickled as is.
+    """
+    try:
+        course_keys, course_indices = _intern(key.course_key for key in block_keys)
+        block_types, type_indices = _intern(key.block_type for key in block_keys)
+        block_ids = [key.block_id for key in block_keys]
+    except AttributeError:
+        return dict(interned=False, keys=writer.add_pickle(block_keys))
+
+    return dict(
+        interned=True,
+        course_keys=writer.add_pickle(course_keys),
+        block_types=writer.add_pickle(block_types),
+        course_indices=writer.add_array(course_indices),
+        type_indices=writer.add_array(type_indices),
+        block_ids=writer.add_pickle(block_ids),
+    )
+
+
+def _intern(values):
+    """
+    Returns a list of the distinct values and an array of indices into
+    that list for each of the given values.
+    """
+    table = []
+    value_to_index = {}
+    indices = array(_INDEX_TYPECODE)
+    for value in values:
+        index = value_to_index.get(value)
+        if index is None:
+            index = value_to_index[value] = len(table)
+            table.append(value)
+        indices.append(index)
+    return table, indices
+
+
+def _write_relations(writer, block_keys, block_relations, key_to_index, relation_name):
+    """
+    Writes the given relation (children or parents) of all blocks as an
+    offsets array and a related-indices array, returning their sections.
+    """
+    offsets = array(_INDEX_TYPECODE, [0])
+    related = array(_INDEX_TYPECODE)
+    for block_key in block_keys:
+        relations = block_relations.get(block_key)
+        if relations is not None:
+            related.extend(key_to_index[related_key] for related_key in getattr(relations, relation_name))
+        offsets.append(len(related))
+    return writer.add_array(offsets), writer.add_array(related)
+
+
+class _BlockColumns(object):
+    """
+    Read access to the sections of a decompressed columnar body.  Each
+    section is a zero-copy slice of the body and columns are decoded
+    only upon first access.  Neither the body nor the decoded columns
+    are ever mutated, so they are shared by all copies of a structure.
+    """
+    def __init__(self, body):
+        self._body = body
+        self._view = memoryview(body)
+        manifest_length, = _MANIFEST_LENGTH.unpack_from(body)
+        manifest_end = _MANIFEST_LENGTH.size + manifest_length
+        self.manifest = pickle.loads(self._view[_MANIFEST_LENGTH.size:manifest_end].tobytes())
+        self._sections_start = manifest_end
+
+        # Map of section index to its decoded column or index set.
+        # dict {int: dict {block index: value} or frozenset(int)}
+        self._decoded_columns = {}
+
+    def __deepcopy__(self, memo):
+        """
+        Shares the serialized body and the decoded columns, so a column
+        is decoded only once for all copies.  _ColumnFields copies the
+        values that may be mutated before handing them out.
+        """
+        return self
+
+    def section(self, section_index):
+        """
+        Returns a memoryview of the given section.
+        """
+        offset, length = self.manifest['sections'][section_index]
+        start = self._sections_start + offset
+        return self._view[start:start + length]
+
+    def read_pickle(self, section_index):
+        """
+        Returns the unpickled value of the given section.
+        """
+        return pickle.loads(self.section(section_index).tobytes())
+
+    def read_array(self, section_index):
+        """
+        Returns the integer array stored in the given section.
+        """
+        values = array(_INDEX_TYPECODE)
+        values.fromstring(self.section(section_index).tobytes())
+        return values
+
+    def read_key_table(self):
+        """
+        Returns the list of block keys, ordered by block index.
+        """
+        key_table = self.manifest['keys']
+        if not key_table['interned']:
+            return self.read_pickle(key_table['keys'])
+
+        course_keys = self.read_pickle(key_table['course_keys'])
+        block_types = self.read_pickle(key_table['block_types'])
+        return [
+            course_keys[course_index].make_usage_key(block_types[type_index], block_id)
+            for course_index, type_index, block_id in izip(
+                self.read_array(key_table['course_indices']),
+                self.read_array(key_table['type_indices']),
+                self.read_pickle(key_table['block_ids']),
+            )
+        ]
+
+    def read_relations(self, relation_name):
+        """
+        Returns the offsets and related-indices arrays of the given relation.
+        """
+        offsets_section, related_section = self.manifest[relation_name]
+        return self.read_array(offsets_section), self.read_array(related_section)
+
+    def get_column(self, column):
+        """
+        Returns the decoded column for the given (indices, values)
+        sections, as a map of block index to value.
+        """
+        indices_section, values_section = column
+        try:
+            return self._decoded_columns[values_section]
+        except KeyError:
+            decoded = dict(izip(self.read_array(indices_section), self.read_pickle(values_section)))
+            self._decoded_columns[values_section] = decoded
+            return decoded
+
+    def get_index_set(self, section_index):
+        """
+        Returns the set of block indices stored in the given array section.
+        """
+        try:
+            return self._decoded_columns[section_index]
+        except KeyError:
+            decoded = frozenset(self.read_array(section_index))
+            self._decoded_columns[section_index] = decoded
+            return decoded
+
+
+class _ColumnFields(MutableMapping):
+    """
+    The fields map of a single lazily loaded BlockData or TransformerData,
+    reading values from the block's entries in the given columns.
+    """
+    def __init__(self, columns, column_sections, block_index):
+        self._columns = columns
+        self._column_sections = column_sections
+        self._block_index = block_index
+
+        # Local changes to the block's fields.
+        self._updated = {}
+        self._deleted = set()
+
+    def __getitem__(self, field_name):
+        if field_name in self._updated:
+            return self._updated[field_name]
+        if field_name in self._deleted or field_name not in self._column_sections:
+            raise KeyError(field_name)
+        value = self._columns.get_column(self._column_sections[field_name])[self._block_index]
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            # Keep a copy of the shared value as a local change, in case
+            # it's mutated in place.
+            value = self._updated[field_name] = deepcopy(value)
+        return value
+
+    def __setitem__(self, field_name, value):
+        self._deleted.discard(field_name)
+        self._updated[field_name] = value
+
+    def __delitem__(self, field_name):
+        if field_name not in self:
+            raise KeyError(field_name)
+        self._updated.pop(field_name, None)
+        self._deleted.add(field_name)
+
+    def __contains__(self, field_name):
+        if field_name in self._updated:
+            return True
+        if field_name in self._deleted or field_name not in self._column_sections:
+            return False
+        return self._block_index in self._columns.get_column(self._column_sections[field_name])
+
+    def __iter__(self):
+        for field_name in self._column_sections:
+            if field_name not in self._updated and field_name in self:
+                yield field_name
+        for field_name in self._updated:
+            yield field_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __deepcopy__(self, memo):
+        """
+        Copies only the local changes; the rest of the values are still
+        read from the shared columns.
+        """
+        # pylint: disable=protected-access
+        copied = _ColumnFields(deepcopy(self._columns, memo), self._column_sections, self._block_index)
+        copied._updated = deepcopy(self._updated, memo)
+        copied._deleted = set(self._deleted)
+        return copied
+
+    def __reduce__(self):
+        """
+        Pickles as a plain dict.
+        """
+        return dict, (dict(self.iteritems()),)
+
+
+class _LazyBlockDataMap(MutableMapping):
+    """
+    A map of block usage key to BlockData that creates each BlockData
+    from the serialized columns the first time the block is accessed.
+    """
+    def __init__(self, columns, block_keys):
+        self._columns = columns
+        self._block_keys = block_keys
+
+        # Map of usage key to index for blocks with serialized data.
+        # dict {UsageKey: int}
+        self._key_to_index = {
+            block_keys[block_index]: block_index
+            for block_index in columns.read_array(columns.manifest['block_data'])
+        }
+
+        # Map of usage key to BlockData for blocks that were accessed or set.
+        # dict {UsageKey: BlockData}
+        self._materialized = {}
+
+        # Group the transformer field columns by transformer name.
+        # dict {transformer name: dict {field name: (int, int)}}
+        self._transformer_columns = {
+            transformer_name: {} for transformer_name in columns.manifest['transformer_presence']
+        }
+        for (transformer_name, field_name), column in columns.manifest['transformer_fields'].iteritems():
+            self._transformer_columns[transformer_name][field_name] = column
+
+    def __getitem__(self, usage_key):
+        try:
+            return self._materialized[usage_key]
+        except KeyError:
+            block_data = self._materialize(usage_key, self._key_to_index[usage_key])
+            self._materialized[usage_key] = block_data
+            return block_data
+
+    def __setitem__(self, usage_key, block_data):
+        self._materialized[usage_key] = block_data
+
+    def __delitem__(self, usage_key):
+        if usage_key not in self:
+            raise KeyError(usage_key)
+        self._materialized.pop(usage_key, None)
+        self._key_to_index.pop(usage_key, None)
+
+    def __contains__(self, usage_key):
+        return usage_key in self._materialized or usage_key in self._key_to_index
+
+    def __iter__(self):
+        for usage_key in self._key_to_index:
+            yield usage_key
+        for usage_key in self._materialized:
+            if usage_key not in self._key_to_index:
+                yield usage_key
+
+    def __len__(self):
+        return len(self._key_to_index) + sum(
+            1 for usage_key in self._materialized if usage_key not in self._key_to_index
+        )
+
+    def __deepcopy__(self, memo):
+        """
+        Copies only the blocks that were already materialized; the rest
+        are shared through the immutable serialized columns.
+        """
+        # pylint: disable=protected-access
+        copied = _LazyBlockDataMap.__new__(_LazyBlockDataMap)
+        copied._columns = deepcopy(self._columns, memo)
+        copied._block_keys = self._block_keys
+        copied._key_to_index = dict(self._key_to_index)
+        copied._materialized = deepcopy(self._materialized, memo)
+        copied._transformer_columns = self._transformer_columns
+        return copied
+
+    def __reduce__(self):
+        """
+        Pickles as a plain dict.
+        """
+        return dict, (dict(self.iteritems()),)
+
+    def _materialize(self, usage_key, block_index):
+        """
+        Returns a new BlockData for the given block whose fields are
+        read from the serialized columns.
+        """
+        block_data = BlockData(usage_key)
+        block_data.fields = _ColumnFields(self._columns, self._columns.manifest['fields'], block_index)
+
+        transformer_data = TransformerDataMap()
+        for transformer_name, presence_section in self._columns.manifest['transformer_presence'].iteritems():
+            if block_index in self._columns.get_index_set(presence_section):
+                block_transformer_data = TransformerData()
+                block_transformer_data.fields = _ColumnFields(
+                    self._columns, self._transformer_columns[transformer_name], block_index,
+                )
+                transformer_data[transformer_name] = block_transformer_data
+        block_data.transformer_data = transformer_data
+        return block_data
@@ -9,7 +9,7 @@ from xmodule.modulestore.django import SignalHandler
 from opaque_keys.edx.locator import LibraryLocator
 
 from . import config
-from .api import clear_course_from_cache
+from .api import clear_course_from_cache, evict_course_from_process_cache
 from .tasks import update_course_in_cache_v2
 
 
@@ -23,6 +23,7 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
     if isinstance(course_key, LibraryLocator):
         return
 
+    evict_course_from_process_cache(course_key)
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         clear_course_from_cache(course_key)
 
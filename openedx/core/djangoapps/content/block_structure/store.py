@@ -4,9 +4,12 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_metric
 
-from . import config
+from openedx.core.lib.cache_utils import LRUCache, zpickle, zunpickle
+
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -16,6 +19,10 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Per-process cache of deserialized, collected block structures,
+# created upon first use.  See _get_process_cache.
+_process_cache = None
+
 
 class StubModel(object):
     """
@@ -65,6 +72,7 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        self.evict_from_process_cache(block_structure.root_block_usage_key)
 
     def get(self, root_block_usage_key):
         """
@@ -89,13 +97,20 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
+        block_structure = self._get_from_process_cache(bs_model)
+        if block_structure is not None:
+            return block_structure.copy()
+
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        if self._add_to_process_cache(block_structure, bs_model):
+            return block_structure.copy()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -108,6 +123,7 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        self.evict_from_process_cache(root_block_usage_key)
         bs_model.delete()
         logger.info(u"BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -126,6 +142,25 @@ class BlockStructureStore(object):
 
         return False
 
+    @staticmethod
+    def evict_from_process_cache(root_block_usage_key):
+        """
+        Removes all versions of the block structure for the given
+        root_block_usage_key from this process' cache.
+        """
+        process_cache = _get_process_cache()
+        if process_cache is not None:
+            process_cache.delete_matching(lambda key: key[0] == root_block_usage_key)
+
+    @staticmethod
+    def process_cache_stats():
+        """
+        Returns the hit, miss and eviction counters of this process'
+        cache, or None if the process cache is disabled.
+        """
+        process_cache = _get_process_cache()
+        return process_cache.stats() if process_cache is not None else None
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -175,6 +210,37 @@ class BlockStructureStore(object):
             raise BlockStructureNotFound(bs_model.data_usage_key)
         return serialized_data
 
+    def _get_from_process_cache(self, bs_model):
+        """
+        Returns the deserialized block structure for the given
+        BlockStructureModel from this process' cache; returns None if
+        not found.
+
+        The returned block structure is shared within the process and
+        must not be mutated.
+        """
+        process_cache_key = self._encode_process_cache_key(bs_model)
+        if process_cache_key is None:
+            return None
+
+        block_structure = _get_process_cache().get(process_cache_key)
+        set_custom_metric('block_structure_process_cache_hit', block_structure is not None)
+        return block_structure
+
+    def _add_to_process_cache(self, block_structure, bs_model):
+        """
+        Adds the given deserialized block structure for the given
+        BlockStructureModel to this process' cache.  Returns whether the
+        block structure is now shared and therefore needs to be copied
+        before being handed out.
+        """
+        process_cache_key = self._encode_process_cache_key(bs_model)
+        if process_cache_key is None:
+            return False
+
+        _get_process_cache().set(process_cache_key, block_structure)
+        return True
+
     def _get_from_store(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -189,20 +255,29 @@ class BlockStructureStore(object):
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, using the
+        columnar format if it is enabled.
         """
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
             block_structure._block_data_map,
         )
+        if config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION):
+            return serialization.serialize(*data_to_cache)
         return zpickle(data_to_cache)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+        Data serialized in either the columnar or the pickled format is
+        supported, so entries written before switching formats remain
+        readable.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+        if serialization.is_columnar(serialized_data):
+            block_relations, transformer_data, block_data_map = serialization.deserialize(serialized_data)
+        else:
+            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
@@ -225,6 +300,20 @@ class BlockStructureStore(object):
                 root_usage_key=unicode(bs_model.data_usage_key),
             )
 
+    @staticmethod
+    def _encode_process_cache_key(bs_model):
+        """
+        Returns the key to use for the given BlockStructureModel in this
+        process' cache, or None if the process cache cannot be used.
+
+        Since the process cache cannot be invalidated by other processes,
+        entries are keyed by the version of the collected data, which is
+        only known when storage backing is enabled.
+        """
+        if _get_process_cache() is None or not _is_storage_backing_enabled():
+            return None
+        return bs_model.data_usage_key, unicode(bs_model)
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -254,3 +343,17 @@ def _is_storage_backing_enabled():
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def _get_process_cache():
+    """
+    Returns the per-process cache of block structures, bounded by the
+    total number of blocks it holds, or None if it is disabled.
+    """
+    global _process_cache  # pylint: disable=global-statement
+    max_blocks = settings.BLOCK_STRUCTURES_SETTINGS.get('PROCESS_CACHE_MAX_BLOCKS', 0)
+    if not max_blocks:
+        return None
+    if _process_cache is None or _process_cache.max_size != max_blocks:
+        _process_cache = LRUCache(max_size=max_blocks, get_size=len)
+    return _process_cache
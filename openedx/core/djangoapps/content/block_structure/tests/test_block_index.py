@@ -0,0 +1,83 @@
+"""
+Tests for block_structure/block_index.py
+"""
+from __future__ import absolute_import
+
+from functools import partial
+from operator import contains
+from unittest import TestCase
+
+import ddt
+
+from ..block_index import BlockIndex
+from .helpers import ChildrenMapTestMixin
+
+
+@ddt.ddt
+class TestBlockIndex(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockIndex
+    """
+    def setUp(self):
+        super(TestBlockIndex, self).setUp()
+        self.block_index = BlockIndex(self.create_block_structure(self.DAG_CHILDREN_MAP))
+
+    def mask(self, *block_ids):
+        """
+        Returns the bitset for the given block ids.
+        """
+        return sum(1 << self.block_index.block_keys.index(block_id) for block_id in block_ids)
+
+    def test_topological_order(self):
+        self.assertEqual(len(self.block_index), len(self.DAG_CHILDREN_MAP))
+        self.assertEqual(self.block_index.block_keys[0], 0)
+        for block_id, parents in enumerate(self.get_parents_map(self.DAG_CHILDREN_MAP)):
+            index = self.block_index.block_keys.index(block_id)
+            for parent in parents:
+                self.assertLess(self.block_index.block_keys.index(parent), index)
+
+    @ddt.data(
+        ([], []),
+        ([({1}, False)], [(1,)]),
+        ([({1}, False), ({1, 2, 3}, False)], [(1,), (2,)]),
+        ([({1}, True), ({1, 2, 3}, False)], [(1,), (2, 3)]),
+        ([({2}, False), ({3}, False)], [(2,), (3,)]),
+        ([({0}, False), ({1}, False)], [(0,), ()]),
+    )
+    @ddt.unpack
+    def test_removal_masks(self, removals, expected_removed_ids):
+        masks = self.block_index.removal_masks([
+            (partial(contains, block_ids), keep_descendants) for block_ids, keep_descendants in removals
+        ])
+        self.assertEqual(masks, [self.mask(*removed_ids) for removed_ids in expected_removed_ids])
+
+    @ddt.data(
+        ((), (0, 1, 2, 3, 4, 5, 6)),
+        ((1,), (0, 2, 3, 4, 5, 6)),
+        ((1, 2), (0,)),
+        ((3,), (0, 1, 2, 4)),
+        ((0,), ()),
+    )
+    @ddt.unpack
+    def test_reachable_mask(self, removed_ids, reachable_ids):
+        self.assertEqual(self.block_index.reachable_mask(self.mask(*removed_ids)), self.mask(*reachable_ids))
+
+    def test_block_keys_in_mask(self):
+        self.assertEqual(self.block_index.block_keys_in_mask(0), [])
+        self.assertEqual(sorted(self.block_index.block_keys_in_mask(self.mask(3, 5))), [3, 5])
+        self.assertEqual(
+            sorted(self.block_index.block_keys_in_mask(self.block_index.all_blocks_mask)),
+            list(range(len(self.DAG_CHILDREN_MAP))),
+        )
+
+    def test_shared_with_copies(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_index = block_structure.get_block_index()
+        self.assertIs(block_structure.get_block_index(), block_index)
+
+        copied_structure = block_structure.copy()
+        self.assertIs(copied_structure.get_block_index(), block_index)
+
+        copied_structure.remove_block(1, keep_descendants=False)
+        self.assertEqual(len(copied_structure.get_block_index()), 2)
+        self.assertIs(block_structure.get_block_index(), block_index)
@@ -6,9 +6,10 @@ from __future__ import absolute_import
 import ddt
 import six
 from django.test import TestCase
+from mock import patch
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import INCREMENTAL_COLLECT, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -94,6 +95,23 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + six.text_type(block_key)
 
 
+class TestIncrementalTransformer(TestTransformer1):
+    """
+    Test Transformer class that supports incremental collects and
+    records the blocks it collected data for.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_blocks = None
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects block data for the block structure.
+        """
+        super(TestIncrementalTransformer, cls).collect(block_structure)
+        cls.collected_blocks = set(block_structure.topological_traversal())
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -224,3 +242,66 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def set_block_versions(self, versions_by_block_id):
+        """
+        Sets the update_version field of the given mock xBlocks.
+        """
+        for block_id, version in versions_by_block_id.iteritems():
+            self.modulestore.blocks[self.block_key_factory(block_id)].field_map['update_version'] = version
+
+    @ddt.data(
+        (True, True, {0, 1, 3}),
+        (True, False, {0, 1, 2, 3, 4}),
+        (False, True, {0, 1, 2, 3, 4}),
+    )
+    @ddt.unpack
+    def test_incremental_collect(self, incremental_enabled, transformer_supports_incremental, expected_collected):
+        self.registered_transformers = [TestIncrementalTransformer()]
+        self.set_block_versions({block_id: u'v1' for block_id in range(len(self.children_map))})
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+
+        self.set_block_versions({3: u'v2'})
+        with waffle().override(INCREMENTAL_COLLECT, active=incremental_enabled):
+            with mock_registered_transformers(self.registered_transformers):
+                with patch.object(
+                    TestIncrementalTransformer, 'SUPPORTS_INCREMENTAL_COLLECT', transformer_supports_incremental,
+                ):
+                    self.bs_manager.update_collected_if_needed()
+
+        self.assertEquals(
+            TestIncrementalTransformer.collected_blocks,
+            {self.block_key_factory(block_id) for block_id in expected_collected},
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_collected()
+        self.assert_block_structure(block_structure, self.children_map)
+        TestIncrementalTransformer.assert_collected(block_structure)
+        self.assertEquals(block_structure.get_xblock_field(self.block_key_factory(3), 'update_version'), u'v2')
+        self.assertEquals(block_structure.get_xblock_field(self.block_key_factory(4), 'update_version'), u'v1')
+
+    def test_incremental_collect_with_new_block(self):
+        self.registered_transformers = [TestIncrementalTransformer()]
+        self.set_block_versions({block_id: u'v1' for block_id in range(len(self.children_map))})
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+
+        # Add a new child to block 2, changing its version.
+        self.children_map = [[1, 2], [3, 4], [5], [], [], []]
+        self.modulestore = MockModulestoreFactory.create(self.children_map, self.block_key_factory)
+        self.set_block_versions({block_id: u'v1' for block_id in range(len(self.children_map))})
+        self.set_block_versions({2: u'v2', 5: u'v2'})
+        self.bs_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, self.cache)
+
+        with waffle().override(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager.get_collected()
+
+        self.assertEquals(
+            TestIncrementalTransformer.collected_blocks,
+            {self.block_key_factory(block_id) for block_id in (0, 2, 5)},
+        )
+        self.assert_block_structure(block_structure, self.children_map)
+        TestIncrementalTransformer.assert_collected(block_structure)
@@ -0,0 +1,241 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from __future__ import absolute_import
+
+import timeit
+from copy import deepcopy
+from unittest import TestCase, skip
+
+import ddt
+from mock import patch
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .. import serialization
+from ..block_structure import BlockStructureBlockData
+from ..factory import BlockStructureFactory
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+class SerializationTestMixin(ChildrenMapTestMixin):
+    """
+    Utilities for round-tripping block structures through the
+    columnar format.
+    """
+    def create_collected_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        xBlock fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = u'Block {}'.format(block_id)
+            if block_id % 2:
+                block_data.graded = True
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'index', block_id)
+        return block_structure
+
+    def round_trip(self, block_structure):
+        """
+        Returns a new block structure after serializing and deserializing
+        the given one in the columnar format.
+        """
+        serialized_data = serialization.serialize(
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        )
+        self.assertTrue(serialization.is_columnar(serialized_data))
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *serialization.deserialize(serialized_data)
+        )
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, SerializationTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations(self, children_map):
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        self.assert_block_structure(block_structure, children_map)
+
+    def test_block_data(self):
+        children_map = self.DAG_CHILDREN_MAP
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(block_structure[block_key].location, block_key)
+            self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), u'Block {}'.format(block_id))
+            self.assertEqual(block_structure.get_xblock_field(block_key, 'graded'), True if block_id % 2 else None)
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'index'),
+                block_id,
+            )
+        self.assertEqual(
+            block_structure._get_transformer_data_version(MockTransformer),  # pylint: disable=protected-access
+            MockTransformer.WRITE_VERSION,
+        )
+
+    def test_interned_keys(self):
+        other_course_key = CourseLocator('org', 'other', 'run')
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        other_key = BlockUsageLocator(other_course_key, 'html', 'shared')
+        block_structure._add_relation(self.block_key_factory(2), other_key)  # pylint: disable=protected-access
+
+        block_structure = self.round_trip(block_structure)
+        self.assertEqual(block_structure.get_children(self.block_key_factory(2)), [other_key])
+        self.assertEqual(block_structure.get_parents(other_key), [self.block_key_factory(2)])
+
+    def test_lazy_materialization(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_data_map = block_structure._block_data_map  # pylint: disable=protected-access
+        self.assertFalse(block_data_map._materialized)  # pylint: disable=protected-access
+
+        block_structure.get_xblock_field(self.block_key_factory(1), 'display_name')
+        self.assertEqual(list(block_data_map._materialized), [self.block_key_factory(1)])  # pylint: disable=protected-access
+
+    def test_mutations(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_key = self.block_key_factory(1)
+
+        block_structure.override_xblock_field(block_key, 'display_name', u'Overridden')
+        block_structure.remove_transformer_block_field(block_key, MockTransformer, 'index')
+        block_structure.remove_block(self.block_key_factory(2), keep_descendants=False)
+
+        self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), u'Overridden')
+        self.assertIsNone(block_structure.get_transformer_block_field(block_key, MockTransformer, 'index'))
+        self.assertNotIn(self.block_key_factory(2), block_structure)
+        self.assertEqual(len(list(block_structure.itervalues())), len(self.SIMPLE_CHILDREN_MAP) - 1)
+
+    def test_copy_is_isolated(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_key = self.block_key_factory(1)
+        block_structure.get_xblock_field(block_key, 'display_name')
+
+        copied_structure = block_structure.copy()
+        copied_structure.override_xblock_field(block_key, 'display_name', u'Copy')
+        copied_structure.override_xblock_field(self.block_key_factory(3), 'display_name', u'Copy')
+
+        self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), u'Block 1')
+        self.assertEqual(block_structure.get_xblock_field(self.block_key_factory(3), 'display_name'), u'Block 3')
+        self.assertEqual(copied_structure.get_xblock_field(block_key, 'display_name'), u'Copy')
+
+    def test_copies_share_decoded_columns(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_structure.get_xblock_field(self.block_key_factory(1), 'display_name')
+
+        with patch.object(serialization._BlockColumns, 'read_pickle') as mock_read_pickle:  # pylint: disable=protected-access
+            for _ in range(2):
+                copied_structure = deepcopy(block_structure)
+                self.assertEqual(
+                    copied_structure.get_xblock_field(self.block_key_factory(3), 'display_name'),
+                    u'Block 3',
+                )
+        self.assertFalse(mock_read_pickle.called)
+
+    def test_copy_of_mutable_value_is_isolated(self):
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        block_key = self.block_key_factory(1)
+        block_structure.set_transformer_block_field(block_key, MockTransformer, 'items', [1])
+        block_structure = self.round_trip(block_structure)
+
+        copied_structure = deepcopy(block_structure)
+        copied_structure.get_transformer_block_field(block_key, MockTransformer, 'items').append(2)
+
+        self.assertEqual(copied_structure.get_transformer_block_field(block_key, MockTransformer, 'items'), [1, 2])
+        self.assertEqual(block_structure.get_transformer_block_field(block_key, MockTransformer, 'items'), [1])
+        copied_structure = deepcopy(block_structure)
+        self.assertEqual(copied_structure.get_transformer_block_field(block_key, MockTransformer, 'items'), [1])
+
+    def test_reserialize(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_structure.override_xblock_field(self.block_key_factory(0), 'display_name', u'Changed')
+
+        for reloaded in (self.round_trip(block_structure), deepcopy(block_structure)):
+            self.assert_block_structure(reloaded, self.SIMPLE_CHILDREN_MAP)
+            self.assertEqual(reloaded.get_xblock_field(self.block_key_factory(0), 'display_name'), u'Changed')
+
+        block_data_map = zunpickle(zpickle(block_structure._block_data_map))  # pylint: disable=protected-access
+        self.assertEqual(block_data_map[self.block_key_factory(0)].display_name, u'Changed')
+
+    def test_legacy_data_is_not_columnar(self):
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        self.assertFalse(serialization.is_columnar(zpickle((
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        ))))
+
+    def test_unsupported_version(self):
+        serialized_data = serialization.serialize({}, {}, {})
+        with self.assertRaises(ValueError):
+            serialization.deserialize(serialized_data[:3] + chr(serialization.FORMAT_VERSION + 1) + serialized_data[4:])
+
+
+class TestNonOpaqueKeys(SerializationTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format with block keys that
+    cannot be interned.
+    """
+    def test_round_trip(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.DAG_CHILDREN_MAP))
+        self.assert_block_structure(block_structure, self.DAG_CHILDREN_MAP)
+        self.assertEqual(block_structure.get_xblock_field(3, 'display_name'), u'Block 3')
+
+
+@skip
+class TestSerializationPerformance(UsageKeyFactoryMixin, SerializationTestMixin, TestCase):
+    """
+    Compares the columnar format against the pickled format on a large,
+    synthetic course.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_BLOCKS = 5000
+    NUM_FIELDS = 20
+    REPEAT = 5
+
+    def test_benchmark(self):
+        children_map = [[child] for child in range(1, self.NUM_BLOCKS)] + [[]]
+        block_structure = self.create_block_structure(children_map, BlockStructureBlockData)
+        for block_id in range(self.NUM_BLOCKS):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            for field_index in range(self.NUM_FIELDS):
+                setattr(block_data, 'field_{}'.format(field_index), u'value {}'.format(block_id))
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'index', block_id)
+
+        data_to_cache = (
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        )
+        pickled_data = zpickle(data_to_cache)
+        columnar_data = serialization.serialize(*data_to_cache)
+        leaf_key = self.block_key_factory(self.NUM_BLOCKS - 1)
+
+        def read_pickled():
+            """ Deserializes and reads a single field from the pickled format. """
+            zunpickle(pickled_data)[2][leaf_key].field_0  # pylint: disable=expression-not-assigned
+
+        def read_columnar():
+            """ Deserializes and reads a single field from the columnar format. """
+            serialization.deserialize(columnar_data)[2][leaf_key].field_0  # pylint: disable=expression-not-assigned
+
+        for name, data, read in (('pickle', pickled_data, read_pickled), ('columnar', columnar_data, read_columnar)):
+            print(u'{}: size={} bytes, deserialize+read={:.4f}s'.format(
+                name, len(data), min(timeit.repeat(read, number=1, repeat=self.REPEAT)),
+            ))
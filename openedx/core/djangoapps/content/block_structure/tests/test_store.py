@@ -3,12 +3,17 @@ Tests for block_structure/cache.py
 """
 from __future__ import absolute_import
 
+import itertools
+
 import ddt
+from django.conf import settings
+from mock import patch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COLUMNAR_SERIALIZATION, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
+from .. import store as store_module
 from ..exceptions import BlockStructureNotFound
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
@@ -51,13 +56,27 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             with self.assertRaises(BlockStructureNotFound):
                 self.store.get(self.block_structure.root_block_usage_key)
 
-    @ddt.data(True, False)
-    def test_add_and_get(self, with_storage_backing):
+    @ddt.data(*itertools.product((True, False), (True, False)))
+    @ddt.unpack
+    def test_add_and_get(self, with_storage_backing, with_columnar_serialization):
         with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
-            self.store.add(self.block_structure)
-            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            with waffle().override(COLUMNAR_SERIALIZATION, active=with_columnar_serialization):
+                self.store.add(self.block_structure)
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
             self.assertIsNotNone(stored_value)
             self.assert_block_structure(stored_value, self.children_map)
+            self.assertEqual(
+                stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                u'{} val'.format(MockTransformer.name()),
+            )
+
+    @ddt.data(True, False)
+    def test_read_across_formats(self, written_as_columnar):
+        with waffle().override(COLUMNAR_SERIALIZATION, active=written_as_columnar):
+            self.store.add(self.block_structure)
+        with waffle().override(COLUMNAR_SERIALIZATION, active=not written_as_columnar):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
 
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
@@ -90,3 +109,84 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+
+@patch.object(store_module, '_process_cache', None)
+@patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'PROCESS_CACHE_MAX_BLOCKS': 100})
+class TestBlockStructureStoreProcessCache(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Tests for the per-process cache tier of BlockStructureStore
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestBlockStructureStoreProcessCache, self).setUp()
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.root_key = self.block_structure.root_block_usage_key
+        self.block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        self.block_structure.set_transformer_block_field(self.root_key, MockTransformer, 'test', u'val')
+
+        self.mock_cache = MockCache()
+        self.store = BlockStructureStore(self.mock_cache)
+
+    def get_and_assert_stats(self, **expected_stats):
+        """
+        Gets the block structure from the store and verifies the
+        process cache's counters.
+        """
+        block_structure = self.store.get(self.root_key)
+        self.assert_block_structure(block_structure, self.children_map)
+        stats = BlockStructureStore.process_cache_stats()
+        self.assertDictContainsSubset(expected_stats, stats)
+        return block_structure
+
+    def test_hit_after_miss(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.get_and_assert_stats(hits=0, misses=1, entries=1, size=len(self.children_map))
+
+            self.mock_cache.map.clear()
+            self.get_and_assert_stats(hits=1, misses=1)
+
+    def test_returns_copies(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            first = self.get_and_assert_stats(misses=1)
+            first.remove_block(self.block_key_factory(1), keep_descendants=False)
+            self.get_and_assert_stats(hits=1)
+
+    def test_new_version_misses(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.get_and_assert_stats(misses=1)
+
+            self.store.add(self.block_structure)
+            self.get_and_assert_stats(hits=0, misses=2, entries=1)
+
+    def test_evict(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.get_and_assert_stats(misses=1, entries=1)
+
+            BlockStructureStore.evict_from_process_cache(self.root_key)
+            self.get_and_assert_stats(hits=0, misses=2, entries=1)
+
+            self.store.delete(self.root_key)
+            self.assertDictContainsSubset(dict(entries=0), BlockStructureStore.process_cache_stats())
+
+    def test_bounded_by_blocks(self):
+        with patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'PROCESS_CACHE_MAX_BLOCKS': len(self.children_map) - 1}):
+            with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.get_and_assert_stats(misses=1, entries=0)
+
+    def test_bypassed_without_storage_backing(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.root_key)
+        self.store.get(self.root_key)
+        self.assertDictContainsSubset(dict(hits=0, misses=0, entries=0), BlockStructureStore.process_cache_stats())
+
+    def test_disabled(self):
+        with patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'PROCESS_CACHE_MAX_BLOCKS': 0}):
+            self.assertIsNone(BlockStructureStore.process_cache_stats())
@@ -1,13 +1,19 @@
 """
 Tests for transformers.py
 """
-from __future__ import absolute_import
+from __future__ import absolute_import, print_function
 
-from unittest import TestCase
+import timeit
+from collections import OrderedDict
+from unittest import TestCase, skip
 
+import ddt
 from mock import MagicMock, patch
 
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
 from ..block_structure import BlockStructureModulestoreData
+from ..config import MASK_BASED_FILTERING, waffle
 from ..exceptions import TransformerDataIncompatible, TransformerException
 from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
@@ -82,3 +88,149 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             self.assertTrue(self.transformers.verify_versions(block_structure))
+
+
+class MockRemovalTransformer(MockFilteringTransformer):
+    """
+    A mock FilteringTransformerMixin class that removes the blocks
+    given in its removals.
+    """
+    def __init__(self, removals):
+        """
+        Arguments:
+            removals ([(set(block_id), bool)]) - For each filter to
+                return, the ids of the blocks it removes and whether
+                their descendants are kept.
+        """
+        self.removals = removals
+        self.evaluated = []
+
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_universal_filter()] + [
+            block_structure.create_removal_filter(self._removal_condition(block_ids), keep_descendants)
+            for block_ids, keep_descendants in self.removals
+        ]
+
+    def _removal_condition(self, block_ids):
+        """
+        Returns a removal condition for the given block ids that
+        records the blocks it is evaluated for.
+        """
+        def _is_removed(block_key):
+            self.evaluated.append(block_key)
+            return block_key in block_ids
+        return _is_removed
+
+
+@ddt.ddt
+class TestMaskBasedFiltering(ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Tests that filtering with bitset removal masks matches filtering
+    with the combined filter traversal.
+    """
+    def transform(self, children_map, removals, with_masks):
+        """
+        Returns the block structure for the given children_map after
+        transforming it with the given removals, and the transformer.
+        """
+        block_structure = self.create_block_structure(children_map)
+        transformer = MockRemovalTransformer(removals)
+        with mock_registered_transformers([transformer]):
+            transformers = BlockStructureTransformers([transformer], usage_info=MagicMock())
+        with waffle().override(MASK_BASED_FILTERING, active=with_masks):
+            transformers.transform(block_structure)
+        return block_structure, transformer
+
+    @ddt.data(
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, []),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, [({1}, False)]),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, [({1}, True)]),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, [({1}, True), ({2, 3}, False)]),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, [({0}, False)]),
+        (ChildrenMapTestMixin.LINEAR_CHILDREN_MAP, [({1}, True), ({2}, True)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({1}, False)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({1, 2}, False)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({2}, True)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({3}, True), ({5}, False)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({1, 2}, True), ({4}, False)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({2}, False), ({2, 3}, True)]),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [({2, 3}, True), ({2}, False)]),
+    )
+    @ddt.unpack
+    def test_matches_filter_traversal(self, children_map, removals):
+        expected, _ = self.transform(children_map, removals, with_masks=False)
+        actual, _ = self.transform(children_map, removals, with_masks=True)
+
+        self.assertEqual(set(actual.get_block_keys()), set(expected.get_block_keys()))
+        for block_key in expected:
+            # Splicing out blocks with a common child leaves duplicate
+            # relations with the filter traversal, but not with masks.
+            self.assertEqual(
+                actual.get_children(block_key),
+                list(OrderedDict.fromkeys(expected.get_children(block_key))),
+            )
+            self.assertEqual(set(actual.get_parents(block_key)), set(expected.get_parents(block_key)))
+
+    @ddt.data(True, False)
+    def test_removed_blocks_not_evaluated(self, with_masks):
+        _, transformer = self.transform(
+            self.SIMPLE_CHILDREN_MAP, [({1}, False), (set(), False)], with_masks=with_masks,
+        )
+        self.assertEqual(sorted(transformer.evaluated), [0, 0, 1, 2, 2])
+
+
+@skip
+class TestMaskBasedFilteringPerformance(ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Compares filtering with bitset removal masks against the combined
+    filter traversal on a large, synthetic course.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    # 10 chapters x 10 sequentials x 10 verticals x 9 components,
+    # plus the course, for a total of 10,111 blocks.
+    FANOUT = (10, 10, 10, 9)
+    REPEAT = 3
+
+    def create_children_map(self):
+        """
+        Returns a children map for a course with the FANOUT.
+        """
+        children_map = [[]]
+        parents = [0]
+        for fanout in self.FANOUT:
+            children = []
+            for parent in parents:
+                for _ in range(fanout):
+                    children_map[parent].append(len(children_map))
+                    children.append(len(children_map))
+                    children_map.append([])
+            parents = children
+        return children_map
+
+    def test_benchmark(self):
+        children_map = self.create_children_map()
+        removals = [
+            ({block_id for block_id in range(len(children_map)) if block_id % 97 == 1}, False),
+            ({block_id for block_id in range(len(children_map)) if block_id % 11 == 1}, True),
+            ({block_id for block_id in range(len(children_map)) if block_id % 89 == 1}, False),
+        ]
+        transformer = MockRemovalTransformer(removals)
+        with mock_registered_transformers([transformer]):
+            transformers = BlockStructureTransformers([transformer], usage_info=MagicMock())
+        block_structure = self.create_block_structure(children_map)
+
+        # As for a collected structure held in the process cache, the
+        # index is computed once and shared by the transformed copies.
+        block_structure.get_block_index()
+
+        for with_masks in (False, True):
+            durations = []
+            with waffle().override(MASK_BASED_FILTERING, active=with_masks):
+                for _ in range(self.REPEAT):
+                    transformed_structure = block_structure.copy()
+                    start = timeit.default_timer()
+                    transformers.transform(transformed_structure)
+                    durations.append(timeit.default_timer() - start)
+            print(u'{} blocks, with_masks={}: transform={:.4f}s'.format(len(children_map), with_masks, min(durations)))
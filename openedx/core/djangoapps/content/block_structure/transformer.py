@@ -55,6 +55,20 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect implementation can be run
+    # incrementally.  When a course is republished, the framework may
+    # carry over previously collected data for unchanged blocks and
+    # restrict the traversals of the block_structure to the changed
+    # blocks along with all of their ancestors and descendants.
+    #
+    # A transformer can support this as long as the data it collects
+    # for a block depends only on that block and its ancestors or
+    # descendants, and it accesses blocks only through the traversal
+    # methods.  If any registered transformer does not, a full
+    # collect is performed.
+    #
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
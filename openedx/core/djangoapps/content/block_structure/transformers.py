@@ -4,6 +4,8 @@ Module for a collection of BlockStructureTransformers.
 import functools
 from logging import getLogger
 
+from .block_structure import RemovalFilter, retain_all_blocks
+from .config import MASK_BASED_FILTERING, waffle
 from .exceptions import TransformerException, TransformerDataIncompatible
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -70,17 +72,65 @@ class BlockStructureTransformers(object):
                 self._transformers['no_filter'].append(transformer)
         return self
 
+    # Name of the xBlock field that is collected for every block so
+    # later collects can detect which blocks changed.  The split
+    # modulestore sets it to the version of the course structure in
+    # which the block was last updated.
+    VERSION_FIELD_NAME = 'update_version'
+
     @classmethod
-    def collect(cls, block_structure):
+    def collect(cls, block_structure, previous_block_structure=None):
         """
         Collects data for each registered transformer.
+
+        If previous_block_structure is given, data is collected only for
+        the blocks that changed since then, along with their ancestors
+        and descendants.  Callers should verify with
+        supports_incremental_collect that the previous block structure
+        can be used.
         """
-        for transformer in TransformerRegistry.get_registered_transformers():
-            block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+        if previous_block_structure is not None:
+            collect_scope = block_structure._start_incremental_collect(  # pylint: disable=protected-access
+                previous_block_structure,
+                cls.VERSION_FIELD_NAME,
+            )
+            logger.info(
+                u'BlockStructure: Incrementally collecting %d of %d blocks for %s.',
+                len(collect_scope),
+                len(block_structure),
+                block_structure.root_block_usage_key,
+            )
+
+        try:
+            for transformer in TransformerRegistry.get_registered_transformers():
+                block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+                transformer.collect(block_structure)
 
-        # Collect all fields that were requested by the transformers.
-        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+            # Collect all fields that were requested by the transformers.
+            block_structure.request_xblock_fields(cls.VERSION_FIELD_NAME)
+            block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        finally:
+            block_structure._end_incremental_collect()  # pylint: disable=protected-access
+
+    @classmethod
+    def supports_incremental_collect(cls, previous_block_structure):
+        """
+        Returns whether data can be collected incrementally on top of
+        the given previously collected block structure.  This requires
+        all registered transformers to support incremental collects and
+        the previously collected data to be of their current versions.
+        """
+        for transformer in TransformerRegistry.get_registered_transformers():
+            if not transformer.SUPPORTS_INCREMENTAL_COLLECT:
+                logger.info(
+                    u'BlockStructure: Transformer %s does not support incremental collects.',
+                    transformer.name(),
+                )
+                return False
+            version_in_block_structure = previous_block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
+            if version_in_block_structure != transformer.WRITE_VERSION:
+                return False
+        return True
 
     @classmethod
     def verify_versions(cls, block_structure):
@@ -130,6 +180,13 @@ class BlockStructureTransformers(object):
         for transformer in self._transformers['supports_filter']:
             filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
 
+        if all(
+                isinstance(filter_func, RemovalFilter) or filter_func is retain_all_blocks
+                for filter_func in filters
+        ) and waffle().is_enabled(MASK_BASED_FILTERING):
+            self._transform_with_removal_masks(block_structure, filters)
+            return
+
         combined_filters = functools.reduce(
             self._filter_chain,
             filters,
@@ -137,6 +194,37 @@ class BlockStructureTransformers(object):
         )
         block_structure.filter_topological_traversal(combined_filters)
 
+    def _transform_with_removal_masks(self, block_structure, filters):
+        """
+        Transforms the given block_structure by evaluating the given
+        removal filters over a topological index of its blocks,
+        combining the resulting removal masks as bitsets and then
+        removing all filtered-out blocks in a single pass.
+        """
+        removal_filters = [
+            filter_func for filter_func in filters if filter_func is not retain_all_blocks
+        ]
+        if not removal_filters:
+            return
+
+        block_index = block_structure.get_block_index()
+        removal_masks = block_index.removal_masks([
+            (filter_func.removal_condition, filter_func.keep_descendants) for filter_func in removal_filters
+        ])
+
+        # Blocks removed along with their descendants, and blocks
+        # removed whose descendants are kept.
+        removed_mask = spliced_mask = 0
+        for filter_func, removal_mask in zip(removal_filters, removal_masks):
+            if filter_func.keep_descendants:
+                spliced_mask |= removal_mask
+            else:
+                removed_mask |= removal_mask
+
+        if removed_mask or spliced_mask:
+            retained_mask = block_index.reachable_mask(removed_mask) & ~spliced_mask
+            block_structure.retain_masked_blocks(block_index, retained_mask, spliced_mask)
+
     def _filter_chain(self, accumulated, additional):
         """
         Given two functions that take a block_key and return a boolean, yield
@@ -5,6 +5,7 @@ from __future__ import absolute_import
 import collections
 import functools
 import itertools
+import threading
 import zlib
 import wrapt
 
@@ -149,6 +150,117 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class LRUCache(object):
+    """
+    A thread-safe, size-bounded map that evicts its least recently used
+    entries once its total size exceeds max_size.
+
+    By default, each entry counts as 1 towards max_size.  Provide a
+    get_size function to weigh entries differently, for example by the
+    number of blocks in a cached course structure.
+
+    WARNING: As with process_cached, entries live for the lifetime of
+    the process, so values should be immutable or copied by callers.
+    """
+    def __init__(self, max_size, get_size=None):
+        self.max_size = max_size
+        self._get_size = get_size or (lambda value: 1)
+        self._entries = collections.OrderedDict()
+        self._sizes = {}
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the value for the given key, marking it as the most
+        recently used; returns default if not found.
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Associates the given value with the given key, evicting least
+        recently used entries as needed.  Values larger than max_size
+        are not cached.
+        """
+        size = self._get_size(value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_size:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_size += size
+            while self._total_size > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Removes the given key from the cache, if present.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def delete_matching(self, predicate):
+        """
+        Removes all keys for which the given predicate returns True.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the cache's current size and counters.
+        """
+        with self._lock:
+            return dict(
+                entries=len(self._entries),
+                size=self._total_size,
+                max_size=self.max_size,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+            )
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        """
+        Removes the given key, if present.  Callers must hold the lock.
+        """
+        if key in self._entries:
+            del self._entries[key]
+            self._total_size -= self._sizes.pop(key)
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
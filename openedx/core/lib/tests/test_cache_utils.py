@@ -9,7 +9,7 @@ import ddt
 from mock import Mock
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import LRUCache, request_cached
 import six
 
 
@@ -297,3 +297,60 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestLRUCache(TestCase):
+    """
+    Test the LRUCache class.
+    """
+    def test_get_and_set(self):
+        cache = LRUCache(max_size=2)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertDictContainsSubset(dict(entries=1, size=1, hits=1, misses=2, evictions=0), cache.stats())
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_get_size(self):
+        cache = LRUCache(max_size=5, get_size=len)
+        cache.set('a', [1, 2, 3])
+        cache.set('b', [1, 2])
+        self.assertEqual(cache.stats()['size'], 5)
+        cache.set('c', [1])
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.stats()['size'], 3)
+
+        cache.set('d', [1, 2, 3, 4, 5, 6])
+        self.assertNotIn('d', cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_replace(self):
+        cache = LRUCache(max_size=5, get_size=len)
+        cache.set('a', [1, 2, 3])
+        cache.set('a', [1])
+        self.assertEqual(cache.get('a'), [1])
+        self.assertEqual(cache.stats()['size'], 1)
+
+    def test_delete(self):
+        cache = LRUCache(max_size=5)
+        for key in ('a1', 'a2', 'b1'):
+            cache.set(key, key)
+        cache.delete('a1')
+        cache.delete('missing')
+        self.assertEqual(len(cache), 2)
+        cache.delete_matching(lambda key: key.startswith('a'))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['size'], 1)
+        cache.clear()
+        self.assertDictContainsSubset(dict(entries=0, size=0, hits=0), cache.stats())